@@ -0,0 +1,153 @@
+import io
+import logging
+import logging.config
+from typing import Any, Callable, Optional
+
+import falcon
+import falcon.asgi
+
+from api.config.config import get_logging_conf, get_rate_limit_enabled
+from api.middleware.auth import AuthMiddleware
+from api.middleware.key_ring import KeyRing
+from api.middleware.passwords import PasswordHasher
+from api.middleware.rate_limit import RateLimitMiddleware
+from api.middleware.revocation import RevocationList
+from api.middleware.session import SessionMiddleware
+from api.repository.unit_of_work import (
+    AsyncSQLAlchemyUnitOfWork,
+    build_async_session_factory,
+)
+from api.routes import load_routes
+
+logging.config.fileConfig(get_logging_conf())
+simpleLogger = logging.getLogger("simpleLogger")
+
+
+class BufferedRequest:
+    """
+    ASGI request whose body was already read, exposed through the synchronous
+    `stream` the resources expect.
+    """
+
+    def __init__(self, req: falcon.asgi.Request, body: bytes) -> None:
+        self._req = req
+        self.stream = io.BytesIO(body)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._req, name)
+
+
+class AsyncResource:
+    """
+    Exposes every responder of a resource as a coroutine.
+
+    The request body is read on the event loop, unless a middleware already
+    read it into `req.context["body"]`, then the responder runs through
+    the Unit of Work's `run_sync`, so its database round-trips are awaited
+    instead of blocking a thread.
+    """
+
+    def __init__(self, resource: Any, uow: AsyncSQLAlchemyUnitOfWork) -> None:
+        self.uow = uow
+        for name in dir(resource):
+            if name.startswith("on_"):
+                setattr(self, name, self._responder(getattr(resource, name)))
+
+    def _responder(self, responder: Callable) -> Callable:
+        async def respond(
+            req: falcon.asgi.Request, resp: falcon.asgi.Response, **params: Any
+        ) -> None:
+            body = req.context.get("body")
+            if body is None:
+                body = await req.stream.read()
+            await self.uow.run_sync(
+                responder, BufferedRequest(req, body), resp, **params
+            )
+
+        return respond
+
+
+class AsyncMiddleware:
+    """
+    Runs the hooks of a synchronous middleware through the Unit of Work's
+    `run_sync`.
+    """
+
+    def __init__(self, middleware: Any, uow: AsyncSQLAlchemyUnitOfWork) -> None:
+        self.middleware = middleware
+        self.uow = uow
+
+    async def process_request(
+        self, req: falcon.asgi.Request, resp: falcon.asgi.Response
+    ) -> None:
+        if hasattr(self.middleware, "process_request"):
+            await self.uow.run_sync(self.middleware.process_request, req, resp)
+
+    async def process_resource(
+        self,
+        req: falcon.asgi.Request,
+        resp: falcon.asgi.Response,
+        resource: Any,
+        params: dict,
+    ) -> None:
+        if hasattr(self.middleware, "process_resource"):
+            await self.uow.run_sync(
+                self.middleware.process_resource, req, resp, resource, params
+            )
+
+    async def process_response(
+        self,
+        req: falcon.asgi.Request,
+        resp: falcon.asgi.Response,
+        resource: Any,
+        req_succeeded: bool,
+    ) -> None:
+        if hasattr(self.middleware, "process_response"):
+            await self.uow.run_sync(
+                self.middleware.process_response, req, resp, resource, req_succeeded
+            )
+
+
+class AsyncRoutes:
+    """
+    Adds routes to an ASGI app, wrapping each resource in an `AsyncResource`.
+    """
+
+    def __init__(self, app: falcon.asgi.App, uow: AsyncSQLAlchemyUnitOfWork) -> None:
+        self.app = app
+        self.uow = uow
+
+    def add_route(self, uri_template: str, resource: Any, **kwargs: Any) -> None:
+        self.app.add_route(uri_template, AsyncResource(resource, self.uow), **kwargs)
+
+
+def run(
+    uow: AsyncSQLAlchemyUnitOfWork,
+    key_ring: Optional[KeyRing] = None,
+    revocations: Optional[RevocationList] = None,
+    password_hasher: Optional[PasswordHasher] = None,
+    rate_limiter: Optional[RateLimitMiddleware] = None,
+) -> falcon.asgi.App:
+    simpleLogger.info("Starting the ASGI application.")
+    key_ring = key_ring or KeyRing.from_settings()
+    if revocations is None:
+        revocations = RevocationList()
+    if password_hasher is None:
+        password_hasher = PasswordHasher()
+    if rate_limiter is None and get_rate_limit_enabled():
+        rate_limiter = RateLimitMiddleware.from_settings()
+    middlewares = [AsyncMiddleware(SessionMiddleware(uow), uow)]
+    if rate_limiter is not None:
+        # Its hooks don't touch the database, so they run on the event loop.
+        middlewares.append(rate_limiter)
+    middlewares.append(AsyncMiddleware(AuthMiddleware(uow, key_ring, revocations), uow))
+    app = falcon.asgi.App(middleware=middlewares)
+    load_routes(AsyncRoutes(app, uow), uow, key_ring, revocations, password_hasher)
+
+    return app
+
+
+uow = AsyncSQLAlchemyUnitOfWork(build_async_session_factory())
+key_ring = KeyRing.from_settings()
+key_ring.install_reload_signal()
+app = application = run(uow=uow, key_ring=key_ring)
@@ -0,0 +1,178 @@
+"""
+Query plans of the by-date lookups with and without the per-user, per-date
+indexes, over a dataset of `USERS` users logging every day for `DAYS` days.
+
+Each lookup goes through the repository. The statements it sends are then
+explained, so the plans shown are those of the queries the API runs.
+"""
+from datetime import date, timedelta
+from typing import Callable, List, Tuple
+
+from sqlalchemy import Engine, event, text
+
+from api.benchmarks.common import (
+    create_session_factory,
+    create_test_engine,
+    reset_database,
+    summarize,
+    timed,
+)
+from api.repository.database import SQLRepository
+from api.repository.models import Base
+
+USERS = 1000
+DAYS = 90
+ENTRIES_PER_DAY = 2
+REPEAT = 50
+
+CHILD_COLUMNS = {
+    "user_humor": "value, description, health_based",
+    "user_water_intake": "milliliters, description, pee",
+    "user_exercises": "minutes, description",
+    "user_food_habits": "value, description",
+    "user_sleep": "value, minutes, description",
+}
+CHILD_VALUES = {
+    "user_humor": "5, 'humor', false",
+    "user_water_intake": "250, 'water', false",
+    "user_exercises": "30, 'exercises'",
+    "user_food_habits": "5, 'food'",
+    "user_sleep": "5, 480, 'sleep'",
+}
+
+LOOKUPS = [
+    "get_mood_by_date_for_user",
+    "get_humor_by_date_for_user",
+    "get_water_intake_by_date_for_user",
+    "get_exercises_by_date_for_user",
+    "get_food_habits_by_date_for_user",
+    "get_sleep_by_date_for_user",
+]
+
+
+def fill_database(engine: Engine) -> None:
+    reset_database(engine, users=0)
+    with engine.begin() as connection:
+        connection.execute(
+            text("INSERT INTO users (id) SELECT generate_series(1, :users)"),
+            {"users": USERS},
+        )
+        connection.execute(
+            text(
+                "INSERT INTO user_mood (date, score, user_id) "
+                "SELECT CURRENT_DATE - day, 5, user_id "
+                "FROM generate_series(1, :users) user_id, "
+                "generate_series(0, :days - 1) day"
+            ),
+            {"users": USERS, "days": DAYS},
+        )
+        for table, columns in CHILD_COLUMNS.items():
+            connection.execute(
+                text(
+                    f"INSERT INTO {table} (date, {columns}, mood_id) "
+                    f"SELECT m.date, {CHILD_VALUES[table]}, m.id "
+                    "FROM user_mood m, generate_series(1, :entries)"
+                ),
+                {"entries": ENTRIES_PER_DAY},
+            )
+
+
+def drop_indexes(engine: Engine) -> None:
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                connection.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+
+
+def create_indexes(engine: Engine) -> None:
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+
+
+def analyze(engine: Engine) -> None:
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE"))
+
+
+def capture_selects(engine: Engine, fn: Callable[[], object]) -> List[Tuple]:
+    """
+    Calls `fn` and returns the SELECT statements it sent, with their parameters.
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+def scans(plan: dict) -> List[str]:
+    """
+    The scans of a JSON plan, as `<node type> on <relation>`.
+    """
+    found = []
+    if "Relation Name" in plan:
+        found.append(f"{plan['Node Type']} on {plan['Relation Name']}")
+    for child in plan.get("Plans", []):
+        found.extend(scans(child))
+    return found
+
+
+def explain(engine: Engine, statement: str, parameters) -> Tuple[float, List[str]]:
+    with engine.connect() as connection:
+        result = connection.exec_driver_sql(
+            f"EXPLAIN (ANALYZE, FORMAT JSON) {statement}", parameters
+        ).scalar()
+    return result[0]["Execution Time"], scans(result[0]["Plan"])
+
+
+def report(engine: Engine, session_factory) -> None:
+    user_id = USERS // 2
+    lookup_date = date.today() - timedelta(days=DAYS // 2)
+    for lookup in LOOKUPS:
+        with session_factory() as session:
+            repository = SQLRepository(session)
+            call = lambda: getattr(repository, lookup)(lookup_date, user_id)
+            statements = capture_selects(engine, call)
+            durations = timed(call, REPEAT)
+
+        print(f"  {lookup:<36} | {summarize(durations)}")
+        for statement, parameters in statements:
+            execution_time, plan_scans = explain(engine, statement, parameters)
+            print(f"    executor {execution_time:8.3f} ms | {', '.join(plan_scans)}")
+
+
+def main() -> None:
+    engine = create_test_engine()
+    session_factory = create_session_factory(engine)
+    fill_database(engine)
+
+    print(
+        f"{USERS} users, {DAYS} days, {ENTRIES_PER_DAY} entries per day in each "
+        "child table"
+    )
+    # Leaves the initial schema, apart from the global uniqueness on
+    # `user_mood.date` that the dataset can't satisfy.
+    drop_indexes(engine)
+    analyze(engine)
+    print("Without indexes")
+    report(engine, session_factory)
+
+    create_indexes(engine)
+    analyze(engine)
+    print("With indexes")
+    report(engine, session_factory)
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Login throughput at several password hasher pool sizes, and the latency of
+the CRUD requests served meanwhile.
+
+`CLIENTS` threads log in back to back while one more thread reads the mood of
+the day, as a login storm next to regular traffic would.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import falcon
+from falcon import testing
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from api.benchmarks.common import (
+    create_session_factory,
+    create_test_engine,
+    create_token,
+    reset_database,
+    summarize,
+    timed,
+)
+from api.middleware.auth import AuthMiddleware
+from api.middleware.key_ring import KeyRing
+from api.middleware.passwords import PasswordHasher
+from api.middleware.revocation import RevocationList
+from api.middleware.session import SessionMiddleware
+from api.repository.models import UserAuth
+from api.repository.unit_of_work import SQLAlchemyUnitOfWork
+from api.routes import load_routes
+
+USERS = 32
+CLIENTS = 16
+LOGINS_PER_CLIENT = 8
+POOL_SIZES = [1, 2, 4, 8]
+# The production cost, not the cheap one of the `testing` settings.
+COST = {"n": 2**14, "r": 8, "p": 1}
+
+
+def hash_passwords(engine, hasher: PasswordHasher) -> None:
+    with Session(engine) as session:
+        for n in range(1, USERS + 1):
+            session.execute(
+                update(UserAuth)
+                .where(UserAuth.username == f"user_{n}")
+                .values(password=hasher.hash(f"password_{n}"))
+            )
+        session.commit()
+
+
+def build_client(
+    uow: SQLAlchemyUnitOfWork, hasher: PasswordHasher
+) -> testing.TestClient:
+    key_ring = KeyRing.from_settings()
+    revocations = RevocationList()
+    app = falcon.App(
+        middleware=[
+            SessionMiddleware(uow),
+            AuthMiddleware(uow, key_ring, revocations),
+        ]
+    )
+    load_routes(app, uow, key_ring, revocations, hasher)
+    return testing.TestClient(app)
+
+
+def main() -> None:
+    engine = create_test_engine()
+    reset_database(engine, users=USERS)
+    uow = SQLAlchemyUnitOfWork(session_factory=create_session_factory(engine))
+    setup_hasher = PasswordHasher(**COST, workers=max(POOL_SIZES))
+    hash_passwords(engine, setup_hasher)
+    setup_hasher.shutdown()
+
+    print(
+        f"{CLIENTS} clients x {LOGINS_PER_CLIENT} logins, "
+        f"scrypt n={COST['n']} r={COST['r']} p={COST['p']}"
+    )
+    for workers in POOL_SIZES:
+        hasher = PasswordHasher(**COST, workers=workers, queue_size=CLIENTS)
+        client = build_client(uow, hasher)
+        statuses = []
+        storm_over = threading.Event()
+
+        def login(n: int) -> None:
+            user = n % USERS + 1
+            result = client.simulate_post(
+                "/login",
+                json={"username": f"user_{user}", "password": f"password_{user}"},
+            )
+            statuses.append(result.status_code)
+
+        def storm() -> float:
+            start = datetime.now()
+            with ThreadPoolExecutor(max_workers=CLIENTS) as clients:
+                list(clients.map(login, range(CLIENTS * LOGINS_PER_CLIENT)))
+            storm_over.set()
+            return (datetime.now() - start).total_seconds()
+
+        headers = {"Authorization": f"Bearer {create_token(1)}"}
+        crud_durations = []
+
+        def crud() -> None:
+            while not storm_over.is_set():
+                crud_durations.extend(
+                    timed(
+                        lambda: client.simulate_get(
+                            f"/mood/date/{datetime.today().date()}", headers=headers
+                        ),
+                        1,
+                    )
+                )
+
+        reader = threading.Thread(target=crud)
+        reader.start()
+        elapsed = storm()
+        reader.join()
+        hasher.shutdown()
+
+        ok = statuses.count(200)
+        print(
+            f"{workers} workers | logins/s {ok / elapsed:7.1f} | "
+            f"rejected {len(statuses) - ok:3d} | CRUD {summarize(crud_durations)}"
+        )
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Reads of mood documents with each mood loader, on a day with a realistic
+number of entries in each collection.
+
+Joining the five collections returns the product of their sizes, so the
+rows fetched are reported next to the statements and timings.
+"""
+from datetime import date, timedelta
+
+from sqlalchemy import Engine, event, text
+
+from api.benchmarks.common import (
+    create_session_factory,
+    create_test_engine,
+    reset_database,
+    summarize,
+    timed,
+)
+from api.repository.database import MOOD_LOADERS, SQLRepository
+
+USERS = 100
+DAYS = 30
+REPEAT = 200
+
+# Entries logged on a typical day.
+ENTRIES_PER_DAY = {
+    "user_humor": 3,
+    "user_water_intake": 8,
+    "user_exercises": 2,
+    "user_food_habits": 4,
+    "user_sleep": 1,
+}
+CHILD_COLUMNS = {
+    "user_humor": ("value, description, health_based", "5, 'humor', false"),
+    "user_water_intake": ("milliliters, description, pee", "250, 'water', false"),
+    "user_exercises": ("minutes, description", "30, 'exercises'"),
+    "user_food_habits": ("value, description", "5, 'food'"),
+    "user_sleep": ("value, minutes, description", "5, 480, 'sleep'"),
+}
+
+
+def fill_database(engine: Engine) -> None:
+    reset_database(engine, users=0)
+    with engine.begin() as connection:
+        connection.execute(
+            text("INSERT INTO users (id) SELECT generate_series(1, :users)"),
+            {"users": USERS},
+        )
+        connection.execute(
+            text(
+                "INSERT INTO user_mood (date, score, user_id) "
+                "SELECT CURRENT_DATE - day, 5, user_id "
+                "FROM generate_series(1, :users) user_id, "
+                "generate_series(0, :days - 1) day"
+            ),
+            {"users": USERS, "days": DAYS},
+        )
+        for table, (columns, values) in CHILD_COLUMNS.items():
+            connection.execute(
+                text(
+                    f"INSERT INTO {table} (date, {columns}, mood_id) "
+                    f"SELECT m.date, {values}, m.id "
+                    "FROM user_mood m, generate_series(1, :entries)"
+                ),
+                {"entries": ENTRIES_PER_DAY[table]},
+            )
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE"))
+
+
+def main() -> None:
+    engine = create_test_engine()
+    session_factory = create_session_factory(engine)
+    fill_database(engine)
+
+    user_id = USERS // 2
+    mood_date = date.today() - timedelta(days=DAYS // 2)
+    with engine.connect() as connection:
+        mood_id = connection.execute(
+            text("SELECT id FROM user_mood WHERE user_id = :user_id AND date = :date"),
+            {"user_id": user_id, "date": mood_date},
+        ).scalar_one()
+
+    print(f"One mood of {', '.join(f'{n} {t}' for t, n in ENTRIES_PER_DAY.items())}")
+    for name, read in [
+        (
+            "by id",
+            lambda repository: repository.get_mood_document_by_id_for_user(
+                mood_id, user_id
+            ),
+        ),
+        (
+            "by date",
+            lambda repository: repository.get_mood_documents_by_date_for_user(
+                mood_date, user_id
+            ),
+        ),
+    ]:
+        print(f"GET /mood {name}")
+        for mood_loader in MOOD_LOADERS:
+            statements = 0
+            rows = 0
+
+            def after_cursor_execute(conn, cursor, *args):
+                nonlocal statements, rows
+                statements += 1
+                rows += max(cursor.rowcount, 0)
+
+            def request():
+                # A new session per request, as the API does, so nothing is
+                # served from the identity map.
+                with session_factory() as session:
+                    read(SQLRepository(session, mood_loader=mood_loader))
+
+            event.listen(engine, "after_cursor_execute", after_cursor_execute)
+            try:
+                durations = timed(request, REPEAT)
+            finally:
+                event.remove(engine, "after_cursor_execute", after_cursor_execute)
+
+            print(
+                f"  {mood_loader:<8} | statements {statements / REPEAT:4.1f} | "
+                f"rows {rows / REPEAT:6.1f} | {summarize(durations)}"
+            )
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Pages of a user's entries at increasing depths, over a dataset of `USERS`
+users logging `ENTRIES_PER_DAY` entries every day for `DAYS` days.
+
+Keyset pages start from the cursor of the previous one, so a deep page should
+cost the same as the first. `OFFSET` pages are timed next to them, for
+comparison, as they read and skip every row before the page.
+"""
+
+from sqlalchemy import Engine, text
+
+from api.benchmarks.common import (
+    create_session_factory,
+    create_test_engine,
+    reset_database,
+    summarize,
+    timed,
+)
+from api.repository.database import PageRequest, SQLRepository
+from api.repository.models import Humor, Mood
+
+USERS = 100
+DAYS = 3650
+ENTRIES_PER_DAY = 3
+PAGE_SIZE = 50
+DEPTHS = [0, 100, 200]
+REPEAT = 100
+
+
+def fill_database(engine: Engine) -> None:
+    reset_database(engine, users=0)
+    with engine.begin() as connection:
+        connection.execute(
+            text("INSERT INTO users (id) SELECT generate_series(1, :users)"),
+            {"users": USERS},
+        )
+        connection.execute(
+            text(
+                "INSERT INTO user_mood (date, score, user_id) "
+                "SELECT CURRENT_DATE - day, 5, user_id "
+                "FROM generate_series(1, :users) user_id, "
+                "generate_series(0, :days - 1) day"
+            ),
+            {"users": USERS, "days": DAYS},
+        )
+        connection.execute(
+            text(
+                "INSERT INTO user_humor (date, value, description, health_based, "
+                "mood_id) "
+                "SELECT m.date, 5, 'humor', false, m.id "
+                "FROM user_mood m, generate_series(1, :entries)"
+            ),
+            {"entries": ENTRIES_PER_DAY},
+        )
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE"))
+
+
+def main() -> None:
+    engine = create_test_engine()
+    session_factory = create_session_factory(engine)
+    fill_database(engine)
+
+    user_id = USERS // 2
+    print(
+        f"{USERS} users, {DAYS} days, {ENTRIES_PER_DAY} humors per day, "
+        f"pages of {PAGE_SIZE}"
+    )
+    for depth in DEPTHS:
+        # Walks to the page once, to know the cursor a client would send.
+        page_request = PageRequest(limit=PAGE_SIZE)
+        with session_factory() as session:
+            repository = SQLRepository(session)
+            for _ in range(depth):
+                page = repository.get_humor_page_for_user(user_id, page_request)
+                page_request = page_request._replace(after=page.next_after)
+
+        def keyset():
+            with session_factory() as session:
+                SQLRepository(session).get_humor_page_for_user(user_id, page_request)
+
+        def offset():
+            with session_factory() as session:
+                (
+                    session.query(Humor, Mood.date)
+                    .join(Humor.mood)
+                    .filter(Mood.user_id == user_id)
+                    .order_by(Mood.date, Humor.id)
+                    .offset(depth * PAGE_SIZE)
+                    .limit(PAGE_SIZE + 1)
+                    .all()
+                )
+
+        print(f"  page {depth:>4} | keyset | {summarize(timed(keyset, REPEAT))}")
+        print(f"  page {depth:>4} | offset | {summarize(timed(offset, REPEAT))}")
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+GET requests served from ORM instances and from views, over a user logging
+`ENTRIES_PER_DAY` humors every day for `DAYS` days.
+
+Each request opens a session, reads through the repository and serializes
+the result with `as_dict`, as the handlers do. Allocations are the peak
+memory traced during one request, latencies are measured without tracing.
+"""
+import tracemalloc
+from datetime import date, timedelta
+from statistics import mean
+
+from sqlalchemy import Engine, text
+
+from api.benchmarks.common import (
+    create_session_factory,
+    create_test_engine,
+    reset_database,
+    summarize,
+    timed,
+)
+from api.repository.database import PageRequest, SQLRepository
+
+DAYS = 365
+ENTRIES_PER_DAY = 20
+PAGE_SIZE = 50
+REPEAT = 200
+TRACED = 20
+
+READS = {
+    "by id": (
+        lambda repository: [repository.get_humor_by_id_for_user(1, 1).item],
+        lambda repository: [repository.get_humor_view_by_id_for_user(1, 1).item],
+    ),
+    "by date": (
+        lambda repository: repository.get_humor_by_date_for_user(
+            date.today() - timedelta(days=DAYS // 2), 1
+        ),
+        lambda repository: repository.get_humor_views_by_date_for_user(
+            date.today() - timedelta(days=DAYS // 2), 1
+        ),
+    ),
+    "page": (
+        lambda repository: repository.get_humor_page_for_user(
+            1, PageRequest(limit=PAGE_SIZE)
+        ).items,
+        lambda repository: repository.get_humor_views_page_for_user(
+            1, PageRequest(limit=PAGE_SIZE)
+        ).items,
+    ),
+}
+
+
+def fill_database(engine: Engine) -> None:
+    reset_database(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "INSERT INTO user_mood (date, score, user_id) "
+                "SELECT CURRENT_DATE - day, 5, 1 "
+                "FROM generate_series(0, :days - 1) day"
+            ),
+            {"days": DAYS},
+        )
+        connection.execute(
+            text(
+                "INSERT INTO user_humor (date, value, description, health_based, "
+                "mood_id) "
+                "SELECT m.date, 5, 'humor', false, m.id "
+                "FROM user_mood m, generate_series(1, :entries)"
+            ),
+            {"entries": ENTRIES_PER_DAY},
+        )
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE"))
+
+
+def traced_peak(fn) -> float:
+    """
+    The peak memory, in KiB, allocated while `fn` runs.
+    """
+    tracemalloc.reset_peak()
+    start, _ = tracemalloc.get_traced_memory()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    return (peak - start) / 1024
+
+
+def main() -> None:
+    engine = create_test_engine()
+    session_factory = create_session_factory(engine)
+    fill_database(engine)
+
+    print(f"{DAYS} days, {ENTRIES_PER_DAY} humors per day, pages of {PAGE_SIZE}")
+    for name, reads in READS.items():
+        print(f"GET humor {name}")
+        for path, read in zip(["orm", "views"], reads):
+
+            def request():
+                with session_factory() as session:
+                    items = read(SQLRepository(session))
+                    return [item.as_dict() for item in items]
+
+            request()
+            tracemalloc.start()
+            try:
+                peak = mean(traced_peak(request) for _ in range(TRACED))
+            finally:
+                tracemalloc.stop()
+            durations = timed(request, REPEAT)
+            print(f"  {path:<5} | peak {peak:8.1f} KiB | {summarize(durations)}")
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Requests through the whole app, with the repository in memory and with the
+`testing` database.
+
+The in-memory timings are what the middlewares, the resources and the
+serialization cost on their own. The difference with the database timings
+is the time spent in SQLAlchemy and Postgres.
+"""
+from datetime import date
+
+from falcon import testing
+
+from api.benchmarks.common import (
+    create_session_factory,
+    create_test_engine,
+    create_token,
+    reset_database,
+    summarize,
+    timed,
+)
+from api.main import run
+from api.repository.cache import LookupCache
+from api.repository.in_memory import InMemoryRepository
+from api.repository.models import Humor, Mood, User, UserAuth
+from api.repository.unit_of_work import InMemoryUnitOfWork, SQLAlchemyUnitOfWork
+
+ENTRIES = 20
+REPEAT = 2000
+
+REQUESTS = {
+    "GET /humor/{id}": lambda client, headers: client.simulate_get(
+        "/humor/1", headers=headers
+    ),
+    "GET /humor/date": lambda client, headers: client.simulate_get(
+        f"/humor/date/{date.today()}", headers=headers
+    ),
+    "GET /humor": lambda client, headers: client.simulate_get(
+        "/humor", headers=headers
+    ),
+    "GET /mood/{id}": lambda client, headers: client.simulate_get(
+        "/mood/1", headers=headers
+    ),
+    "PATCH /humor/{id}": lambda client, headers: client.simulate_patch(
+        "/humor/1", json={"value": 7}, headers=headers
+    ),
+}
+
+
+def fill_repository() -> InMemoryRepository:
+    """
+    Adds the rows `reset_database` and `main` add to the database.
+    """
+    repository = InMemoryRepository()
+    repository.add_user_auth(
+        UserAuth(
+            username="user_1",
+            password="password_1",
+            created_at=date.today(),
+            last_login=date.today(),
+            token="",
+            user=User(),
+        )
+    )
+    repository.add_mood(Mood(user_id=1))
+    repository.add_many([Humor(value=5, mood_id=1) for _ in range(ENTRIES)])
+    repository.commit()
+    return repository
+
+
+def main() -> None:
+    engine = create_test_engine()
+    session_factory = create_session_factory(engine)
+    reset_database(engine)
+    with session_factory() as session:
+        session.add(Mood(user_id=1))
+        session.flush()
+        session.add_all([Humor(value=5, mood_id=1) for _ in range(ENTRIES)])
+        session.commit()
+
+    headers = {"Authorization": f"Bearer: {create_token(1)}"}
+    clients = {
+        "memory": testing.TestClient(run(InMemoryUnitOfWork(fill_repository()))),
+        "database": testing.TestClient(
+            run(SQLAlchemyUnitOfWork(session_factory, LookupCache()))
+        ),
+    }
+
+    print(f"One mood of {ENTRIES} humors")
+    for name, request in REQUESTS.items():
+        print(name)
+        for path, client in clients.items():
+            assert request(client, headers).status_code < 400
+            durations = timed(lambda: request(client, headers), REPEAT)
+            print(f"  {path:<8} | {summarize(durations)}")
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
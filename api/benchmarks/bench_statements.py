@@ -0,0 +1,116 @@
+"""
+Per-call overhead of the hot repository queries, built on each call as the
+repository used to, and prebuilt in `api.repository.statements`.
+
+`build` times constructing the statement and generating the cache key the
+engine looks its compiled form up with, which is all the Python a prebuilt
+statement saves, without touching the database. `call` times the whole
+lookup through a session, against the `testing` database.
+"""
+from datetime import date
+
+from sqlalchemy.orm import selectinload
+
+from api.benchmarks.common import (
+    create_session_factory,
+    create_test_engine,
+    reset_database,
+    summarize,
+    timed,
+)
+from api.repository.database import SQLRepository
+from api.repository.models import Humor, Mood, User, UserAuth
+from api.repository.statements import (
+    ENTRIES_BY_DATE_FOR_USER,
+    ENTRY_BY_ID_FOR_USER,
+    MOOD_BY_ID,
+    MOOD_COLLECTIONS,
+    USER_AUTH_BY_USERNAME,
+    USER_BY_ID,
+)
+
+REPEAT = 2000
+
+
+# Each hot query as the repository used to build it, the statement it now
+# runs instead, and the repository call running it.
+QUERIES = {
+    "auth by username": (
+        lambda session: session.query(UserAuth).filter_by(username="user_1").limit(1),
+        USER_AUTH_BY_USERNAME,
+        lambda repository: repository.get_user_auth_by_username("user_1"),
+    ),
+    "user by id": (
+        lambda session: session.query(User).filter_by(id=1).limit(1),
+        USER_BY_ID,
+        lambda repository: repository.get_user_by_id(1),
+    ),
+    "humor by id": (
+        lambda session: session.query(Humor, Mood.user_id)
+        .join(Humor.mood)
+        .filter(Humor.id == 1)
+        .limit(1),
+        ENTRY_BY_ID_FOR_USER[Humor],
+        lambda repository: repository.get_humor_by_id_for_user(1, 1),
+    ),
+    "humors by date": (
+        lambda session: session.query(Humor)
+        .join(Humor.mood)
+        .filter(Humor.date == date.today(), Mood.user_id == 1),
+        ENTRIES_BY_DATE_FOR_USER[Humor],
+        lambda repository: repository.get_humor_by_date_for_user(date.today(), 1),
+    ),
+    "mood by id": (
+        lambda session: session.query(Mood)
+        .options(*[selectinload(getattr(Mood, key)) for key in MOOD_COLLECTIONS])
+        .filter_by(id=1)
+        .limit(1),
+        MOOD_BY_ID["selectin"],
+        lambda repository: repository.get_mood_by_id(1),
+    ),
+}
+
+
+def main() -> None:
+    engine = create_test_engine()
+    session_factory = create_session_factory(engine)
+    reset_database(engine)
+    with session_factory() as session:
+        session.add(Mood(user_id=1))
+        session.flush()
+        session.add(Humor(value=5, mood_id=1))
+        session.commit()
+
+    print("build: statement and cache key")
+    with session_factory() as session:
+        for name, (build, statement, _) in QUERIES.items():
+            rebuilt = timed(
+                lambda: build(session).statement._generate_cache_key(), REPEAT
+            )
+            prebuilt = timed(statement._generate_cache_key, REPEAT)
+            print(f"  {name:<16} | each call | {summarize(rebuilt)}")
+            print(f"  {name:<16} | prebuilt  | {summarize(prebuilt)}")
+
+    print("call: through a session, with the database")
+    with session_factory() as session:
+        repository = SQLRepository(session)
+        for name, (build, _, call) in QUERIES.items():
+
+            def call_rebuilt():
+                build(session).all()
+                session.expunge_all()
+
+            def call_prebuilt():
+                call(repository)
+                session.expunge_all()
+
+            rebuilt = timed(call_rebuilt, REPEAT)
+            prebuilt = timed(call_prebuilt, REPEAT)
+            print(f"  {name:<16} | each call | {summarize(rebuilt)}")
+            print(f"  {name:<16} | prebuilt  | {summarize(prebuilt)}")
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
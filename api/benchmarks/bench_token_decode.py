@@ -0,0 +1,64 @@
+"""
+Time spent authenticating a request in `AuthMiddleware.process_request`, with
+and without the decoded-token cache.
+
+Every request repeats the same token, as a client polling the API does. The
+revocation list is refreshed once before timing, so no scenario touches the
+database.
+"""
+import falcon
+from falcon import testing
+
+from api.benchmarks.common import (
+    create_session_factory,
+    create_test_engine,
+    create_token,
+    reset_database,
+    summarize,
+    timed,
+)
+from api.middleware.auth import AuthMiddleware
+from api.middleware.key_ring import KeyRing
+from api.middleware.revocation import RevocationList
+from api.repository.cache import LookupCache
+from api.repository.unit_of_work import SQLAlchemyUnitOfWork
+
+REQUESTS = 10000
+
+
+def main() -> None:
+    engine = create_test_engine()
+    reset_database(engine)
+    uow = SQLAlchemyUnitOfWork(session_factory=create_session_factory(engine))
+    key_ring = KeyRing.from_settings()
+    token = create_token(1)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    scenarios = [
+        ("no cache", LookupCache(maxsize=0)),
+        ("token cache", None),
+    ]
+
+    print(f"AuthMiddleware.process_request, {REQUESTS} requests with one token")
+    for name, token_cache in scenarios:
+        revocations = RevocationList(refresh_interval=3600)
+        middleware = AuthMiddleware(uow, key_ring, revocations, token_cache)
+
+        def request():
+            req = testing.create_req(path="/humor/1", headers=headers)
+            middleware.process_request(req, falcon.Response())
+
+        with uow:
+            request()
+            durations = timed(request, REQUESTS)
+
+        stats = middleware.token_cache.stats()
+        print(
+            f"{name:<12} | hit ratio {stats['hit_ratio']:4.2f} | {summarize(durations)}"
+        )
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
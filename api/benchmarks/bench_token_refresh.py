@@ -0,0 +1,113 @@
+"""
+Database writes per authenticated request, before and after sliding token
+refresh.
+
+`LegacyAuthMiddleware` reproduces the old `process_response`, which signed a
+new token and stored it in `user_auth.token` on every response.
+"""
+from datetime import datetime, timedelta
+
+import falcon
+from falcon import testing
+
+from api.benchmarks.common import (
+    WRITE_STATEMENTS,
+    count_statements,
+    create_session_factory,
+    create_test_engine,
+    create_token,
+    reset_database,
+    summarize,
+    timed,
+)
+from api.middleware.auth import REFRESHED_TOKEN_HEADER, AuthMiddleware
+from api.middleware.key_ring import KeyRing
+from api.middleware.passwords import PasswordHasher
+from api.middleware.revocation import RevocationList
+from api.middleware.session import SessionMiddleware
+from api.repository.unit_of_work import SQLAlchemyUnitOfWork
+from api.routes import load_routes
+
+# One request per user, as with real traffic spread over many users. A single
+# user hammering the API would hide the legacy writes, because the old code
+# only issued an UPDATE when the token changed, at most once per second.
+USERS = 500
+
+
+class LegacyAuthMiddleware(AuthMiddleware):
+    def process_response(self, req, resp, resource, req_succeeded) -> None:
+        if req.path in self.ignore_paths:
+            return
+
+        user_auth = self.uow.repository.get_user_auth_by_username(
+            req.context.get("username")
+        )
+        refresh_data = {
+            "exp": str(int((datetime.now() + timedelta(minutes=5)).timestamp())),
+            "user_auth_id": str(user_auth.id),
+            "user_auth_username": str(user_auth.username),
+            "user_auth_user_id": str(user_auth.user_id),
+            "user_auth_last_login": str(user_auth.last_login),
+        }
+        token = self.key_ring.encode(refresh_data)
+        self.uow.repository.update_user_auth(user_auth, {"token": token})
+        self.uow.commit()
+
+
+def build_client(
+    uow: SQLAlchemyUnitOfWork, auth_middleware: type
+) -> testing.TestClient:
+    key_ring = KeyRing.from_settings()
+    revocations = RevocationList()
+    app = falcon.App(
+        middleware=[
+            SessionMiddleware(uow),
+            auth_middleware(uow, key_ring, revocations),
+        ]
+    )
+    load_routes(app, uow, key_ring, revocations, PasswordHasher())
+    return testing.TestClient(app)
+
+
+def main() -> None:
+    engine = create_test_engine()
+    reset_database(engine, users=USERS)
+    uow = SQLAlchemyUnitOfWork(session_factory=create_session_factory(engine))
+
+    scenarios = [
+        ("legacy refresh", LegacyAuthMiddleware, timedelta(minutes=5)),
+        ("sliding, fresh token", AuthMiddleware, timedelta(minutes=5)),
+        ("sliding, expiring token", AuthMiddleware, timedelta(seconds=30)),
+    ]
+
+    print(f"GET /mood/date/<today>, one request for each of {USERS} users")
+    for name, middleware, expires_in in scenarios:
+        client = build_client(uow, middleware)
+        tokens = iter(
+            [create_token(user_id, expires_in) for user_id in range(1, USERS + 1)]
+        )
+        refreshed = 0
+
+        def request():
+            nonlocal refreshed
+            result = client.simulate_get(
+                f"/mood/date/{datetime.today().date()}",
+                headers={"Authorization": f"Bearer {next(tokens)}"},
+            )
+            refreshed += REFRESHED_TOKEN_HEADER in result.headers
+
+        with count_statements(engine) as statements:
+            durations = timed(request, USERS)
+
+        writes = sum(statements[keyword] for keyword in WRITE_STATEMENTS)
+        print(
+            f"{name:<24} | writes/request {writes / USERS:4.2f} | "
+            f"statements/request {sum(statements.values()) / USERS:4.2f} | "
+            f"refreshed {refreshed / USERS:4.2f} | {summarize(durations)}"
+        )
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Helpers shared by the benchmarks.
+
+Benchmarks run against the `testing` database and recreate its tables, just
+like the test suite. Run them as modules, e.g.
+
+    python -m api.benchmarks.bench_token_refresh
+"""
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Callable, Iterator, List
+
+import jwt
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+
+from api.config.config import get_db_uri, get_jwt_secret_key, settings
+from api.repository.models import Base, User, UserAuth
+
+WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE")
+
+
+def create_test_engine() -> Engine:
+    """
+    Switches settings to the `testing` environment and connects to its
+    database.
+    """
+    settings.configure(FORCE_ENV_FOR_DYNACONF="testing")
+    # Request logging would dominate the timings.
+    logging.disable(logging.INFO)
+    return create_engine(get_db_uri())
+
+
+def create_session_factory(engine: Engine) -> Callable[[], Session]:
+    return sessionmaker(bind=engine, expire_on_commit=False)
+
+
+def reset_database(engine: Engine, users: int = 1) -> None:
+    """
+    Recreates the tables with `users` users named `user_<n>`.
+    """
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        for n in range(1, users + 1):
+            user = User()
+            session.add(user)
+            session.add(
+                UserAuth(
+                    username=f"user_{n}",
+                    password=f"password_{n}",
+                    created_at=date.today(),
+                    last_login=date.today(),
+                    token="",
+                    user=user,
+                )
+            )
+        session.commit()
+
+
+def create_token(user_id: int, expires_in: timedelta = timedelta(minutes=5)) -> str:
+    data = {
+        "exp": str(int((datetime.now() + expires_in).timestamp())),
+        "user_auth_id": str(user_id),
+        "user_auth_username": f"user_{user_id}",
+        "user_auth_user_id": str(user_id),
+    }
+    return jwt.encode(data, get_jwt_secret_key(), algorithm="HS256")
+
+
+@contextmanager
+def count_statements(engine: Engine) -> Iterator[Counter]:
+    """
+    Counts the statements sent to `engine` by their first keyword.
+    """
+    counter = Counter()
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        counter[statement.lstrip().split(None, 1)[0].upper()] += 1
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def timed(fn: Callable[[], object], repeat: int) -> List[float]:
+    """
+    Calls `fn` `repeat` times and returns each call's duration in seconds.
+    """
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def summarize(durations: List[float]) -> str:
+    durations = sorted(durations)
+    mean = sum(durations) / len(durations)
+    p50 = durations[len(durations) // 2]
+    p95 = durations[int(len(durations) * 0.95)]
+    return (
+        f"mean {mean * 1e6:9.1f} us | p50 {p50 * 1e6:9.1f} us | p95 {p95 * 1e6:9.1f} us"
+    )
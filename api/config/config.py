@@ -1,4 +1,5 @@
 import os
+from typing import Dict, List, Optional
 
 from dynaconf import Dynaconf
 
@@ -24,13 +25,161 @@ def get_db_uri() -> str:
     return f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
 
 
+def get_async_db_uri() -> str:
+    return get_db_uri().replace("postgresql://", "postgresql+asyncpg://", 1)
+
+
+def get_db_replica_uris() -> List[str]:
+    uris = []
+    for replica in settings.get("DB_REPLICAS", []):
+        db_name = replica.get("DB_NAME", settings.DB_NAME)
+        db_user = replica.get("DB_USER", settings.DB_USER)
+        db_password = replica.get("DB_PASSWORD", settings.DB_PASSWORD)
+        db_host = replica.get("DB_HOST", settings.DB_HOST)
+        db_port = replica.get("DB_PORT", settings.DB_PORT)
+        uris.append(
+            f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
+        )
+    return uris
+
+
+def get_async_db_replica_uris() -> List[str]:
+    return [
+        db_uri.replace("postgresql://", "postgresql+asyncpg://", 1)
+        for db_uri in get_db_replica_uris()
+    ]
+
+
+def get_db_read_your_writes_window() -> float:
+    return settings.get("DB_READ_YOUR_WRITES_WINDOW", 5)
+
+
+def get_db_read_your_writes_redis_url() -> Optional[str]:
+    return settings.get("DB_READ_YOUR_WRITES_REDIS_URL")
+
+
+def get_db_engine_options() -> dict:
+    return {
+        "pool_size": settings.get("DB_POOL_SIZE", 5),
+        "max_overflow": settings.get("DB_MAX_OVERFLOW", 10),
+        "pool_pre_ping": settings.get("DB_POOL_PRE_PING", True),
+        "pool_recycle": settings.get("DB_POOL_RECYCLE", 1800),
+        "echo": settings.get("DB_ECHO", False),
+    }
+
+
+def get_db_prepared_statement_cache_size() -> int:
+    return settings.get("DB_PREPARED_STATEMENT_CACHE_SIZE", 100)
+
+
 def get_logging_conf() -> str:
     return current_directory + "/" + settings.LOGGING_CONFIG
 
 
-def get_jwt_secret_key() -> str:
-    return settings.JWT_SECRET_KEY
+def get_jwt_secret_key() -> Optional[str]:
+    return settings.get("JWT_SECRET_KEY")
+
+
+def get_jwt_keys() -> Dict[str, str]:
+    return {key["kid"]: key["secret"] for key in settings.get("JWT_KEYS", [])}
+
+
+def get_jwt_active_kid() -> Optional[str]:
+    return settings.get("JWT_ACTIVE_KID")
 
 
 def get_auth_ttl() -> int:
     return settings.AUTHENTICATION_TTL
+
+
+def get_auth_refresh_threshold() -> int:
+    return settings.get("AUTHENTICATION_REFRESH_THRESHOLD", 1)
+
+
+def get_revocation_refresh_interval() -> float:
+    return settings.get("REVOCATION_REFRESH_INTERVAL", 2)
+
+
+def get_revocation_bloom_capacity() -> int:
+    return settings.get("REVOCATION_BLOOM_CAPACITY", 10000)
+
+
+def get_password_hash_options() -> dict:
+    return {
+        "n": settings.get("PASSWORD_HASH_N", 2**14),
+        "r": settings.get("PASSWORD_HASH_R", 8),
+        "p": settings.get("PASSWORD_HASH_P", 1),
+    }
+
+
+def get_password_hash_workers() -> int:
+    return settings.get("PASSWORD_HASH_WORKERS", 2)
+
+
+def get_password_hash_queue_size() -> int:
+    return settings.get("PASSWORD_HASH_QUEUE_SIZE", 16)
+
+
+def get_rate_limit_enabled() -> bool:
+    return settings.get("RATE_LIMIT_ENABLED", True)
+
+
+def get_rate_limit_rules() -> Dict[str, dict]:
+    return {
+        "api": {
+            "rate": settings.get("RATE_LIMIT_API_RATE", 20),
+            "burst": settings.get("RATE_LIMIT_API_BURST", 100),
+        },
+        "login_ip": {
+            "rate": settings.get("RATE_LIMIT_LOGIN_IP_RATE", 1),
+            "burst": settings.get("RATE_LIMIT_LOGIN_IP_BURST", 10),
+        },
+        "login_username": {
+            "rate": settings.get("RATE_LIMIT_LOGIN_USERNAME_RATE", 0.1),
+            "burst": settings.get("RATE_LIMIT_LOGIN_USERNAME_BURST", 5),
+        },
+    }
+
+
+def get_rate_limit_shards() -> int:
+    return settings.get("RATE_LIMIT_SHARDS", 16)
+
+
+def get_rate_limit_max_keys() -> int:
+    return settings.get("RATE_LIMIT_MAX_KEYS", 100000)
+
+
+def get_rate_limit_redis_url() -> Optional[str]:
+    return settings.get("RATE_LIMIT_REDIS_URL")
+
+
+def get_rate_limit_trusted_proxies() -> int:
+    return settings.get("RATE_LIMIT_TRUSTED_PROXIES", 0)
+
+
+def get_token_cache_size() -> int:
+    return settings.get("TOKEN_CACHE_SIZE", 1024)
+
+
+def get_token_cache_ttl() -> int:
+    return settings.get("TOKEN_CACHE_TTL", 60)
+
+
+def get_lookup_cache_size() -> int:
+    return settings.get("LOOKUP_CACHE_SIZE", 1024)
+
+
+def get_lookup_cache_ttl() -> int:
+    return settings.get("LOOKUP_CACHE_TTL", 60)
+
+
+def get_mood_loader() -> str:
+    return settings.get("MOOD_LOADER", "selectin")
+
+
+def get_page_size() -> int:
+    return settings.get("PAGE_SIZE", 50)
+
+
+def get_max_page_size() -> int:
+    return settings.get("MAX_PAGE_SIZE", 500)
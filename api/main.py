@@ -1,18 +1,18 @@
 import logging
 import logging.config
+from typing import Optional
 
 import falcon
 
-from api.config.config import get_logging_conf
+from api.config.config import get_logging_conf, get_rate_limit_enabled
 from api.middleware.auth import AuthMiddleware
+from api.middleware.key_ring import KeyRing
+from api.middleware.passwords import PasswordHasher
+from api.middleware.rate_limit import RateLimitMiddleware
+from api.middleware.revocation import RevocationList
+from api.middleware.session import SessionMiddleware
 from api.repository.unit_of_work import AbstractUnitOfWork, SQLAlchemyUnitOfWork
-from api.resources.exercises import ExercisesResource
-from api.resources.food import FoodResource
-from api.resources.humor import HumorResource
-from api.resources.login import LoginResource
-from api.resources.mood import MoodResource
-from api.resources.sleep import SleepResource
-from api.resources.water import WaterResource
+from api.routes import load_routes
 
 logging.config.fileConfig(get_logging_conf())
 simpleLogger = logging.getLogger("simpleLogger")
@@ -20,49 +20,31 @@ simpleLogger = logging.getLogger("simpleLogger")
 uow = SQLAlchemyUnitOfWork()
 
 
-def load_routes(app: falcon.App, uow: AbstractUnitOfWork) -> None:
-    simpleLogger.info("Starting loading routes.")
-    with uow:
-        app.add_route("/login", LoginResource(uow))
-        app.add_route("/register", LoginResource(uow), suffix="register")
-
-        app.add_route("/humor", HumorResource(uow), suffix="add")
-        app.add_route("/humor/{humor_id}", HumorResource(uow))
-        app.add_route("/humor/date/{humor_date}", HumorResource(uow), suffix="date")
-
-        app.add_route("/water-intake", WaterResource(uow), suffix="add")
-        app.add_route("/water-intake/{water_intake_id}", WaterResource(uow))
-        app.add_route(
-            "/water-intake/date/{water_intake_date}", WaterResource(uow), suffix="date"
-        )
-
-        app.add_route("/exercises", ExercisesResource(uow), suffix="add")
-        app.add_route("/exercises/{exercises_id}", ExercisesResource(uow))
-        app.add_route(
-            "/exercises/date/{exercises_date}", ExercisesResource(uow), suffix="date"
-        )
-
-        app.add_route("/food", FoodResource(uow), suffix="add")
-        app.add_route("/food/{food_id}", FoodResource(uow))
-        app.add_route("/food/date/{food_date}", FoodResource(uow), suffix="date")
-
-        app.add_route("/sleep", SleepResource(uow), suffix="add")
-        app.add_route("/sleep/{sleep_id}", SleepResource(uow))
-        app.add_route("/sleep/date/{sleep_date}", SleepResource(uow), suffix="date")
-
-        app.add_route("/mood", MoodResource(uow))
-        app.add_route("/mood/{mood_id}", MoodResource(uow))
-        app.add_route("/mood/date/{mood_date}", MoodResource(uow), suffix="date")
-    simpleLogger.info("Routes added.")
-
-
-def run(uow: AbstractUnitOfWork) -> falcon.App:
+def run(
+    uow: AbstractUnitOfWork,
+    key_ring: Optional[KeyRing] = None,
+    revocations: Optional[RevocationList] = None,
+    password_hasher: Optional[PasswordHasher] = None,
+    rate_limiter: Optional[RateLimitMiddleware] = None,
+) -> falcon.App:
     simpleLogger.info("Starting the application.")
-    middlewares = [AuthMiddleware(uow)]
+    key_ring = key_ring or KeyRing.from_settings()
+    if revocations is None:
+        revocations = RevocationList()
+    if password_hasher is None:
+        password_hasher = PasswordHasher()
+    if rate_limiter is None and get_rate_limit_enabled():
+        rate_limiter = RateLimitMiddleware.from_settings()
+    middlewares = [SessionMiddleware(uow)]
+    if rate_limiter is not None:
+        middlewares.append(rate_limiter)
+    middlewares.append(AuthMiddleware(uow, key_ring, revocations))
     app = falcon.App(middleware=middlewares)
-    load_routes(app, uow)
+    load_routes(app, uow, key_ring, revocations, password_hasher)
 
     return app
 
 
-app = application = run(uow=uow)
+key_ring = KeyRing.from_settings()
+key_ring.install_reload_signal()
+app = application = run(uow=uow, key_ring=key_ring)
@@ -1,11 +1,24 @@
+import hashlib
 import logging
 import logging.config
+import time
 from datetime import datetime, timedelta
+from typing import Optional
 
 import falcon
 import jwt
 
-from api.config.config import get_jwt_secret_key, get_logging_conf
+from api.config.config import (
+    get_auth_refresh_threshold,
+    get_auth_ttl,
+    get_logging_conf,
+    get_token_cache_size,
+    get_token_cache_ttl,
+)
+from api.middleware.key_ring import KeyRing
+from api.middleware.principal import Principal
+from api.middleware.revocation import RevocationList
+from api.repository.cache import LookupCache
 from api.repository.unit_of_work import AbstractUnitOfWork
 from api.resources.base import Resource
 
@@ -13,18 +26,53 @@ logging.config.fileConfig(get_logging_conf())
 simpleLogger = logging.getLogger("simpleLogger")
 detailedLogger = logging.getLogger("detailedLogger")
 
+REFRESHED_TOKEN_HEADER = "X-Auth-Token"
+
 
 class AuthMiddleware:
-    def __init__(self, uow: AbstractUnitOfWork) -> None:
+    """
+    Authenticates every request but `/login` and `/register` by its bearer
+    token.
+
+    Verified claims are kept in `token_cache`, keyed by a digest of the token
+    and the key ring version, until the token expires, so a client repeating
+    its token skips the signature check. Revocation is still checked on every
+    request.
+
+    The token TTL and refresh threshold are read once, and again after the
+    key ring reloads, since a reload re-reads the settings.
+    """
+
+    def __init__(
+        self,
+        uow: AbstractUnitOfWork,
+        key_ring: KeyRing,
+        revocations: RevocationList,
+        token_cache: Optional[LookupCache] = None,
+    ) -> None:
         self.uow = uow
+        self.key_ring = key_ring
+        self.revocations = revocations
+        if token_cache is None:
+            token_cache = LookupCache(
+                maxsize=get_token_cache_size(),
+                ttl=get_token_cache_ttl(),
+                clock=time.time,
+            )
+        self.token_cache = token_cache
         self.ignore_paths = ["/login", "/register"]
+        self._load_token_lifetimes()
+
+    def _load_token_lifetimes(self) -> None:
+        self.auth_ttl = timedelta(minutes=get_auth_ttl())
+        self.refresh_threshold = timedelta(minutes=get_auth_refresh_threshold())
+        self._lifetimes_version = self.key_ring.version
 
     def process_request(self, req: falcon.Request, resp: falcon.Response):
         if req.path in self.ignore_paths:
             return
 
         simpleLogger.info(f"Checking Authentication for {req.path}")
-        secret_key = get_jwt_secret_key()
         auth_header = req.get_header("Authorization")
         if not auth_header:
             simpleLogger.debug("No Authorization in header")
@@ -32,7 +80,7 @@ class AuthMiddleware:
 
         try:
             token = auth_header.split()[1]
-            decoded = jwt.decode(token, secret_key, algorithms=["HS256"])
+            decoded = self._decode(token)
         except IndexError:
             simpleLogger.debug("Token malformed.")
             raise falcon.HTTPUnauthorized(description="Token malformed.")
@@ -43,14 +91,50 @@ class AuthMiddleware:
             simpleLogger.debug("Invalid token.")
             raise falcon.HTTPUnauthorized(description="Invalid token.")
 
-        username = decoded.get("user_auth_username")
+        self.revocations.refresh_if_due(self.uow)
+        if self.revocations.is_revoked(decoded):
+            simpleLogger.debug("Token revoked.")
+            raise falcon.HTTPUnauthorized(description="Token revoked.")
+
+        principal = Principal.from_claims(decoded)
+        if principal is None:
+            principal = self._load_principal(decoded.get("user_auth_username"))
+
+        req.context["principal"] = principal
+        req.context["username"] = principal.username
+        req.context["token_claims"] = decoded
+        simpleLogger.info("Authentication successful.")
+
+    def _decode(self, token: str) -> dict:
+        key = (
+            self.key_ring.version,
+            hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest(),
+        )
+        decoded = self.token_cache.get(key)
+        if decoded is not None:
+            return decoded
+
+        decoded = self.key_ring.decode(token)
+        ttl = None
+        if "exp" in decoded:
+            ttl = int(decoded["exp"]) - self.token_cache.clock()
+        self.token_cache.set(key, decoded, ttl)
+        return decoded
+
+    def _load_principal(self, username: str) -> Principal:
+        """
+        Looks the principal up for tokens issued before their claims carried
+        the user ids.
+        """
         user_auth = self.uow.repository.get_user_auth_by_username(username)
         if not user_auth:
             simpleLogger.debug("Invalid username.")
             raise falcon.HTTPUnauthorized(description="Invalid username.")
-
-        req.context["username"] = username
-        simpleLogger.info("Authentication successful.")
+        return Principal(
+            user_id=user_auth.user_id,
+            user_auth_id=user_auth.id,
+            username=user_auth.username,
+        )
 
     def process_response(
         self,
@@ -59,31 +143,26 @@ class AuthMiddleware:
         resource: Resource,
         req_succeeded: bool,
     ) -> None:
-        if req.path in self.ignore_paths:
+        """
+        Re-issues the token in the `X-Auth-Token` header when it is about to
+        expire. The new token is built from the verified claims, so this
+        never touches the database.
+        """
+        claims = req.context.get("token_claims")
+        if req.path in self.ignore_paths or not claims or "exp" not in claims:
             return
 
-        simpleLogger.info(f"Refreshing token for {req.path}.")
-        secret_key = get_jwt_secret_key()
-        user_auth = self.uow.repository.get_user_auth_by_username(
-            req.context.get("username")
-        )
-        if not user_auth:
-            simpleLogger.debug("Invalid user. Token not refreshed.")
+        if self._lifetimes_version != self.key_ring.version:
+            self._load_token_lifetimes()
+        expires_at = datetime.fromtimestamp(int(claims["exp"]))
+        if expires_at - datetime.now() > self.refresh_threshold:
             return
 
+        simpleLogger.info(f"Refreshing token for {req.path}.")
         refresh_data = {
-            "exp": str(int((datetime.now() + timedelta(minutes=5)).timestamp())),
-            "user_auth_id": str(user_auth.id),
-            "user_auth_username": str(user_auth.username),
-            "user_auth_user_id": str(user_auth.user_id),
-            "user_auth_last_login": str(user_auth.last_login),
+            **claims,
+            "exp": str(int((datetime.now() + self.auth_ttl).timestamp())),
         }
-        token = jwt.encode(refresh_data, secret_key, algorithm="HS256")
-        try:
-            self.uow.repository.update_user_auth(user_auth, {"token": token})
-            self.uow.commit()
-        except Exception as e:
-            detailedLogger.error("Could not refresh token to user_auth.", exc_info=True)
-            raise e
-
+        token = self.key_ring.encode(refresh_data)
+        resp.set_header(REFRESHED_TOKEN_HEADER, token)
         simpleLogger.info("Successfully refreshed token.")
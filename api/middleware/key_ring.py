@@ -0,0 +1,127 @@
+import logging
+import logging.config
+import signal
+from typing import Callable, Dict, Optional, Tuple
+
+import jwt
+
+from api.config.config import (
+    get_jwt_active_kid,
+    get_jwt_keys,
+    get_jwt_secret_key,
+    get_logging_conf,
+    settings,
+)
+
+logging.config.fileConfig(get_logging_conf())
+simpleLogger = logging.getLogger("simpleLogger")
+detailedLogger = logging.getLogger("detailedLogger")
+
+ALGORITHM = "HS256"
+
+# Keys by `kid`. The `None` entry verifies tokens issued without a `kid`.
+Keys = Dict[Optional[str], str]
+
+
+def load_keys_from_settings() -> Tuple[Keys, Optional[str]]:
+    """
+    Reads the keys and the id of the signing key from the settings.
+    """
+    configured = get_jwt_keys()
+    keys: Keys = dict(configured)
+    legacy_key = get_jwt_secret_key()
+    if legacy_key:
+        keys[None] = legacy_key
+
+    active_kid = get_jwt_active_kid()
+    if active_kid is None and configured:
+        active_kid = list(configured)[-1]
+    return keys, active_kid
+
+
+class KeyRing:
+    """
+    The keys used to sign and verify tokens, loaded once instead of on every
+    request.
+
+    Tokens are signed with the active key and carry its `kid` in their
+    header, which verification uses to pick the key. To rotate a secret
+    without rejecting tokens in flight:
+
+        1. add the new key to `JWT_KEYS` and reload;
+        2. make it active with `JWT_ACTIVE_KID` and reload;
+        3. remove the old key once `AUTHENTICATION_TTL` has passed, and reload.
+
+    `reload` swaps the whole key set at once, so requests being verified
+    concurrently see either the old or the new keys, and bumps `version`, so
+    anything verified with the old keys can be told apart.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Tuple[Keys, Optional[str]]] = load_keys_from_settings,
+    ) -> None:
+        self.loader = loader
+        self.version = 0
+        self._state = self._load()
+
+    @classmethod
+    def from_settings(cls) -> "KeyRing":
+        return cls(load_keys_from_settings)
+
+    @property
+    def active_kid(self) -> Optional[str]:
+        return self._state[1]
+
+    def _load(self) -> Tuple[Keys, Optional[str]]:
+        keys, active_kid = self.loader()
+        if active_kid not in keys:
+            raise ValueError(f"Active JWT key {active_kid!r} is not configured.")
+        return dict(keys), active_kid
+
+    def reload(self) -> None:
+        """
+        Loads the keys again, keeping the current ones if that fails.
+        """
+        try:
+            if self.loader is load_keys_from_settings:
+                settings.reload()
+            self._state = self._load()
+            self.version += 1
+        except Exception:
+            detailedLogger.error("Could not reload the JWT keys.", exc_info=True)
+            return
+        simpleLogger.info(f"Reloaded the JWT keys, signing with {self.active_kid!r}.")
+
+    def install_reload_signal(self, signum: int = getattr(signal, "SIGHUP", 0)) -> None:
+        """
+        Reloads the keys whenever the process receives `signum`.
+        """
+        if not signum:
+            return
+        try:
+            signal.signal(signum, lambda *args: self.reload())
+        except ValueError:
+            # Signal handlers can only be set from the main thread.
+            simpleLogger.debug("Could not install the JWT keys reload signal.")
+
+    def encode(self, claims: dict) -> str:
+        keys, active_kid = self._state
+        headers = {"kid": active_kid} if active_kid is not None else None
+        return jwt.encode(
+            claims, keys[active_kid], algorithm=ALGORITHM, headers=headers
+        )
+
+    def decode(self, token: str) -> dict:
+        """
+        Verifies `token` with the key named by its `kid`.
+
+        Raises `jwt.InvalidTokenError` when the token is invalid, expired or
+        names an unknown key.
+        """
+        keys, _ = self._state
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = keys.get(kid)
+        if key is None:
+            raise jwt.InvalidTokenError(f"Unknown key id {kid!r}.")
+        return jwt.decode(token, key, algorithms=[ALGORITHM])
@@ -0,0 +1,145 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import logging
+import logging.config
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from sqlalchemy.util import await_only
+
+from api.config.config import (
+    get_logging_conf,
+    get_password_hash_options,
+    get_password_hash_queue_size,
+    get_password_hash_workers,
+)
+
+logging.config.fileConfig(get_logging_conf())
+simpleLogger = logging.getLogger("simpleLogger")
+detailedLogger = logging.getLogger("detailedLogger")
+
+SCHEME = "scrypt"
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+
+class PasswordHasherBusy(Exception):
+    """
+    Raised when every worker is busy and the queue is full.
+    """
+
+
+class PasswordHasher:
+    """
+    Hashes and verifies passwords with scrypt in a bounded thread pool.
+
+    Hashes are stored as `scrypt$<n>$<r>$<p>$<salt>$<key>`, so changing the
+    cost in the settings only affects new hashes, and `needs_rehash` tells
+    which stored ones to upgrade. Passwords stored before hashing existed are
+    compared as they are and always need a rehash.
+
+    scrypt releases the GIL, so `workers` threads hash in parallel while the
+    request threads wait. At most `workers + queue_size` jobs are accepted at
+    once; past that `PasswordHasherBusy` is raised instead of queueing, so a
+    login storm can't hold every request thread.
+
+    Called from an ASGI responder, the wait is awaited on the event loop
+    through SQLAlchemy's greenlet instead of blocking it.
+    """
+
+    def __init__(
+        self,
+        n: Optional[int] = None,
+        r: Optional[int] = None,
+        p: Optional[int] = None,
+        workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+    ) -> None:
+        options = get_password_hash_options()
+        self.n = n or options["n"]
+        self.r = r or options["r"]
+        self.p = p or options["p"]
+        self.workers = workers or get_password_hash_workers()
+        self.queue_size = (
+            get_password_hash_queue_size() if queue_size is None else queue_size
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="password-hasher"
+        )
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+
+    def hash(self, password: str) -> str:
+        salt = os.urandom(SALT_BYTES)
+        key = self._run(self._derive, password, salt, self.n, self.r, self.p)
+        return "$".join(
+            [
+                SCHEME,
+                str(self.n),
+                str(self.r),
+                str(self.p),
+                base64.b64encode(salt).decode("ascii"),
+                base64.b64encode(key).decode("ascii"),
+            ]
+        )
+
+    def verify(self, password: str, stored: str) -> bool:
+        if not stored.startswith(f"{SCHEME}$"):
+            return hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8"))
+
+        try:
+            _, n, r, p, salt, key = stored.split("$")
+            n, r, p = int(n), int(r), int(p)
+            salt, key = base64.b64decode(salt), base64.b64decode(key)
+        except ValueError:
+            detailedLogger.error("Malformed password hash.", exc_info=True)
+            return False
+        derived = self._run(self._derive, password, salt, n, r, p)
+        return hmac.compare_digest(derived, key)
+
+    def needs_rehash(self, stored: str) -> bool:
+        return not stored.startswith(f"{SCHEME}${self.n}${self.r}${self.p}$")
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    @staticmethod
+    def _derive(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+        return hashlib.scrypt(
+            password.encode("utf-8"),
+            salt=salt,
+            n=n,
+            r=r,
+            p=p,
+            maxmem=256 * n * r * p + 2**20,
+            dklen=KEY_BYTES,
+        )
+
+    def _run(self, fn: Callable[..., bytes], *args: Any) -> bytes:
+        if not self._slots.acquire(blocking=False):
+            simpleLogger.debug("Password hasher is busy.")
+            raise PasswordHasherBusy()
+
+        def job() -> bytes:
+            try:
+                return fn(*args)
+            finally:
+                self._slots.release()
+
+        try:
+            future = self._executor.submit(job)
+        except Exception:
+            self._slots.release()
+            raise
+        return self._wait(future)
+
+    @staticmethod
+    def _wait(future: Future) -> bytes:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return future.result()
+        return await_only(asyncio.wrap_future(future, loop=loop))
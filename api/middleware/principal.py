@@ -0,0 +1,29 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    The authenticated user of a request, as attached by `AuthMiddleware` to
+    `req.context["principal"]`.
+    """
+
+    user_id: int
+    user_auth_id: int
+    username: str
+
+    @classmethod
+    def from_claims(cls, claims: dict) -> Optional["Principal"]:
+        """
+        Builds a principal from verified token claims, or returns None when
+        the claims don't identify the user completely.
+        """
+        try:
+            return cls(
+                user_id=int(claims["user_auth_user_id"]),
+                user_auth_id=int(claims["user_auth_id"]),
+                username=str(claims["user_auth_username"]),
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
@@ -0,0 +1,270 @@
+import asyncio
+import io
+import json
+import logging
+import logging.config
+import math
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import falcon
+
+from api.config.config import (
+    get_logging_conf,
+    get_rate_limit_max_keys,
+    get_rate_limit_redis_url,
+    get_rate_limit_rules,
+    get_rate_limit_shards,
+    get_rate_limit_trusted_proxies,
+)
+
+logging.config.fileConfig(get_logging_conf())
+simpleLogger = logging.getLogger("simpleLogger")
+detailedLogger = logging.getLogger("detailedLogger")
+
+
+@dataclass(frozen=True)
+class Limit:
+    """
+    A token bucket refilled with `rate` tokens per second, holding at most
+    `burst` tokens. Every request takes one.
+    """
+
+    rate: float
+    burst: int
+
+
+class AbstractBucketStore(ABC):
+    # Whether `take` does I/O, and must not run on the event loop.
+    blocking: bool
+
+    @abstractmethod
+    def take(self, key: str, limit: Limit) -> float:
+        """
+        Takes a token from the bucket of `key`, returning 0, or, when it is
+        empty, the seconds until it holds one again.
+        """
+        raise NotImplementedError
+
+
+class MemoryBucketStore(AbstractBucketStore):
+    """
+    Token buckets of a single process.
+
+    Buckets are spread over `shards` dicts, each with its own lock, so
+    requests for different keys rarely wait on each other. Once the buckets
+    outnumber `max_keys`, the ones refilled to their burst are dropped, since
+    they'd be recreated in the same state, then the oldest ones.
+    """
+
+    blocking = False
+
+    def __init__(
+        self,
+        shards: int = 16,
+        max_keys: int = 100000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.clock = clock
+        self.max_keys_per_shard = max(1, max_keys // shards)
+        # Buckets by key, as (tokens, updated_at, full_at).
+        self._shards: List[Dict[str, Tuple[float, float, float]]] = [
+            {} for _ in range(shards)
+        ]
+        self._locks = [threading.Lock() for _ in range(shards)]
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    def take(self, key: str, limit: Limit) -> float:
+        index = zlib.crc32(key.encode("utf-8")) % len(self._shards)
+        shard = self._shards[index]
+        with self._locks[index]:
+            now = self.clock()
+            tokens, updated_at, _ = shard.pop(key, (limit.burst, now, now))
+            tokens = min(limit.burst, tokens + (now - updated_at) * limit.rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / limit.rate
+            shard[key] = (tokens, now, now + (limit.burst - tokens) / limit.rate)
+            if len(shard) > self.max_keys_per_shard:
+                self._prune(shard, now)
+            return wait
+
+    def _prune(self, shard: Dict[str, Tuple[float, float, float]], now: float) -> None:
+        for key in [key for key, bucket in shard.items() if bucket[2] <= now]:
+            del shard[key]
+        while len(shard) > self.max_keys_per_shard:
+            del shard[next(iter(shard))]
+
+
+# Refills and takes from a bucket stored as a hash, using the server's clock so
+# every worker agrees on the time. Returns the wait as a string, since Redis
+# truncates Lua numbers to integers.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local time = redis.call("TIME")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "updated_at")
+local tokens = tonumber(bucket[1]) or burst
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call("HSET", KEYS[1], "tokens", tokens, "updated_at", now)
+redis.call("EXPIRE", KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisBucketStore(AbstractBucketStore):
+    """
+    Token buckets kept in Redis, so the limits hold across gunicorn workers
+    and instances.
+
+    Each take is one atomic script call. When Redis can't be reached the
+    request is let through, as a rate limiter must not take the API down.
+    """
+
+    blocking = True
+
+    def __init__(self, client, prefix: str = "rate_limit:") -> None:
+        self.prefix = prefix
+        self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBucketStore":
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError(
+                "RATE_LIMIT_REDIS_URL is set but the redis package is not installed."
+            )
+        return cls(redis.Redis.from_url(url))
+
+    def take(self, key: str, limit: Limit) -> float:
+        try:
+            wait = self._script(
+                keys=[self.prefix + key], args=[limit.rate, limit.burst]
+            )
+        except Exception:
+            detailedLogger.error("Could not reach the rate limit store.", exc_info=True)
+            return 0.0
+        return float(wait)
+
+
+class RateLimitMiddleware:
+    """
+    Rejects requests with `429 Too Many Requests` and a `Retry-After` header
+    once their client runs out of tokens.
+
+    Every request takes from the bucket of its IP address. `/login` and
+    `/register` take from stricter buckets instead, one per IP address and
+    one per username, so credential stuffing is slowed down both from one
+    address and against one account.
+
+    It runs before `AuthMiddleware`, so rejected requests never reach the
+    database. The username is read from the body, which is then put back for
+    the resource; under ASGI the body is left in `req.context["body"]`.
+    """
+
+    def __init__(
+        self,
+        store: AbstractBucketStore,
+        api_limit: Limit,
+        login_ip_limit: Limit,
+        login_username_limit: Limit,
+        trusted_proxies: int = 0,
+    ) -> None:
+        self.store = store
+        self.api_limit = api_limit
+        self.login_ip_limit = login_ip_limit
+        self.login_username_limit = login_username_limit
+        self.trusted_proxies = trusted_proxies
+        self.login_paths = ["/login", "/register"]
+
+    @classmethod
+    def from_settings(cls) -> "RateLimitMiddleware":
+        redis_url = get_rate_limit_redis_url()
+        if redis_url:
+            store = RedisBucketStore.from_url(redis_url)
+        else:
+            store = MemoryBucketStore(
+                shards=get_rate_limit_shards(), max_keys=get_rate_limit_max_keys()
+            )
+        rules = get_rate_limit_rules()
+        return cls(
+            store,
+            api_limit=Limit(**rules["api"]),
+            login_ip_limit=Limit(**rules["login_ip"]),
+            login_username_limit=Limit(**rules["login_username"]),
+            trusted_proxies=get_rate_limit_trusted_proxies(),
+        )
+
+    def process_request(self, req: falcon.Request, resp: falcon.Response) -> None:
+        username = None
+        if self._is_login(req):
+            body = req.stream.read(req.content_length or 0)
+            req.stream = io.BytesIO(body)
+            username = self._username(body)
+        self._check(req, username)
+
+    async def process_request_async(self, req, resp) -> None:
+        username = None
+        if self._is_login(req):
+            body = await req.stream.read()
+            req.context["body"] = body
+            username = self._username(body)
+        if self.store.blocking:
+            await asyncio.to_thread(self._check, req, username)
+        else:
+            self._check(req, username)
+
+    def _is_login(self, req: falcon.Request) -> bool:
+        return req.method == "POST" and req.path in self.login_paths
+
+    @staticmethod
+    def _username(body: bytes) -> Optional[str]:
+        try:
+            username = json.loads(body.decode("utf-8")).get("username")
+        except (AttributeError, UnicodeDecodeError, ValueError):
+            return None
+        return None if username is None else str(username)
+
+    def _address(self, req: falcon.Request) -> str:
+        """
+        Returns the address of the client, as seen by the outermost of the
+        `trusted_proxies` in front of the app. The addresses before it in the
+        forwarded headers are sent by the client, so they can't be trusted.
+        """
+        if not self.trusted_proxies:
+            return req.remote_addr
+        route = req.access_route
+        return route[max(0, len(route) - 1 - self.trusted_proxies)]
+
+    def _check(self, req: falcon.Request, username: Optional[str]) -> None:
+        address = self._address(req)
+        if not self._is_login(req):
+            buckets = [(f"api:{address}", self.api_limit)]
+        else:
+            buckets = [(f"login_ip:{address}", self.login_ip_limit)]
+            if username is not None:
+                buckets.append((f"login_user:{username}", self.login_username_limit))
+
+        wait = max(self.store.take(key, limit) for key, limit in buckets)
+        if wait > 0:
+            simpleLogger.debug(f"Rate limit reached for {address} on {req.path}.")
+            raise falcon.HTTPTooManyRequests(
+                description="Too many requests.", retry_after=math.ceil(wait)
+            )
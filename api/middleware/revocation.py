@@ -0,0 +1,182 @@
+import hashlib
+import logging
+import logging.config
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from api.config.config import (
+    get_logging_conf,
+    get_revocation_bloom_capacity,
+    get_revocation_refresh_interval,
+)
+from api.repository.models import TokenRevocation
+from api.repository.unit_of_work import AbstractUnitOfWork
+
+logging.config.fileConfig(get_logging_conf())
+simpleLogger = logging.getLogger("simpleLogger")
+detailedLogger = logging.getLogger("detailedLogger")
+
+
+class BloomFilter:
+    """
+    Fixed-size set of strings that may report false positives, never false
+    negatives.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01) -> None:
+        capacity = max(capacity, 1)
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+class RevocationList:
+    """
+    In-memory copy of the `token_revocation` table.
+
+    Revoked token ids go in a Bloom filter backed by an exact map, so the
+    check for a token that was not revoked, the common case, rarely goes
+    further than the filter. Users whose tokens were all revoked map to the
+    time of the revocation, and their tokens issued before it are rejected.
+    Tokens without an `iat` predate the revocation list, so they count as
+    issued before any revocation.
+
+    `refresh_if_due` fetches the revocations added since the last version
+    seen, at most every `refresh_interval` seconds, so a token revoked by
+    another instance is rejected within that time. It also drops the
+    revocations whose tokens have all expired.
+    """
+
+    def __init__(
+        self,
+        refresh_interval: Optional[float] = None,
+        capacity: Optional[int] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.refresh_interval = (
+            get_revocation_refresh_interval()
+            if refresh_interval is None
+            else refresh_interval
+        )
+        self.capacity = capacity or get_revocation_bloom_capacity()
+        self.clock = clock
+        self.version = 0
+        self.last_refresh = -math.inf
+        self._tokens: Dict[str, Optional[int]] = {}
+        # `(revoked_at, expires_at)` by user.
+        self._users: Dict[int, Tuple[float, Optional[int]]] = {}
+        self._filter = BloomFilter(self.capacity)
+        # Token ids added to the filter since it was built, expired or not.
+        self._filtered = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._tokens) + len(self._users)
+
+    def is_revoked(self, claims: dict) -> bool:
+        jti = claims.get("jti")
+        if jti is not None and jti in self._filter and jti in self._tokens:
+            return True
+
+        try:
+            revocation = self._users.get(int(claims.get("user_auth_id")))
+        except (TypeError, ValueError):
+            return False
+        if revocation is None:
+            return False
+        revoked_at, _ = revocation
+        issued_at = claims.get("iat")
+        return issued_at is None or float(issued_at) < revoked_at
+
+    def add(self, revocation: TokenRevocation) -> None:
+        with self._lock:
+            self._add(revocation)
+
+    def _add(self, revocation: TokenRevocation) -> None:
+        if revocation.jti is not None:
+            if self._filtered >= self.capacity:
+                self._prune()
+            # Filter first: a token id is only reported once it is in both.
+            self._filter.add(revocation.jti)
+            self._filtered += 1
+            self._tokens[revocation.jti] = revocation.expires_at
+        elif revocation.user_auth_id is not None:
+            revoked_at, expires_at = self._users.get(
+                revocation.user_auth_id, (0, revocation.expires_at)
+            )
+            if expires_at is not None and revocation.expires_at is not None:
+                expires_at = max(expires_at, revocation.expires_at)
+            else:
+                expires_at = None
+            self._users[revocation.user_auth_id] = (
+                max(revoked_at, revocation.revoked_at),
+                expires_at,
+            )
+
+    def _evict_expired(self) -> None:
+        """
+        Drops the token ids and users whose revoked tokens have all expired.
+        Their bits stay in the filter until `_prune` rebuilds it.
+        """
+        now = self.clock()
+        self._tokens = {
+            jti: expires_at
+            for jti, expires_at in self._tokens.items()
+            if expires_at is None or expires_at > now
+        }
+        self._users = {
+            user_auth_id: (revoked_at, expires_at)
+            for user_auth_id, (revoked_at, expires_at) in self._users.items()
+            if expires_at is None or expires_at > now
+        }
+
+    def _prune(self) -> None:
+        """
+        Drops expired revocations and rebuilds the filter, growing it if the
+        remaining ids don't fit.
+        """
+        self._evict_expired()
+        while len(self._tokens) >= self.capacity // 2:
+            self.capacity *= 2
+        bloom_filter = BloomFilter(self.capacity)
+        for jti in self._tokens:
+            bloom_filter.add(jti)
+        self._filter = bloom_filter
+        self._filtered = len(self._tokens)
+
+    def refresh_if_due(self, uow: AbstractUnitOfWork) -> None:
+        if self.clock() - self.last_refresh < self.refresh_interval:
+            return
+        # Another thread is already refreshing; the current list will do.
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self.last_refresh = self.clock()
+            revocations = uow.repository.get_token_revocations_since(self.version)
+            for revocation in revocations:
+                self._add(revocation)
+                self.version = max(self.version, revocation.version)
+            self._evict_expired()
+        except Exception:
+            detailedLogger.error("Could not refresh token revocations.", exc_info=True)
+            uow.rollback()
+        finally:
+            self._lock.release()
@@ -0,0 +1,54 @@
+import logging
+import logging.config
+
+import falcon
+
+from api.config.config import get_logging_conf
+from api.repository.unit_of_work import AbstractUnitOfWork
+from api.resources.base import Resource
+
+logging.config.fileConfig(get_logging_conf())
+simpleLogger = logging.getLogger("simpleLogger")
+detailedLogger = logging.getLogger("detailedLogger")
+
+READ_ONLY_METHODS = ["GET", "HEAD", "OPTIONS"]
+
+
+class SessionMiddleware:
+    """
+    Scopes the Unit of Work's session to a single request.
+
+    Read-only requests are flagged so their queries may go to a replica. The
+    authenticated username is attached once known, which keeps a user reading
+    from the primary right after they write.
+
+    It must be the first middleware of the app, so its `process_response` runs
+    after every other middleware is done with the database.
+    """
+
+    def __init__(self, uow: AbstractUnitOfWork) -> None:
+        self.uow = uow
+
+    def process_request(self, req: falcon.Request, resp: falcon.Response) -> None:
+        self.uow.set_read_only(req.method in READ_ONLY_METHODS)
+
+    def process_resource(
+        self, req: falcon.Request, resp: falcon.Response, resource: Resource, params
+    ) -> None:
+        self.uow.set_read_only(
+            req.method in READ_ONLY_METHODS, req.context.get("username")
+        )
+
+    def process_response(
+        self,
+        req: falcon.Request,
+        resp: falcon.Response,
+        resource: Resource,
+        req_succeeded: bool,
+    ) -> None:
+        try:
+            self.uow.close()
+        except Exception:
+            detailedLogger.error(
+                f"Could not close the session for {req.path}.", exc_info=True
+            )
@@ -1,9 +1,129 @@
+import time
 from abc import ABC, abstractmethod
-from datetime import datetime
-
-from sqlalchemy.orm import Query, Session, joinedload
-
-from api.repository.models import Exercises, Food, Humor, Mood, Sleep, User, UserAuth, Water
+from datetime import date, datetime
+from typing import (
+    Callable,
+    Generic,
+    Hashable,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+from sqlalchemy import delete, event, exists, inspect, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Query, Session, make_transient_to_detached
+
+from api.config.config import get_auth_ttl
+from api.repository.cache import LookupCache
+from api.repository.models import (
+    Exercises,
+    Food,
+    Humor,
+    Mood,
+    Sleep,
+    TokenRevocation,
+    TokenRevocationCounter,
+    User,
+    UserAuth,
+    Water,
+)
+from api.repository.statements import (
+    ENTRIES_BY_DATE_FOR_USER,
+    ENTRY_BY_ID_FOR_USER,
+    MOOD_BY_ID,
+    MOOD_BY_ID_FOR_USER,
+    MOOD_COLLECTIONS,
+    MOOD_DOCUMENT_BY_ID_FOR_USER,
+    MOOD_DOCUMENTS_BY_DATE_FOR_USER,
+    MOOD_EXISTS,
+    MOOD_LOADERS,
+    MOODS_BY_DATE_FOR_USER,
+    USER_AUTH_BY_USERNAME,
+    USER_BY_ID,
+    VIEW_BY_ID_FOR_USER,
+    VIEWS_BY_DATE_FOR_USER,
+    mood_loader_options,
+    select_mood_documents,
+    select_views,
+)
+from api.repository.views import (
+    MODEL_VIEWS,
+    ExercisesView,
+    FoodView,
+    HumorView,
+    SleepView,
+    View,
+    WaterView,
+)
+
+T = TypeVar("T")
+
+# Models the batch methods take. Users and credentials are left out, as
+# they are cached by key, and changing them in bulk would bypass eviction.
+BATCH_MODELS = [Humor, Water, Exercises, Food, Sleep, Mood]
+
+
+class Ownership(NamedTuple, Generic[T]):
+    """
+    A row looked up by id on behalf of a user. `item` is only set when the
+    row belongs to the user, and `found` tells a missing row from one that
+    belongs to someone else.
+    """
+
+    item: Optional[T]
+    found: bool
+
+
+class Deletion(NamedTuple):
+    """
+    The rows deleted by date on behalf of a user. `found` tells whether the
+    date had rows at all, including those of other users.
+    """
+
+    deleted: int
+    found: bool
+
+
+class PageRequest(NamedTuple):
+    """
+    The first `limit` rows after the `after` key, in `(date, id)` order, of
+    those dated between `date_from` and `date_to`, both included, when set.
+    """
+
+    limit: int
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    after: Optional[Tuple[date, int]] = None
+
+
+class Page(NamedTuple, Generic[T]):
+    """
+    The rows of a `PageRequest`. `next_after` is the key to request the next
+    page with, unset on the last one.
+    """
+
+    items: List[T]
+    next_after: Optional[Tuple[date, int]]
+
+
+def user_revocation(user_auth: UserAuth) -> TokenRevocation:
+    """
+    Revokes every token of `user_auth` issued until now. They can't be
+    refreshed from then on, so they are all expired `AUTHENTICATION_TTL`
+    minutes later.
+    """
+    now = time.time()
+    return TokenRevocation(
+        user_auth_id=user_auth.id,
+        revoked_at=round(now, 3),
+        expires_at=int(now) + get_auth_ttl() * 60,
+    )
 
 
 class AbstractRepository(ABC):
@@ -13,87 +133,320 @@ class AbstractRepository(ABC):
     def get_humor_by_id(self, humor_id: int) -> Humor:
         return self._get_humor_by_id(humor_id)
 
+    def get_humor_by_id_for_user(self, humor_id: int, user_id: int) -> Ownership[Humor]:
+        return self._get_humor_by_id_for_user(humor_id, user_id)
+
     def get_humor_by_date(self, humor_date: datetime) -> Query[Humor]:
         return self._get_humor_by_date(humor_date)
 
+    def get_humor_by_date_for_user(
+        self, humor_date: datetime, user_id: int
+    ) -> List[Humor]:
+        return self._get_humor_by_date_for_user(humor_date, user_id)
+
+    def get_humor_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[Humor]:
+        return self._get_humor_page_for_user(user_id, page_request)
+
+    def get_humor_view_by_id_for_user(
+        self, humor_id: int, user_id: int
+    ) -> Ownership[HumorView]:
+        return self._get_humor_view_by_id_for_user(humor_id, user_id)
+
+    def get_humor_views_by_date_for_user(
+        self, humor_date: datetime, user_id: int
+    ) -> List[HumorView]:
+        return self._get_humor_views_by_date_for_user(humor_date, user_id)
+
+    def get_humor_views_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[HumorView]:
+        return self._get_humor_views_page_for_user(user_id, page_request)
+
     def update_humor(self, humor: Humor, humor_data: dict) -> None:
         self._update_humor(humor, humor_data)
 
+    def update_humor_by_id_for_user(
+        self, humor_id: int, user_id: int, humor_data: dict
+    ) -> Ownership[Humor]:
+        return self._update_humor_by_id_for_user(humor_id, user_id, humor_data)
+
     def delete_humor(self, humor: Humor) -> None:
         self._delete_humor(humor)
 
+    def delete_humor_by_date_for_user(
+        self, humor_date: datetime, user_id: int
+    ) -> Deletion:
+        return self._delete_humor_by_date_for_user(humor_date, user_id)
+
     def add_water_intake(self, water_intake: Water) -> None:
         self._add_water_intake(water_intake)
 
     def get_water_intake_by_id(self, water_intake_id: int) -> Water:
         return self._get_water_intake_by_id(water_intake_id)
 
+    def get_water_intake_by_id_for_user(
+        self, water_intake_id: int, user_id: int
+    ) -> Ownership[Water]:
+        return self._get_water_intake_by_id_for_user(water_intake_id, user_id)
+
     def get_water_intake_by_date(self, water_intake_date: datetime) -> Query[Water]:
         return self._get_water_intake_by_date(water_intake_date)
 
+    def get_water_intake_by_date_for_user(
+        self, water_intake_date: datetime, user_id: int
+    ) -> List[Water]:
+        return self._get_water_intake_by_date_for_user(water_intake_date, user_id)
+
+    def get_water_intake_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[Water]:
+        return self._get_water_intake_page_for_user(user_id, page_request)
+
+    def get_water_intake_view_by_id_for_user(
+        self, water_intake_id: int, user_id: int
+    ) -> Ownership[WaterView]:
+        return self._get_water_intake_view_by_id_for_user(water_intake_id, user_id)
+
+    def get_water_intake_views_by_date_for_user(
+        self, water_intake_date: datetime, user_id: int
+    ) -> List[WaterView]:
+        return self._get_water_intake_views_by_date_for_user(water_intake_date, user_id)
+
+    def get_water_intake_views_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[WaterView]:
+        return self._get_water_intake_views_page_for_user(user_id, page_request)
+
     def update_water_intake(self, water_intake: Water, water_intake_data: dict) -> None:
         self._update_water_intake(water_intake, water_intake_data)
 
+    def update_water_intake_by_id_for_user(
+        self, water_intake_id: int, user_id: int, water_intake_data: dict
+    ) -> Ownership[Water]:
+        return self._update_water_intake_by_id_for_user(
+            water_intake_id, user_id, water_intake_data
+        )
+
     def delete_water_intake(self, water_intake: Water) -> None:
         self._delete_water_intake(water_intake)
 
+    def delete_water_intake_by_date_for_user(
+        self, water_intake_date: datetime, user_id: int
+    ) -> Deletion:
+        return self._delete_water_intake_by_date_for_user(water_intake_date, user_id)
+
     def add_exercises(self, exercises: Exercises) -> None:
         self._add_exercises(exercises)
 
     def get_exercises_by_id(self, exercises_id: int) -> Exercises:
         return self._get_exercises_by_id(exercises_id)
 
+    def get_exercises_by_id_for_user(
+        self, exercises_id: int, user_id: int
+    ) -> Ownership[Exercises]:
+        return self._get_exercises_by_id_for_user(exercises_id, user_id)
+
     def get_exercises_by_date(self, exercises_date: datetime) -> Query[Exercises]:
         return self._get_exercises_by_date(exercises_date)
 
+    def get_exercises_by_date_for_user(
+        self, exercises_date: datetime, user_id: int
+    ) -> List[Exercises]:
+        return self._get_exercises_by_date_for_user(exercises_date, user_id)
+
+    def get_exercises_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[Exercises]:
+        return self._get_exercises_page_for_user(user_id, page_request)
+
+    def get_exercises_view_by_id_for_user(
+        self, exercises_id: int, user_id: int
+    ) -> Ownership[ExercisesView]:
+        return self._get_exercises_view_by_id_for_user(exercises_id, user_id)
+
+    def get_exercises_views_by_date_for_user(
+        self, exercises_date: datetime, user_id: int
+    ) -> List[ExercisesView]:
+        return self._get_exercises_views_by_date_for_user(exercises_date, user_id)
+
+    def get_exercises_views_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[ExercisesView]:
+        return self._get_exercises_views_page_for_user(user_id, page_request)
+
     def update_exercises(self, exercises: Exercises, exercises_data: dict) -> None:
         self._update_exercises(exercises, exercises_data)
 
+    def update_exercises_by_id_for_user(
+        self, exercises_id: int, user_id: int, exercises_data: dict
+    ) -> Ownership[Exercises]:
+        return self._update_exercises_by_id_for_user(
+            exercises_id, user_id, exercises_data
+        )
+
     def delete_exercises(self, exercises: Exercises) -> None:
         self._delete_exercises(exercises)
 
+    def delete_exercises_by_date_for_user(
+        self, exercises_date: datetime, user_id: int
+    ) -> Deletion:
+        return self._delete_exercises_by_date_for_user(exercises_date, user_id)
+
     def add_food_habits(self, food_habits: Food) -> None:
         self._add_food_habits(food_habits)
 
     def get_food_habits_by_id(self, food_habits_id: int) -> Food:
         return self._get_food_habits_by_id(food_habits_id)
 
+    def get_food_habits_by_id_for_user(
+        self, food_habits_id: int, user_id: int
+    ) -> Ownership[Food]:
+        return self._get_food_habits_by_id_for_user(food_habits_id, user_id)
+
     def get_food_habits_by_date(self, food_habits_date: datetime) -> Query[Food]:
         return self._get_food_habits_by_date(food_habits_date)
 
+    def get_food_habits_by_date_for_user(
+        self, food_habits_date: datetime, user_id: int
+    ) -> List[Food]:
+        return self._get_food_habits_by_date_for_user(food_habits_date, user_id)
+
+    def get_food_habits_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[Food]:
+        return self._get_food_habits_page_for_user(user_id, page_request)
+
+    def get_food_habits_view_by_id_for_user(
+        self, food_habits_id: int, user_id: int
+    ) -> Ownership[FoodView]:
+        return self._get_food_habits_view_by_id_for_user(food_habits_id, user_id)
+
+    def get_food_habits_views_by_date_for_user(
+        self, food_habits_date: datetime, user_id: int
+    ) -> List[FoodView]:
+        return self._get_food_habits_views_by_date_for_user(food_habits_date, user_id)
+
+    def get_food_habits_views_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[FoodView]:
+        return self._get_food_habits_views_page_for_user(user_id, page_request)
+
     def update_food_habits(self, food_habits: Food, food_habits_data: dict) -> None:
         self._update_food_habits(food_habits, food_habits_data)
 
+    def update_food_habits_by_id_for_user(
+        self, food_habits_id: int, user_id: int, food_habits_data: dict
+    ) -> Ownership[Food]:
+        return self._update_food_habits_by_id_for_user(
+            food_habits_id, user_id, food_habits_data
+        )
+
     def delete_food_habits(self, food_habits: Food) -> None:
         self._delete_food_habits(food_habits)
 
+    def delete_food_habits_by_date_for_user(
+        self, food_habits_date: datetime, user_id: int
+    ) -> Deletion:
+        return self._delete_food_habits_by_date_for_user(food_habits_date, user_id)
+
     def add_sleep(self, sleep: Sleep) -> None:
         self._add_sleep(sleep)
 
     def get_sleep_by_id(self, sleep_id: int) -> Sleep:
         return self._get_sleep_by_id(sleep_id)
 
+    def get_sleep_by_id_for_user(self, sleep_id: int, user_id: int) -> Ownership[Sleep]:
+        return self._get_sleep_by_id_for_user(sleep_id, user_id)
+
     def get_sleep_by_date(self, sleep_date: datetime) -> Query[Sleep]:
         return self._get_sleep_by_date(sleep_date)
 
+    def get_sleep_by_date_for_user(
+        self, sleep_date: datetime, user_id: int
+    ) -> List[Sleep]:
+        return self._get_sleep_by_date_for_user(sleep_date, user_id)
+
+    def get_sleep_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[Sleep]:
+        return self._get_sleep_page_for_user(user_id, page_request)
+
+    def get_sleep_view_by_id_for_user(
+        self, sleep_id: int, user_id: int
+    ) -> Ownership[SleepView]:
+        return self._get_sleep_view_by_id_for_user(sleep_id, user_id)
+
+    def get_sleep_views_by_date_for_user(
+        self, sleep_date: datetime, user_id: int
+    ) -> List[SleepView]:
+        return self._get_sleep_views_by_date_for_user(sleep_date, user_id)
+
+    def get_sleep_views_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[SleepView]:
+        return self._get_sleep_views_page_for_user(user_id, page_request)
+
     def update_sleep(self, sleep: Sleep, sleep_data: dict) -> None:
         self._update_sleep(sleep, sleep_data)
 
+    def update_sleep_by_id_for_user(
+        self, sleep_id: int, user_id: int, sleep_data: dict
+    ) -> Ownership[Sleep]:
+        return self._update_sleep_by_id_for_user(sleep_id, user_id, sleep_data)
+
     def delete_sleep(self, sleep: Sleep) -> None:
         self._delete_sleep(sleep)
 
+    def delete_sleep_by_date_for_user(
+        self, sleep_date: datetime, user_id: int
+    ) -> Deletion:
+        return self._delete_sleep_by_date_for_user(sleep_date, user_id)
+
     def add_mood(self, mood: Mood) -> None:
         self._add_mood(mood)
 
     def get_mood_by_id(self, mood_id: int) -> Mood:
         return self._get_mood_by_id(mood_id)
 
+    def get_mood_by_id_for_user(self, mood_id: int, user_id: int) -> Ownership[Mood]:
+        return self._get_mood_by_id_for_user(mood_id, user_id)
+
     def get_mood_by_date(self, mood_date: datetime) -> Query[Mood]:
         return self._get_mood_by_date(mood_date)
 
+    def get_mood_by_date_for_user(
+        self, mood_date: datetime, user_id: int
+    ) -> List[Mood]:
+        return self._get_mood_by_date_for_user(mood_date, user_id)
+
+    def get_mood_document_by_id_for_user(
+        self, mood_id: int, user_id: int
+    ) -> Ownership[dict]:
+        return self._get_mood_document_by_id_for_user(mood_id, user_id)
+
+    def get_mood_documents_by_date_for_user(
+        self, mood_date: datetime, user_id: int
+    ) -> List[dict]:
+        return self._get_mood_documents_by_date_for_user(mood_date, user_id)
+
+    def get_mood_documents_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[dict]:
+        return self._get_mood_documents_page_for_user(user_id, page_request)
+
+    def get_or_add_mood_id(self, mood_date: datetime, user_id: int) -> int:
+        return self._get_or_add_mood_id(mood_date, user_id)
+
     def delete_mood(self, mood: Mood) -> None:
         self._delete_mood(mood)
 
+    def delete_mood_by_date_for_user(
+        self, mood_date: datetime, user_id: int
+    ) -> Deletion:
+        return self._delete_mood_by_date_for_user(mood_date, user_id)
+
     def add_user(self, user: User) -> None:
         self._add_user(user)
 
@@ -121,6 +474,34 @@ class AbstractRepository(ABC):
     def delete_user_auth(self, user_auth: UserAuth) -> None:
         self._delete_user_auth(user_auth)
 
+    def add_token_revocation(self, revocation: TokenRevocation) -> None:
+        self._add_token_revocation(revocation)
+
+    def get_token_revocations_since(self, version: int) -> List[TokenRevocation]:
+        return self._get_token_revocations_since(version)
+
+    def get_many(self, model: Type[T], ids: Iterable[int]) -> List[T]:
+        self._check_batch_model(model)
+        return self._get_many(model, list(ids))
+
+    def add_many(self, items: Sequence[T]) -> None:
+        for model in {type(item) for item in items}:
+            self._check_batch_model(model)
+        self._add_many(items)
+
+    def update_many(self, model: Type[T], items_data: Sequence[dict]) -> None:
+        self._check_batch_model(model)
+        self._update_many(model, items_data)
+
+    def delete_many(self, model: Type[T], ids: Iterable[int]) -> int:
+        self._check_batch_model(model)
+        return self._delete_many(model, list(ids))
+
+    @staticmethod
+    def _check_batch_model(model: Type) -> None:
+        if model not in BATCH_MODELS:
+            raise ValueError(f"{model.__name__} can't be handled in batches.")
+
     @abstractmethod
     def _add_humor(self, humor: Humor) -> None:
         raise NotImplementedError
@@ -129,18 +510,66 @@ class AbstractRepository(ABC):
     def _get_humor_by_id(self, humor_id: int) -> Humor:
         raise NotImplementedError
 
+    @abstractmethod
+    def _get_humor_by_id_for_user(
+        self, humor_id: int, user_id: int
+    ) -> Ownership[Humor]:
+        raise NotImplementedError
+
     @abstractmethod
     def _get_humor_by_date(self, humor_date: datetime) -> Query[Humor]:
         raise NotImplementedError
 
+    @abstractmethod
+    def _get_humor_by_date_for_user(
+        self, humor_date: datetime, user_id: int
+    ) -> List[Humor]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _get_humor_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[Humor]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _get_humor_view_by_id_for_user(
+        self, humor_id: int, user_id: int
+    ) -> Ownership[HumorView]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _get_humor_views_by_date_for_user(
+        self, humor_date: datetime, user_id: int
+    ) -> List[HumorView]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _get_humor_views_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[HumorView]:
+        raise NotImplementedError
+
     @abstractmethod
     def _update_humor(self, humor: Humor, humor_data: dict) -> None:
         raise NotImplementedError
 
+    @abstractmethod
+    def _update_humor_by_id_for_user(
+        self, humor_id: int, user_id: int, humor_data: dict
+    ) -> Ownership[Humor]:
+        raise NotImplementedError
+
     @abstractmethod
     def _delete_humor(self, humor: Humor) -> Humor:
         raise NotImplementedError
 
+    @abstractmethod
+    def _delete_humor_by_date_for_user(
+        self, humor_date: datetime, user_id: int
+    ) -> Deletion:
+        raise NotImplementedError
+
     @abstractmethod
     def _add_water_intake(self, water_intake: Water) -> None:
         raise NotImplementedError
@@ -149,20 +578,68 @@ class AbstractRepository(ABC):
     def _get_water_intake_by_id(self, water_intake_id: int) -> Water:
         raise NotImplementedError
 
+    @abstractmethod
+    def _get_water_intake_by_id_for_user(
+        self, water_intake_id: int, user_id: int
+    ) -> Ownership[Water]:
+        raise NotImplementedError
+
     @abstractmethod
     def _get_water_intake_by_date(self, water_intake_date: datetime) -> Query[Water]:
         raise NotImplementedError
 
+    @abstractmethod
+    def _get_water_intake_by_date_for_user(
+        self, water_intake_date: datetime, user_id: int
+    ) -> List[Water]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _get_water_intake_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[Water]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _get_water_intake_view_by_id_for_user(
+        self, water_intake_id: int, user_id: int
+    ) -> Ownership[WaterView]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _get_water_intake_views_by_date_for_user(
+        self, water_intake_date: datetime, user_id: int
+    ) -> List[WaterView]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _get_water_intake_views_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[WaterView]:
+        raise NotImplementedError
+
     @abstractmethod
     def _update_water_intake(
         self, water_intake: Water, water_intake_data: dict
     ) -> None:
         raise NotImplementedError
 
+    @abstractmethod
+    def _update_water_intake_by_id_for_user(
+        self, water_intake_id: int, user_id: int, water_intake_data: dict
+    ) -> Ownership[Water]:
+        raise NotImplementedError
+
     @abstractmethod
     def _delete_water_intake(self, water_intake: Water) -> None:
         raise NotImplementedError
 
+    @abstractmethod
+    def _delete_water_intake_by_date_for_user(
+        self, water_intake_date: datetime, user_id: int
+    ) -> Deletion:
+        raise NotImplementedError
+
     @abstractmethod
     def _add_exercises(self, exercises: Exercises) -> None:
         raise NotImplementedError
@@ -171,18 +648,66 @@ class AbstractRepository(ABC):
     def _get_exercises_by_id(self, exercises_id: int) -> Exercises:
         raise NotImplementedError
 
+    @abstractmethod
+    def _get_exercises_by_id_for_user(
+        self, exercises_id: int, user_id: int
+    ) -> Ownership[Exercises]:
+        raise NotImplementedError
+
     @abstractmethod
     def _get_exercises_by_date(self, exercises_date: datetime) -> Query[Exercises]:
         raise NotImplementedError
 
+    @abstractmethod
+    def _get_exercises_by_date_for_user(
+        self, exercises_date: datetime, user_id: int
+    ) -> List[Exercises]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _get_exercises_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[Exercises]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _get_exercises_view_by_id_for_user(
+        self, exercises_id: int, user_id: int
+    ) -> Ownership[ExercisesView]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _get_exercises_views_by_date_for_user(
+        self, exercises_date: datetime, user_id: int
+    ) -> List[ExercisesView]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _get_exercises_views_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[ExercisesView]:
+        raise NotImplementedError
+
     @abstractmethod
     def _update_exercises(self, exercises: Exercises, exercises_data: dict) -> None:
         raise NotImplementedError
 
+    @abstractmethod
+    def _update_exercises_by_id_for_user(
+        self, exercises_id: int, user_id: int, exercises_data: dict
+    ) -> Ownership[Exercises]:
+        raise NotImplementedError
+
     @abstractmethod
     def _delete_exercises(self, exercises: Exercises) -> None:
         raise NotImplementedError
 
+    @abstractmethod
+    def _delete_exercises_by_date_for_user(
+        self, exercises_date: datetime, user_id: int
+    ) -> Deletion:
+        raise NotImplementedError
+
     @abstractmethod
     def _add_food_habits(self, food_habits: Food) -> None:
         raise NotImplementedError
@@ -191,18 +716,66 @@ class AbstractRepository(ABC):
     def _get_food_habits_by_id(self, food_habits_id: int) -> Food:
         raise NotImplementedError
 
+    @abstractmethod
+    def _get_food_habits_by_id_for_user(
+        self, food_habits_id: int, user_id: int
+    ) -> Ownership[Food]:
+        raise NotImplementedError
+
     @abstractmethod
     def _get_food_habits_by_date(self, food_habits_date: datetime) -> Query[Food]:
         raise NotImplementedError
 
+    @abstractmethod
+    def _get_food_habits_by_date_for_user(
+        self, food_habits_date: datetime, user_id: int
+    ) -> List[Food]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _get_food_habits_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[Food]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _get_food_habits_view_by_id_for_user(
+        self, food_habits_id: int, user_id: int
+    ) -> Ownership[FoodView]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _get_food_habits_views_by_date_for_user(
+        self, food_habits_date: datetime, user_id: int
+    ) -> List[FoodView]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _get_food_habits_views_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[FoodView]:
+        raise NotImplementedError
+
     @abstractmethod
     def _update_food_habits(self, food_habits: Food, food_habits_data: dict) -> None:
         raise NotImplementedError
 
+    @abstractmethod
+    def _update_food_habits_by_id_for_user(
+        self, food_habits_id: int, user_id: int, food_habits_data: dict
+    ) -> Ownership[Food]:
+        raise NotImplementedError
+
     @abstractmethod
     def _delete_food_habits(self, food_habits: Food) -> None:
         raise NotImplementedError
 
+    @abstractmethod
+    def _delete_food_habits_by_date_for_user(
+        self, food_habits_date: datetime, user_id: int
+    ) -> Deletion:
+        raise NotImplementedError
+
     @abstractmethod
     def _add_sleep(self, sleep: Sleep) -> None:
         raise NotImplementedError
@@ -211,18 +784,66 @@ class AbstractRepository(ABC):
     def _get_sleep_by_id(self, sleep_id: int) -> Sleep:
         raise NotImplementedError
 
+    @abstractmethod
+    def _get_sleep_by_id_for_user(
+        self, sleep_id: int, user_id: int
+    ) -> Ownership[Sleep]:
+        raise NotImplementedError
+
     @abstractmethod
     def _get_sleep_by_date(self, sleep_date: datetime) -> Query[Sleep]:
         raise NotImplementedError
 
+    @abstractmethod
+    def _get_sleep_by_date_for_user(
+        self, sleep_date: datetime, user_id: int
+    ) -> List[Sleep]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _get_sleep_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[Sleep]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _get_sleep_view_by_id_for_user(
+        self, sleep_id: int, user_id: int
+    ) -> Ownership[SleepView]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _get_sleep_views_by_date_for_user(
+        self, sleep_date: datetime, user_id: int
+    ) -> List[SleepView]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _get_sleep_views_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[SleepView]:
+        raise NotImplementedError
+
     @abstractmethod
     def _update_sleep(self, sleep: Sleep, sleep_data: dict) -> None:
         raise NotImplementedError
 
+    @abstractmethod
+    def _update_sleep_by_id_for_user(
+        self, sleep_id: int, user_id: int, sleep_data: dict
+    ) -> Ownership[Sleep]:
+        raise NotImplementedError
+
     @abstractmethod
     def _delete_sleep(self, sleep: Sleep) -> Sleep:
         raise NotImplementedError
 
+    @abstractmethod
+    def _delete_sleep_by_date_for_user(
+        self, sleep_date: datetime, user_id: int
+    ) -> Deletion:
+        raise NotImplementedError
+
     @abstractmethod
     def _add_mood(self, mood: Mood) -> None:
         raise NotImplementedError
@@ -231,14 +852,52 @@ class AbstractRepository(ABC):
     def _get_mood_by_id(self, mood_id: int) -> Mood:
         raise NotImplementedError
 
+    @abstractmethod
+    def _get_mood_by_id_for_user(self, mood_id: int, user_id: int) -> Ownership[Mood]:
+        raise NotImplementedError
+
     @abstractmethod
     def _get_mood_by_date(self, mood_date: datetime) -> Query[Mood]:
         raise NotImplementedError
 
+    @abstractmethod
+    def _get_mood_by_date_for_user(
+        self, mood_date: datetime, user_id: int
+    ) -> List[Mood]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _get_mood_document_by_id_for_user(
+        self, mood_id: int, user_id: int
+    ) -> Ownership[dict]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _get_mood_documents_by_date_for_user(
+        self, mood_date: datetime, user_id: int
+    ) -> List[dict]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _get_mood_documents_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[dict]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _get_or_add_mood_id(self, mood_date: datetime, user_id: int) -> int:
+        raise NotImplementedError
+
     @abstractmethod
     def _delete_mood(self, mood: Mood) -> None:
         raise NotImplementedError
 
+    @abstractmethod
+    def _delete_mood_by_date_for_user(
+        self, mood_date: datetime, user_id: int
+    ) -> Deletion:
+        raise NotImplementedError
+
     @abstractmethod
     def _add_user(self, user: User) -> None:
         raise NotImplementedError
@@ -275,11 +934,312 @@ class AbstractRepository(ABC):
     def _delete_user_auth(self, user_auth: UserAuth) -> None:
         raise NotImplementedError
 
+    @abstractmethod
+    def _add_token_revocation(self, revocation: TokenRevocation) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _get_token_revocations_since(self, version: int) -> List[TokenRevocation]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _get_many(self, model: Type[T], ids: List[int]) -> List[T]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _add_many(self, items: Sequence[T]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _update_many(self, model: Type[T], items_data: Sequence[dict]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _delete_many(self, model: Type[T], ids: List[int]) -> int:
+        raise NotImplementedError
+
 
 class SQLRepository(AbstractRepository):
-    def __init__(self, session: Session) -> None:
+    def __init__(
+        self,
+        session: Session,
+        cache: Optional[LookupCache] = None,
+        mood_loader: str = "selectin",
+    ) -> None:
         super().__init__()
+        if mood_loader not in MOOD_LOADERS:
+            raise ValueError(f"Unknown mood loader {mood_loader!r}.")
         self.session = session
+        self.cache = cache
+        self.mood_loader = mood_loader
+        # Keys changed by this session. They are evicted again once its
+        # transaction ends, in case another session cached the old row
+        # before the change was committed.
+        self._stale_keys = set()
+        if cache is not None:
+            event.listen(session, "after_transaction_end", self._evict_stale_keys)
+
+    def _get_cached(self, model: Type[T], key: Hashable, load: Callable[[], T]) -> T:
+        """
+        Returns the instance of `model` cached under `key`, attached to this
+        session without a query, or loads it with `load` and caches its
+        column values.
+        """
+        if self.cache is None:
+            return load()
+
+        values = self.cache.get(key)
+        if values is not None:
+            mapper = inspect(model)
+            identity = mapper.identity_key_from_primary_key(
+                [values[column.key] for column in mapper.primary_key]
+            )
+            # Merging would overwrite changes made to an instance the session
+            # already holds.
+            existing = self.session.identity_map.get(identity)
+            if existing is not None:
+                return existing
+
+            instance = model(**values)
+            make_transient_to_detached(instance)
+            return self.session.merge(instance, load=False)
+
+        instance = load()
+        if (
+            instance is not None
+            and key not in self._stale_keys
+            and instance not in self.session.dirty
+        ):
+            self.cache.set(
+                key,
+                {
+                    attr.key: getattr(instance, attr.key)
+                    for attr in inspect(model).column_attrs
+                },
+            )
+        return instance
+
+    def _invalidate(self, *keys: Hashable) -> None:
+        if self.cache is None:
+            return
+        self._stale_keys.update(keys)
+        self.cache.invalidate(*keys)
+
+    def _evict_stale_keys(self, session: Session, transaction) -> None:
+        # Flushes and savepoints end transactions of their own, nested in the
+        # one that commits or rolls back.
+        if transaction.parent is None and self._stale_keys:
+            self.cache.invalidate(*self._stale_keys)
+            self._stale_keys.clear()
+
+    def _get_by_id_for_user(
+        self, model: Type[T], item_id: int, user_id: int
+    ) -> Ownership[T]:
+        """
+        Looks the `model` row up along with the owner of its mood, in one
+        query.
+        """
+        row = self.session.execute(
+            ENTRY_BY_ID_FOR_USER[model], {"item_id": item_id}
+        ).first()
+        if row is None:
+            return Ownership(None, False)
+        item, owner_id = row
+        return Ownership(item if owner_id == user_id else None, True)
+
+    def _update_by_id_for_user(
+        self, model: Type[T], item_id: int, user_id: int, item_data: dict
+    ) -> Ownership[T]:
+        """
+        Updates the `model` row if its mood belongs to `user_id`, with one
+        `UPDATE ... RETURNING` that also loads the updated row. Only when
+        nothing was updated, a second query tells a missing row from one that
+        belongs to someone else.
+        """
+        item = self.session.scalars(
+            update(model)
+            .where(
+                model.id == item_id,
+                model.mood_id.in_(select(Mood.id).where(Mood.user_id == user_id)),
+            )
+            .values(**item_data)
+            .returning(model),
+            execution_options={"populate_existing": True},
+        ).one_or_none()
+        if item is not None:
+            return Ownership(item, True)
+        found = self.session.scalar(select(exists().where(model.id == item_id)))
+        return Ownership(None, found)
+
+    def _get_by_date_for_user(
+        self, model: Type[T], item_date: datetime, user_id: int
+    ) -> List[T]:
+        """
+        Returns the `model` rows of `item_date` whose mood belongs to
+        `user_id`, filtered by the database.
+        """
+        return self.session.scalars(
+            ENTRIES_BY_DATE_FOR_USER[model],
+            {"item_date": item_date, "user_id": user_id},
+        ).all()
+
+    def _delete_by_date_for_user(
+        self, model: Type[T], item_date: datetime, user_id: int
+    ) -> Deletion:
+        """
+        Deletes the `model` rows of `item_date` owned by `user_id` in one
+        statement, leaving their children to the `ON DELETE CASCADE` of their
+        foreign keys. Nothing is loaded into the session.
+
+        Only when nothing was deleted, a second query tells whether the date
+        had rows of other users. The delete is not wrapped in a `SELECT`,
+        which would make `RoutingSession` route it as a read and not record
+        the write.
+        """
+        table = model.__table__
+        if model is Mood:
+            owned = table.c.user_id == user_id
+        else:
+            owned = table.c.mood_id.in_(select(Mood.id).where(Mood.user_id == user_id))
+        deleted = self.session.execute(
+            delete(table).where(table.c.date == item_date, owned).returning(table.c.id)
+        ).all()
+        if deleted:
+            return Deletion(len(deleted), True)
+        found = self.session.scalar(select(exists().where(table.c.date == item_date)))
+        return Deletion(0, found)
+
+    @staticmethod
+    def _paginate(statement, key: Tuple, page_request: PageRequest):
+        """
+        Restricts `statement` to the rows of `page_request`, ordered by the
+        `(date, id)` columns of `key`. One row more than the limit is fetched,
+        to tell whether there is a next page.
+
+        The key comparison is spelled out, rather than as a row value, so the
+        planner can bound the scan of a `date` index by it.
+        """
+        date_column, id_column = key
+        if page_request.date_from is not None:
+            statement = statement.filter(date_column >= page_request.date_from)
+        if page_request.date_to is not None:
+            statement = statement.filter(date_column <= page_request.date_to)
+        if page_request.after is not None:
+            after_date, after_id = page_request.after
+            statement = statement.filter(
+                date_column >= after_date,
+                or_(date_column > after_date, id_column > after_id),
+            )
+        return statement.order_by(date_column, id_column).limit(page_request.limit + 1)
+
+    @staticmethod
+    def _page(
+        rows: list, limit: int, item: Callable, key: Callable[..., Tuple[date, int]]
+    ) -> Page:
+        """
+        Turns the rows fetched by `_paginate` into a `Page` of `item(row)`,
+        whose next key is `key(row)` of its last row.
+        """
+        if len(rows) <= limit:
+            return Page([item(row) for row in rows], None)
+        rows = rows[:limit]
+        return Page([item(row) for row in rows], key(rows[-1]))
+
+    def _get_page_for_user(
+        self, model: Type[T], user_id: int, page_request: PageRequest
+    ) -> Page[T]:
+        """
+        Returns a page of the `model` rows whose mood belongs to `user_id`.
+
+        Rows are ordered, filtered and keyed by the date of their mood, the day
+        they were logged for, rather than by their own `date`: only the moods
+        are indexed by user and date. Each page is then a range scan of the
+        `(user_id, date)` index of moods, joined to the rows by `mood_id`, and
+        costs the same however deep it is and however many rows other users
+        have. A row whose own `date` was changed stays under its mood's day.
+        """
+        query = (
+            self.session.query(model, Mood.date)
+            .join(model.mood)
+            .filter(Mood.user_id == user_id)
+        )
+        rows = self._paginate(query, (Mood.date, model.id), page_request).all()
+        return self._page(
+            rows,
+            page_request.limit,
+            lambda row: row[0],
+            lambda row: (row[1], row[0].id),
+        )
+
+    def _execute_views(self, statement, params: Optional[dict] = None) -> list:
+        """
+        Runs a Core statement on the connection of the session, bypassing the
+        ORM: rows are plain tuples, nothing enters the identity map and
+        pending changes are not flushed first.
+        """
+        connection = self.session.connection(bind_arguments={"clause": statement})
+        return connection.execute(statement, params).all()
+
+    def _get_view_by_id_for_user(
+        self, model: Type, item_id: int, user_id: int
+    ) -> Ownership[View]:
+        """
+        Same as `_get_by_id_for_user`, returning a view of the row.
+        """
+        rows = self._execute_views(VIEW_BY_ID_FOR_USER[model], {"item_id": item_id})
+        if not rows:
+            return Ownership(None, False)
+        *values, owner_id = rows[0]
+        view = MODEL_VIEWS[model](*values) if owner_id == user_id else None
+        return Ownership(view, True)
+
+    def _get_views_by_date_for_user(
+        self, model: Type, item_date: datetime, user_id: int
+    ) -> List[View]:
+        """
+        Same as `_get_by_date_for_user`, returning views of the rows.
+        """
+        rows = self._execute_views(
+            VIEWS_BY_DATE_FOR_USER[model], {"item_date": item_date, "user_id": user_id}
+        )
+        view = MODEL_VIEWS[model]
+        return [view(*row) for row in rows]
+
+    def _get_views_page_for_user(
+        self, model: Type, user_id: int, page_request: PageRequest
+    ) -> Page[View]:
+        """
+        Same as `_get_page_for_user`, returning views of the rows.
+        """
+        mood = Mood.__table__
+        statement = select_views(model, mood.c.date).where(mood.c.user_id == user_id)
+        statement = self._paginate(
+            statement, (mood.c.date, model.__table__.c.id), page_request
+        )
+        view = MODEL_VIEWS[model]
+        # The mood's date comes last, after the fields of the view.
+        return self._page(
+            self._execute_views(statement),
+            page_request.limit,
+            lambda row: view(*row[:-1]),
+            lambda row: (row[-1], row.id),
+        )
+
+    @staticmethod
+    def _mood_document(row) -> dict:
+        """
+        Turns a row of `select_mood_documents` into the document `Mood.as_dict`
+        returns, with every value as a string.
+        """
+        document = {
+            key: str(row._mapping[key]) for key in ["id", "user_id", "date", "score"]
+        }
+        for key in MOOD_COLLECTIONS:
+            document[key] = [
+                {column: str(value) for column, value in item.items()}
+                for item in row._mapping[key] or []
+            ]
+        return document
 
     def _add_humor(self, humor: Humor) -> None:
         self.session.add(humor)
@@ -287,124 +1247,426 @@ class SQLRepository(AbstractRepository):
     def _get_humor_by_id(self, humor_id: int) -> Humor:
         return self.session.query(Humor).filter_by(id=humor_id).first()
 
+    def _get_humor_by_id_for_user(
+        self, humor_id: int, user_id: int
+    ) -> Ownership[Humor]:
+        return self._get_by_id_for_user(Humor, humor_id, user_id)
+
     def _get_humor_by_date(self, humor_date: datetime) -> Query[Humor]:
         return self.session.query(Humor).filter_by(date=humor_date)
 
+    def _get_humor_by_date_for_user(
+        self, humor_date: datetime, user_id: int
+    ) -> List[Humor]:
+        return self._get_by_date_for_user(Humor, humor_date, user_id)
+
+    def _get_humor_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[Humor]:
+        return self._get_page_for_user(Humor, user_id, page_request)
+
+    def _get_humor_view_by_id_for_user(
+        self, humor_id: int, user_id: int
+    ) -> Ownership[HumorView]:
+        return self._get_view_by_id_for_user(Humor, humor_id, user_id)
+
+    def _get_humor_views_by_date_for_user(
+        self, humor_date: datetime, user_id: int
+    ) -> List[HumorView]:
+        return self._get_views_by_date_for_user(Humor, humor_date, user_id)
+
+    def _get_humor_views_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[HumorView]:
+        return self._get_views_page_for_user(Humor, user_id, page_request)
+
     def _update_humor(self, humor: Humor, humor_data: dict) -> None:
         for key in humor_data:
             setattr(humor, key, humor_data[key])
 
+    def _update_humor_by_id_for_user(
+        self, humor_id: int, user_id: int, humor_data: dict
+    ) -> Ownership[Humor]:
+        return self._update_by_id_for_user(Humor, humor_id, user_id, humor_data)
+
     def _delete_humor(self, humor: Humor) -> None:
         self.session.delete(humor)
 
+    def _delete_humor_by_date_for_user(
+        self, humor_date: datetime, user_id: int
+    ) -> Deletion:
+        return self._delete_by_date_for_user(Humor, humor_date, user_id)
+
     def _add_water_intake(self, water_intake: Water) -> None:
         self.session.add(water_intake)
 
     def _get_water_intake_by_id(self, water_intake_id: int) -> Water:
         return self.session.query(Water).filter_by(id=water_intake_id).first()
 
+    def _get_water_intake_by_id_for_user(
+        self, water_intake_id: int, user_id: int
+    ) -> Ownership[Water]:
+        return self._get_by_id_for_user(Water, water_intake_id, user_id)
+
     def _get_water_intake_by_date(self, water_intake_date: datetime) -> Query[Water]:
         return self.session.query(Water).filter_by(date=water_intake_date)
 
+    def _get_water_intake_by_date_for_user(
+        self, water_intake_date: datetime, user_id: int
+    ) -> List[Water]:
+        return self._get_by_date_for_user(Water, water_intake_date, user_id)
+
+    def _get_water_intake_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[Water]:
+        return self._get_page_for_user(Water, user_id, page_request)
+
+    def _get_water_intake_view_by_id_for_user(
+        self, water_intake_id: int, user_id: int
+    ) -> Ownership[WaterView]:
+        return self._get_view_by_id_for_user(Water, water_intake_id, user_id)
+
+    def _get_water_intake_views_by_date_for_user(
+        self, water_intake_date: datetime, user_id: int
+    ) -> List[WaterView]:
+        return self._get_views_by_date_for_user(Water, water_intake_date, user_id)
+
+    def _get_water_intake_views_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[WaterView]:
+        return self._get_views_page_for_user(Water, user_id, page_request)
+
     def _update_water_intake(
         self, water_intake: Water, water_intake_data: dict
     ) -> None:
         for key in water_intake_data:
             setattr(water_intake, key, water_intake_data[key])
 
+    def _update_water_intake_by_id_for_user(
+        self, water_intake_id: int, user_id: int, water_intake_data: dict
+    ) -> Ownership[Water]:
+        return self._update_by_id_for_user(
+            Water, water_intake_id, user_id, water_intake_data
+        )
+
     def _delete_water_intake(self, water_intake: Water) -> None:
         self.session.delete(water_intake)
 
+    def _delete_water_intake_by_date_for_user(
+        self, water_intake_date: datetime, user_id: int
+    ) -> Deletion:
+        return self._delete_by_date_for_user(Water, water_intake_date, user_id)
+
     def _add_exercises(self, exercises: Exercises) -> None:
         self.session.add(exercises)
 
     def _get_exercises_by_id(self, exercises_id: int) -> Exercises:
         return self.session.query(Exercises).filter_by(id=exercises_id).first()
 
+    def _get_exercises_by_id_for_user(
+        self, exercises_id: int, user_id: int
+    ) -> Ownership[Exercises]:
+        return self._get_by_id_for_user(Exercises, exercises_id, user_id)
+
     def _get_exercises_by_date(self, exercises_date: datetime) -> Query[Exercises]:
         return self.session.query(Exercises).filter_by(date=exercises_date)
 
+    def _get_exercises_by_date_for_user(
+        self, exercises_date: datetime, user_id: int
+    ) -> List[Exercises]:
+        return self._get_by_date_for_user(Exercises, exercises_date, user_id)
+
+    def _get_exercises_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[Exercises]:
+        return self._get_page_for_user(Exercises, user_id, page_request)
+
+    def _get_exercises_view_by_id_for_user(
+        self, exercises_id: int, user_id: int
+    ) -> Ownership[ExercisesView]:
+        return self._get_view_by_id_for_user(Exercises, exercises_id, user_id)
+
+    def _get_exercises_views_by_date_for_user(
+        self, exercises_date: datetime, user_id: int
+    ) -> List[ExercisesView]:
+        return self._get_views_by_date_for_user(Exercises, exercises_date, user_id)
+
+    def _get_exercises_views_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[ExercisesView]:
+        return self._get_views_page_for_user(Exercises, user_id, page_request)
+
     def _update_exercises(self, exercises: Exercises, exercises_data: dict) -> None:
         for key in exercises_data:
             setattr(exercises, key, exercises_data[key])
 
+    def _update_exercises_by_id_for_user(
+        self, exercises_id: int, user_id: int, exercises_data: dict
+    ) -> Ownership[Exercises]:
+        return self._update_by_id_for_user(
+            Exercises, exercises_id, user_id, exercises_data
+        )
+
     def _delete_exercises(self, exercises: Exercises) -> None:
         self.session.delete(exercises)
 
+    def _delete_exercises_by_date_for_user(
+        self, exercises_date: datetime, user_id: int
+    ) -> Deletion:
+        return self._delete_by_date_for_user(Exercises, exercises_date, user_id)
+
     def _add_food_habits(self, food_habits: Food) -> None:
         self.session.add(food_habits)
 
     def _get_food_habits_by_id(self, food_habits_id: int) -> Food:
         return self.session.query(Food).filter_by(id=food_habits_id).first()
 
+    def _get_food_habits_by_id_for_user(
+        self, food_habits_id: int, user_id: int
+    ) -> Ownership[Food]:
+        return self._get_by_id_for_user(Food, food_habits_id, user_id)
+
     def _get_food_habits_by_date(self, food_habits_date: datetime) -> Query[Food]:
         return self.session.query(Food).filter_by(date=food_habits_date)
 
+    def _get_food_habits_by_date_for_user(
+        self, food_habits_date: datetime, user_id: int
+    ) -> List[Food]:
+        return self._get_by_date_for_user(Food, food_habits_date, user_id)
+
+    def _get_food_habits_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[Food]:
+        return self._get_page_for_user(Food, user_id, page_request)
+
+    def _get_food_habits_view_by_id_for_user(
+        self, food_habits_id: int, user_id: int
+    ) -> Ownership[FoodView]:
+        return self._get_view_by_id_for_user(Food, food_habits_id, user_id)
+
+    def _get_food_habits_views_by_date_for_user(
+        self, food_habits_date: datetime, user_id: int
+    ) -> List[FoodView]:
+        return self._get_views_by_date_for_user(Food, food_habits_date, user_id)
+
+    def _get_food_habits_views_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[FoodView]:
+        return self._get_views_page_for_user(Food, user_id, page_request)
+
     def _update_food_habits(self, food_habits: Food, food_habits_data: dict) -> None:
         for key in food_habits_data:
             setattr(food_habits, key, food_habits_data[key])
 
+    def _update_food_habits_by_id_for_user(
+        self, food_habits_id: int, user_id: int, food_habits_data: dict
+    ) -> Ownership[Food]:
+        return self._update_by_id_for_user(
+            Food, food_habits_id, user_id, food_habits_data
+        )
+
     def _delete_food_habits(self, food_habits: Food) -> None:
         self.session.delete(food_habits)
 
+    def _delete_food_habits_by_date_for_user(
+        self, food_habits_date: datetime, user_id: int
+    ) -> Deletion:
+        return self._delete_by_date_for_user(Food, food_habits_date, user_id)
+
     def _add_sleep(self, sleep: Sleep) -> None:
         self.session.add(sleep)
 
     def _get_sleep_by_id(self, sleep_id: int) -> Sleep:
         return self.session.query(Sleep).filter_by(id=sleep_id).first()
 
+    def _get_sleep_by_id_for_user(
+        self, sleep_id: int, user_id: int
+    ) -> Ownership[Sleep]:
+        return self._get_by_id_for_user(Sleep, sleep_id, user_id)
+
     def _get_sleep_by_date(self, sleep_date: datetime) -> Query[Sleep]:
         return self.session.query(Sleep).filter_by(date=sleep_date)
 
+    def _get_sleep_by_date_for_user(
+        self, sleep_date: datetime, user_id: int
+    ) -> List[Sleep]:
+        return self._get_by_date_for_user(Sleep, sleep_date, user_id)
+
+    def _get_sleep_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[Sleep]:
+        return self._get_page_for_user(Sleep, user_id, page_request)
+
+    def _get_sleep_view_by_id_for_user(
+        self, sleep_id: int, user_id: int
+    ) -> Ownership[SleepView]:
+        return self._get_view_by_id_for_user(Sleep, sleep_id, user_id)
+
+    def _get_sleep_views_by_date_for_user(
+        self, sleep_date: datetime, user_id: int
+    ) -> List[SleepView]:
+        return self._get_views_by_date_for_user(Sleep, sleep_date, user_id)
+
+    def _get_sleep_views_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[SleepView]:
+        return self._get_views_page_for_user(Sleep, user_id, page_request)
+
     def _update_sleep(self, sleep: Sleep, sleep_data: dict) -> None:
         for key in sleep_data:
             setattr(sleep, key, sleep_data[key])
 
+    def _update_sleep_by_id_for_user(
+        self, sleep_id: int, user_id: int, sleep_data: dict
+    ) -> Ownership[Sleep]:
+        return self._update_by_id_for_user(Sleep, sleep_id, user_id, sleep_data)
+
     def _delete_sleep(self, sleep: Sleep) -> None:
         self.session.delete(sleep)
 
+    def _delete_sleep_by_date_for_user(
+        self, sleep_date: datetime, user_id: int
+    ) -> Deletion:
+        return self._delete_by_date_for_user(Sleep, sleep_date, user_id)
+
     def _add_mood(self, mood: Mood) -> None:
         self.session.add(mood)
 
     def _get_mood_by_id(self, mood_id: int) -> Mood:
+        # The json loader builds documents, not instances.
+        statement = MOOD_BY_ID.get(self.mood_loader, MOOD_BY_ID["selectin"])
+        return self.session.scalars(statement, {"mood_id": mood_id}).unique().first()
+
+    def _get_mood_by_id_for_user(self, mood_id: int, user_id: int) -> Ownership[Mood]:
+        """
+        Loads the mood and its collections only if it belongs to `user_id`.
+        Only when it doesn't, a second query tells a missing mood from one
+        that belongs to someone else.
+        """
+        statement = MOOD_BY_ID_FOR_USER.get(
+            self.mood_loader, MOOD_BY_ID_FOR_USER["selectin"]
+        )
         mood = (
-            self.session.query(Mood)
-            .options(
-                joinedload(Mood.exercises),
-                joinedload(Mood.food_habits),
-                joinedload(Mood.humors),
-                joinedload(Mood.water_intakes),
-                joinedload(Mood.sleeps),
-            )
-            .filter_by(id=mood_id)
+            self.session.scalars(statement, {"mood_id": mood_id, "user_id": user_id})
+            .unique()
             .first()
         )
-        return mood
+        if mood is not None:
+            return Ownership(mood, True)
+        return Ownership(None, self._mood_exists(mood_id))
+
+    def _mood_exists(self, mood_id: int) -> bool:
+        return self.session.scalar(MOOD_EXISTS, {"mood_id": mood_id})
 
     def _get_mood_by_date(self, mood_date: datetime) -> Query[Mood]:
         moods_query = (
             self.session.query(Mood)
-            .options(
-                joinedload(Mood.exercises),
-                joinedload(Mood.food_habits),
-                joinedload(Mood.humors),
-                joinedload(Mood.water_intakes),
-                joinedload(Mood.sleeps),
-            )
+            .options(*mood_loader_options(self.mood_loader))
             .filter_by(date=mood_date)
         )
         return moods_query
 
+    def _get_mood_by_date_for_user(
+        self, mood_date: datetime, user_id: int
+    ) -> List[Mood]:
+        statement = MOODS_BY_DATE_FOR_USER.get(
+            self.mood_loader, MOODS_BY_DATE_FOR_USER["selectin"]
+        )
+        return (
+            self.session.scalars(
+                statement, {"mood_date": mood_date, "user_id": user_id}
+            )
+            .unique()
+            .all()
+        )
+
+    def _get_mood_document_by_id_for_user(
+        self, mood_id: int, user_id: int
+    ) -> Ownership[dict]:
+        if self.mood_loader != "json":
+            mood, found = self._get_mood_by_id_for_user(mood_id, user_id)
+            return Ownership(mood.as_dict() if mood else None, found)
+
+        row = self.session.execute(
+            MOOD_DOCUMENT_BY_ID_FOR_USER, {"mood_id": mood_id, "user_id": user_id}
+        ).first()
+        if row is not None:
+            return Ownership(self._mood_document(row), True)
+        return Ownership(None, self._mood_exists(mood_id))
+
+    def _get_mood_documents_by_date_for_user(
+        self, mood_date: datetime, user_id: int
+    ) -> List[dict]:
+        if self.mood_loader != "json":
+            moods = self._get_mood_by_date_for_user(mood_date, user_id)
+            return [mood.as_dict() for mood in moods]
+
+        rows = self.session.execute(
+            MOOD_DOCUMENTS_BY_DATE_FOR_USER,
+            {"mood_date": mood_date, "user_id": user_id},
+        ).all()
+        return [self._mood_document(row) for row in rows]
+
+    def _get_mood_documents_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[dict]:
+        if self.mood_loader != "json":
+            query = (
+                self.session.query(Mood)
+                .options(*mood_loader_options(self.mood_loader))
+                .filter(Mood.user_id == user_id)
+            )
+            moods = self._paginate(query, (Mood.date, Mood.id), page_request).all()
+            return self._page(
+                moods,
+                page_request.limit,
+                lambda mood: mood.as_dict(),
+                lambda mood: (mood.date, mood.id),
+            )
+
+        statement = select_mood_documents().where(Mood.user_id == user_id)
+        statement = self._paginate(statement, (Mood.date, Mood.id), page_request)
+        rows = self.session.execute(statement).all()
+        return self._page(
+            rows,
+            page_request.limit,
+            self._mood_document,
+            lambda row: (row.date, row.id),
+        )
+
+    def _get_or_add_mood_id(self, mood_date: datetime, user_id: int) -> int:
+        """
+        Inserts the mood of `mood_date` unless the user already has one, and
+        returns its id, in one atomic statement. The no-op update on conflict
+        makes `RETURNING` yield the existing row too.
+        """
+        statement = insert(Mood).values(user_id=user_id, date=mood_date)
+        statement = statement.on_conflict_do_update(
+            index_elements=[Mood.user_id, Mood.date],
+            set_={"date": statement.excluded.date},
+        ).returning(Mood.id)
+        return self.session.execute(statement).scalar_one()
+
     def _delete_mood(self, mood: Mood) -> None:
         self.session.delete(mood)
 
+    def _delete_mood_by_date_for_user(
+        self, mood_date: datetime, user_id: int
+    ) -> Deletion:
+        return self._delete_by_date_for_user(Mood, mood_date, user_id)
+
     def _add_user(self, user: User) -> None:
         self.session.add(user)
 
     def _get_user_by_id(self, user_id: int) -> User:
-        return self.session.query(User).filter_by(id=user_id).first()
+        return self._get_cached(
+            User,
+            ("user", user_id),
+            lambda: self.session.scalars(USER_BY_ID, {"user_id": user_id}).first(),
+        )
 
     def _update_user(self, user: User, user_data: dict) -> None:
+        self._invalidate(("user", user.id))
         for key in user_data:
             setattr(user, key, user_data[key])
 
@@ -415,14 +1677,101 @@ class SQLRepository(AbstractRepository):
         return self.session.query(UserAuth)
 
     def _get_user_auth_by_username(self, username: str) -> UserAuth:
-        return self.session.query(UserAuth).filter_by(username=username).first()
+        return self._get_cached(
+            UserAuth,
+            ("user_auth", username),
+            lambda: self.session.scalars(
+                USER_AUTH_BY_USERNAME, {"username": username}
+            ).first(),
+        )
 
     def _update_user_auth(self, user_auth: UserAuth, user_auth_data: dict) -> None:
+        self._invalidate(("user_auth", user_auth.username))
         for key in user_auth_data:
             setattr(user_auth, key, user_auth_data[key])
+        self._invalidate(("user_auth", user_auth.username))
 
     def _deactivate_user_auth(self, user_auth: UserAuth) -> None:
+        self._invalidate(("user_auth", user_auth.username))
         setattr(user_auth, "active", False)
+        self._revoke_user_tokens(user_auth)
 
     def _delete_user_auth(self, user_auth: UserAuth) -> None:
+        self._invalidate(("user_auth", user_auth.username))
+        self._revoke_user_tokens(user_auth)
         self.session.delete(user_auth)
+
+    def _revoke_user_tokens(self, user_auth: UserAuth) -> None:
+        self._add_token_revocation(user_revocation(user_auth))
+
+    def _add_token_revocation(self, revocation: TokenRevocation) -> None:
+        """
+        Adds `revocation` with the next version, and deletes the revocations
+        whose tokens have all expired. Incrementing the counter first makes
+        concurrent revocations delete in turn.
+        """
+        revocation.version = self.session.execute(
+            update(TokenRevocationCounter)
+            .where(TokenRevocationCounter.id == 1)
+            .values(value=TokenRevocationCounter.value + 1)
+            .returning(TokenRevocationCounter.value)
+        ).scalar_one()
+        self.session.execute(
+            delete(TokenRevocation).where(
+                TokenRevocation.expires_at <= int(time.time())
+            )
+        )
+        self.session.add(revocation)
+
+    def _get_token_revocations_since(self, version: int) -> List[TokenRevocation]:
+        return (
+            self.session.query(TokenRevocation)
+            .filter(TokenRevocation.version > version)
+            .filter(
+                or_(
+                    TokenRevocation.expires_at.is_(None),
+                    TokenRevocation.expires_at > int(time.time()),
+                )
+            )
+            .order_by(TokenRevocation.version)
+            .all()
+        )
+
+    def _get_many(self, model: Type[T], ids: List[int]) -> List[T]:
+        """
+        Returns the `model` rows of `ids` that exist, ordered by id, with one
+        `SELECT ... WHERE id IN (...)`.
+        """
+        if not ids:
+            return []
+        return self.session.scalars(
+            select(model).where(model.id.in_(ids)).order_by(model.id)
+        ).all()
+
+    def _add_many(self, items: Sequence[T]) -> None:
+        """
+        Adds `items` to the session. The flush inserts those of each table
+        together, in one batched `INSERT` that returns their ids.
+        """
+        self.session.add_all(items)
+
+    def _update_many(self, model: Type[T], items_data: Sequence[dict]) -> None:
+        """
+        Updates the `model` rows identified by the `id` of each of
+        `items_data` with the rest of it, in one executemany `UPDATE`.
+        Instances the session already holds get the new values too.
+
+        Raises `StaleDataError` when one of the rows doesn't exist.
+        """
+        if items_data:
+            self.session.execute(update(model), list(items_data))
+
+    def _delete_many(self, model: Type[T], ids: List[int]) -> int:
+        """
+        Deletes the `model` rows of `ids` in one statement, leaving children
+        to the `ON DELETE CASCADE` of their foreign keys, and returns how many
+        were deleted. Instances the session holds are marked deleted.
+        """
+        if not ids:
+            return 0
+        return self.session.execute(delete(model).where(model.id.in_(ids))).rowcount
@@ -0,0 +1,824 @@
+"""
+Repository keeping every row in process memory, so the resources can be
+tested and benchmarked without a database.
+"""
+import time
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Sequence, Tuple, Type, TypeVar
+
+from sqlalchemy import Date
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+
+from api.repository.database import (
+    AbstractRepository,
+    Deletion,
+    Ownership,
+    Page,
+    PageRequest,
+    user_revocation,
+)
+from api.repository.models import (
+    Exercises,
+    Food,
+    Humor,
+    ISODate,
+    Mood,
+    Sleep,
+    TokenRevocation,
+    User,
+    UserAuth,
+    Water,
+)
+from api.repository.statements import ENTRY_MODELS, MOOD_COLLECTIONS
+from api.repository.views import (
+    MODEL_VIEWS,
+    ExercisesView,
+    FoodView,
+    HumorView,
+    SleepView,
+    View,
+    WaterView,
+)
+
+T = TypeVar("T")
+
+# The tables kept in memory, each indexed by id.
+MODELS = [User, UserAuth, Mood, Humor, Water, Exercises, Food, Sleep, TokenRevocation]
+# The tables with a `date` column, also indexed by date.
+DATED_MODELS = [Mood, *ENTRY_MODELS]
+# The columns of each table stored as dates, which also take strings and
+# datetimes, as `ISODate` and the driver do.
+DATE_COLUMNS = {
+    model: [
+        column.key
+        for column in model.__table__.columns
+        if isinstance(column.type, (Date, ISODate))
+    ]
+    for model in MODELS
+}
+# The collection of `Mood` holding each entry model.
+ENTRY_COLLECTIONS = {model: key for key, model in MOOD_COLLECTIONS.items()}
+
+
+class Rows(list):
+    """
+    The rows of a lookup `SQLRepository` answers with a `Query`, supporting
+    the two methods the resources call on it.
+    """
+
+    def first(self) -> Any:
+        return self[0] if self else None
+
+    def all(self) -> list:
+        return list(self)
+
+
+def _as_date(value: Any) -> Any:
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def _within(item_date: date, page_request: PageRequest) -> bool:
+    return (page_request.date_from is None or item_date >= page_request.date_from) and (
+        page_request.date_to is None or item_date <= page_request.date_to
+    )
+
+
+# The SQLSTATE codes Postgres reports for the violations.
+UNIQUE_VIOLATION = "23505"
+FOREIGN_KEY_VIOLATION = "23503"
+
+
+class ConstraintViolation(Exception):
+    """
+    The driver error wrapped by the `IntegrityError` of a violated key. Like
+    the driver's, its `pgcode` tells the violations apart.
+    """
+
+    def __init__(self, message: str, pgcode: str) -> None:
+        super().__init__(message)
+        self.pgcode = pgcode
+
+
+def _integrity_error(constraint: str, pgcode: str) -> IntegrityError:
+    """
+    The error `SQLRepository` would raise on flush.
+    """
+    message = f"Violates {constraint}."
+    return IntegrityError(message, None, ConstraintViolation(message, pgcode))
+
+
+class InMemoryRepository(AbstractRepository):
+    """
+    Repository holding transient instances of the models in dicts: one per
+    table keyed by id, one per dated table keyed by date, moods keyed by
+    `(user_id, date)` and credentials keyed by username. Every lookup the
+    resources make is a hash lookup, and a page sorts one user's moods.
+
+    Changes apply right away, and each records how to undo it, so `rollback`
+    restores the state of the last `commit`. Unique and foreign keys are
+    enforced as the database would, and deleting a mood deletes its entries.
+
+    There is no isolation: every unit of work sees the changes of the others
+    before they are committed. It is meant for one request at a time.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.rows: Dict[Type, Dict[int, Any]] = {model: {} for model in MODELS}
+        self.rows_by_date: Dict[Type, Dict[date, Dict[int, Any]]] = {
+            model: {} for model in DATED_MODELS
+        }
+        self.moods_by_user_date: Dict[int, Dict[date, Mood]] = {}
+        self.user_auth_by_username: Dict[str, UserAuth] = {}
+        # The last id given to each table. Like sequences, ids are not given
+        # back on rollback, while the revocation version, a counter row in
+        # the database, is.
+        self.last_ids: Dict[Type, int] = {model: 0 for model in MODELS}
+        self.revocation_version = 0
+        self._undo_log: List[Callable[[], None]] = []
+
+    def commit(self) -> None:
+        self._undo_log.clear()
+
+    def rollback(self) -> None:
+        while self._undo_log:
+            self._undo_log.pop()()
+
+    def _insert(self, item: Any) -> None:
+        """
+        Fills the defaults and the id of `item`, as a flush would, and adds it
+        to the indexes.
+        """
+        model = type(item)
+        for column in model.__table__.columns:
+            value = getattr(item, column.key)
+            if value is None and column.default is not None:
+                if column.default.is_scalar:
+                    value = column.default.arg
+            setattr(item, column.key, value)
+        self._normalize(item)
+        if model is Mood:
+            # `Mood.as_dict` serializes the collections found in `__dict__`.
+            for key in MOOD_COLLECTIONS:
+                getattr(item, key)
+
+        self._check_keys(item)
+        if model is UserAuth and item.user_id is None and item.user is not None:
+            if item.user.id is None:
+                self._insert(item.user)
+            item.user_id = item.user.id
+        if item.id is None:
+            self.last_ids[model] += 1
+            item.id = self.last_ids[model]
+        else:
+            self.last_ids[model] = max(self.last_ids[model], item.id)
+        self._index(item)
+        self._undo_log.append(lambda: self._unindex(item))
+
+        if model is Mood:
+            for key in MOOD_COLLECTIONS:
+                for child in list(getattr(item, key)):
+                    if child.id is None:
+                        child.mood_id = item.id
+                        self._insert(child)
+
+    def _remove(self, item: Any) -> None:
+        """
+        Removes `item` from the indexes, along with the entries of a mood.
+        """
+        if type(item) is Mood:
+            for key in MOOD_COLLECTIONS:
+                for child in list(getattr(item, key)):
+                    self._remove(child)
+        self._unindex(item)
+        self._undo_log.append(lambda: self._index(item))
+
+    def _set(self, item: Any, item_data: dict) -> None:
+        """
+        Sets the values of `item_data` on `item` and reindexes it.
+        """
+        previous = {key: getattr(item, key) for key in item_data}
+        self._unindex(item)
+        try:
+            for key, value in item_data.items():
+                setattr(item, key, value)
+            self._normalize(item)
+            self._check_keys(item)
+        except Exception:
+            for key, value in previous.items():
+                setattr(item, key, value)
+            self._index(item)
+            raise
+        self._index(item)
+        self._undo_log.append(lambda: self._restore(item, previous))
+
+    def _restore(self, item: Any, previous: dict) -> None:
+        self._unindex(item)
+        for key, value in previous.items():
+            setattr(item, key, value)
+        self._index(item)
+
+    @staticmethod
+    def _normalize(item: Any) -> None:
+        for key in DATE_COLUMNS[type(item)]:
+            setattr(item, key, _as_date(getattr(item, key)))
+
+    def _check_keys(self, item: Any) -> None:
+        """
+        Raises the `IntegrityError` adding `item` would raise, if it takes
+        the unique key of another row or has no mood.
+        """
+        model = type(item)
+        if model is Mood:
+            other = self.moods_by_user_date.get(item.user_id, {}).get(item.date)
+            if other is not None and other is not item:
+                raise _integrity_error("uq_user_mood_user_id_date", UNIQUE_VIOLATION)
+        elif model is UserAuth:
+            other = self.user_auth_by_username.get(item.username)
+            if other is not None and other is not item:
+                raise _integrity_error("user_auth_username_key", UNIQUE_VIOLATION)
+        elif model in ENTRY_MODELS and item.mood_id not in self.rows[Mood]:
+            raise _integrity_error(
+                f"{model.__tablename__}_mood_id_fkey", FOREIGN_KEY_VIOLATION
+            )
+
+    def _index(self, item: Any) -> None:
+        model = type(item)
+        self.rows[model][item.id] = item
+        if model in DATED_MODELS:
+            self.rows_by_date[model].setdefault(item.date, {})[item.id] = item
+        if model is Mood:
+            self.moods_by_user_date.setdefault(item.user_id, {})[item.date] = item
+        elif model in ENTRY_MODELS:
+            # Entries stay in id order, as the loaders return them.
+            collection = getattr(
+                self.rows[Mood][item.mood_id], ENTRY_COLLECTIONS[model]
+            )
+            if not any(child is item for child in collection):
+                position = sum(1 for child in collection if child.id < item.id)
+                collection.insert(position, item)
+        elif model is UserAuth:
+            self.user_auth_by_username[item.username] = item
+
+    def _unindex(self, item: Any) -> None:
+        model = type(item)
+        del self.rows[model][item.id]
+        if model in DATED_MODELS:
+            rows = self.rows_by_date[model][item.date]
+            del rows[item.id]
+            if not rows:
+                del self.rows_by_date[model][item.date]
+        if model is Mood:
+            del self.moods_by_user_date[item.user_id][item.date]
+        elif model in ENTRY_MODELS:
+            mood = self.rows[Mood].get(item.mood_id)
+            if mood is not None:
+                collection = getattr(mood, ENTRY_COLLECTIONS[model])
+                for position, child in enumerate(collection):
+                    if child is item:
+                        del collection[position]
+                        break
+        elif model is UserAuth:
+            del self.user_auth_by_username[item.username]
+
+    def _owner_id(self, item: Any) -> int:
+        if type(item) is Mood:
+            return item.user_id
+        return self.rows[Mood][item.mood_id].user_id
+
+    def _get_by_id_for_user(
+        self, model: Type[T], item_id: int, user_id: int
+    ) -> Ownership[T]:
+        item = self.rows[model].get(item_id)
+        if item is None:
+            return Ownership(None, False)
+        return Ownership(item if self._owner_id(item) == user_id else None, True)
+
+    def _get_by_date(self, model: Type[T], item_date: datetime) -> Rows:
+        rows = self.rows_by_date[model].get(_as_date(item_date), {})
+        return Rows(sorted(rows.values(), key=lambda item: item.id))
+
+    def _get_by_date_for_user(
+        self, model: Type[T], item_date: datetime, user_id: int
+    ) -> List[T]:
+        item_date = _as_date(item_date)
+        if model is Mood:
+            mood = self.moods_by_user_date.get(user_id, {}).get(item_date)
+            return [] if mood is None else [mood]
+        return [
+            item
+            for item in self._get_by_date(model, item_date)
+            if self._owner_id(item) == user_id
+        ]
+
+    def _update_by_id_for_user(
+        self, model: Type[T], item_id: int, user_id: int, item_data: dict
+    ) -> Ownership[T]:
+        ownership = self._get_by_id_for_user(model, item_id, user_id)
+        if ownership.item is not None:
+            self._set(ownership.item, item_data)
+        return ownership
+
+    def _delete_by_date_for_user(
+        self, model: Type[T], item_date: datetime, user_id: int
+    ) -> Deletion:
+        item_date = _as_date(item_date)
+        found = item_date in self.rows_by_date[model]
+        items = self._get_by_date_for_user(model, item_date, user_id)
+        for item in items:
+            self._remove(item)
+        return Deletion(len(items), found)
+
+    def _page_moods(self, user_id: int, page_request: PageRequest) -> List[Mood]:
+        """
+        Returns the moods of `user_id` dated within `page_request`, by date.
+        """
+        moods = self.moods_by_user_date.get(user_id, {})
+        return [
+            moods[mood_date]
+            for mood_date in sorted(moods)
+            if _within(mood_date, page_request)
+        ]
+
+    @staticmethod
+    def _page(
+        keyed: List[Tuple[Tuple[date, int], Any]], page_request: PageRequest
+    ) -> Page:
+        """
+        Returns the page of `page_request` out of `(key, item)` pairs sorted
+        by key.
+        """
+        if page_request.after is not None:
+            keyed = [(key, item) for key, item in keyed if key > page_request.after]
+        page = keyed[: page_request.limit]
+        next_after = page[-1][0] if len(keyed) > page_request.limit else None
+        return Page([item for _, item in page], next_after)
+
+    def _get_page_for_user(
+        self, model: Type[T], user_id: int, page_request: PageRequest
+    ) -> Page[T]:
+        """
+        Returns a page of the `model` rows whose mood belongs to `user_id`,
+        keyed by the date of their mood and their id, like `SQLRepository`.
+        """
+        keyed = [
+            ((mood.date, item.id), item)
+            for mood in self._page_moods(user_id, page_request)
+            for item in getattr(mood, ENTRY_COLLECTIONS[model])
+        ]
+        return self._page(keyed, page_request)
+
+    @staticmethod
+    def _view(item: Any) -> View:
+        view = MODEL_VIEWS[type(item)]
+        return view(*[getattr(item, name) for name in view.__slots__])
+
+    def _get_view_by_id_for_user(
+        self, model: Type, item_id: int, user_id: int
+    ) -> Ownership[View]:
+        item, found = self._get_by_id_for_user(model, item_id, user_id)
+        return Ownership(None if item is None else self._view(item), found)
+
+    def _get_views_by_date_for_user(
+        self, model: Type, item_date: datetime, user_id: int
+    ) -> List[View]:
+        items = self._get_by_date_for_user(model, item_date, user_id)
+        return [self._view(item) for item in items]
+
+    def _get_views_page_for_user(
+        self, model: Type, user_id: int, page_request: PageRequest
+    ) -> Page[View]:
+        page = self._get_page_for_user(model, user_id, page_request)
+        return Page([self._view(item) for item in page.items], page.next_after)
+
+    def _add_humor(self, humor: Humor) -> None:
+        self._insert(humor)
+
+    def _get_humor_by_id(self, humor_id: int) -> Humor:
+        return self.rows[Humor].get(humor_id)
+
+    def _get_humor_by_id_for_user(
+        self, humor_id: int, user_id: int
+    ) -> Ownership[Humor]:
+        return self._get_by_id_for_user(Humor, humor_id, user_id)
+
+    def _get_humor_by_date(self, humor_date: datetime) -> Rows:
+        return self._get_by_date(Humor, humor_date)
+
+    def _get_humor_by_date_for_user(
+        self, humor_date: datetime, user_id: int
+    ) -> List[Humor]:
+        return self._get_by_date_for_user(Humor, humor_date, user_id)
+
+    def _get_humor_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[Humor]:
+        return self._get_page_for_user(Humor, user_id, page_request)
+
+    def _get_humor_view_by_id_for_user(
+        self, humor_id: int, user_id: int
+    ) -> Ownership[HumorView]:
+        return self._get_view_by_id_for_user(Humor, humor_id, user_id)
+
+    def _get_humor_views_by_date_for_user(
+        self, humor_date: datetime, user_id: int
+    ) -> List[HumorView]:
+        return self._get_views_by_date_for_user(Humor, humor_date, user_id)
+
+    def _get_humor_views_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[HumorView]:
+        return self._get_views_page_for_user(Humor, user_id, page_request)
+
+    def _update_humor(self, humor: Humor, humor_data: dict) -> None:
+        self._set(humor, humor_data)
+
+    def _update_humor_by_id_for_user(
+        self, humor_id: int, user_id: int, humor_data: dict
+    ) -> Ownership[Humor]:
+        return self._update_by_id_for_user(Humor, humor_id, user_id, humor_data)
+
+    def _delete_humor(self, humor: Humor) -> None:
+        self._remove(humor)
+
+    def _delete_humor_by_date_for_user(
+        self, humor_date: datetime, user_id: int
+    ) -> Deletion:
+        return self._delete_by_date_for_user(Humor, humor_date, user_id)
+
+    def _add_water_intake(self, water_intake: Water) -> None:
+        self._insert(water_intake)
+
+    def _get_water_intake_by_id(self, water_intake_id: int) -> Water:
+        return self.rows[Water].get(water_intake_id)
+
+    def _get_water_intake_by_id_for_user(
+        self, water_intake_id: int, user_id: int
+    ) -> Ownership[Water]:
+        return self._get_by_id_for_user(Water, water_intake_id, user_id)
+
+    def _get_water_intake_by_date(self, water_intake_date: datetime) -> Rows:
+        return self._get_by_date(Water, water_intake_date)
+
+    def _get_water_intake_by_date_for_user(
+        self, water_intake_date: datetime, user_id: int
+    ) -> List[Water]:
+        return self._get_by_date_for_user(Water, water_intake_date, user_id)
+
+    def _get_water_intake_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[Water]:
+        return self._get_page_for_user(Water, user_id, page_request)
+
+    def _get_water_intake_view_by_id_for_user(
+        self, water_intake_id: int, user_id: int
+    ) -> Ownership[WaterView]:
+        return self._get_view_by_id_for_user(Water, water_intake_id, user_id)
+
+    def _get_water_intake_views_by_date_for_user(
+        self, water_intake_date: datetime, user_id: int
+    ) -> List[WaterView]:
+        return self._get_views_by_date_for_user(Water, water_intake_date, user_id)
+
+    def _get_water_intake_views_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[WaterView]:
+        return self._get_views_page_for_user(Water, user_id, page_request)
+
+    def _update_water_intake(
+        self, water_intake: Water, water_intake_data: dict
+    ) -> None:
+        self._set(water_intake, water_intake_data)
+
+    def _update_water_intake_by_id_for_user(
+        self, water_intake_id: int, user_id: int, water_intake_data: dict
+    ) -> Ownership[Water]:
+        return self._update_by_id_for_user(
+            Water, water_intake_id, user_id, water_intake_data
+        )
+
+    def _delete_water_intake(self, water_intake: Water) -> None:
+        self._remove(water_intake)
+
+    def _delete_water_intake_by_date_for_user(
+        self, water_intake_date: datetime, user_id: int
+    ) -> Deletion:
+        return self._delete_by_date_for_user(Water, water_intake_date, user_id)
+
+    def _add_exercises(self, exercises: Exercises) -> None:
+        self._insert(exercises)
+
+    def _get_exercises_by_id(self, exercises_id: int) -> Exercises:
+        return self.rows[Exercises].get(exercises_id)
+
+    def _get_exercises_by_id_for_user(
+        self, exercises_id: int, user_id: int
+    ) -> Ownership[Exercises]:
+        return self._get_by_id_for_user(Exercises, exercises_id, user_id)
+
+    def _get_exercises_by_date(self, exercises_date: datetime) -> Rows:
+        return self._get_by_date(Exercises, exercises_date)
+
+    def _get_exercises_by_date_for_user(
+        self, exercises_date: datetime, user_id: int
+    ) -> List[Exercises]:
+        return self._get_by_date_for_user(Exercises, exercises_date, user_id)
+
+    def _get_exercises_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[Exercises]:
+        return self._get_page_for_user(Exercises, user_id, page_request)
+
+    def _get_exercises_view_by_id_for_user(
+        self, exercises_id: int, user_id: int
+    ) -> Ownership[ExercisesView]:
+        return self._get_view_by_id_for_user(Exercises, exercises_id, user_id)
+
+    def _get_exercises_views_by_date_for_user(
+        self, exercises_date: datetime, user_id: int
+    ) -> List[ExercisesView]:
+        return self._get_views_by_date_for_user(Exercises, exercises_date, user_id)
+
+    def _get_exercises_views_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[ExercisesView]:
+        return self._get_views_page_for_user(Exercises, user_id, page_request)
+
+    def _update_exercises(self, exercises: Exercises, exercises_data: dict) -> None:
+        self._set(exercises, exercises_data)
+
+    def _update_exercises_by_id_for_user(
+        self, exercises_id: int, user_id: int, exercises_data: dict
+    ) -> Ownership[Exercises]:
+        return self._update_by_id_for_user(
+            Exercises, exercises_id, user_id, exercises_data
+        )
+
+    def _delete_exercises(self, exercises: Exercises) -> None:
+        self._remove(exercises)
+
+    def _delete_exercises_by_date_for_user(
+        self, exercises_date: datetime, user_id: int
+    ) -> Deletion:
+        return self._delete_by_date_for_user(Exercises, exercises_date, user_id)
+
+    def _add_food_habits(self, food_habits: Food) -> None:
+        self._insert(food_habits)
+
+    def _get_food_habits_by_id(self, food_habits_id: int) -> Food:
+        return self.rows[Food].get(food_habits_id)
+
+    def _get_food_habits_by_id_for_user(
+        self, food_habits_id: int, user_id: int
+    ) -> Ownership[Food]:
+        return self._get_by_id_for_user(Food, food_habits_id, user_id)
+
+    def _get_food_habits_by_date(self, food_habits_date: datetime) -> Rows:
+        return self._get_by_date(Food, food_habits_date)
+
+    def _get_food_habits_by_date_for_user(
+        self, food_habits_date: datetime, user_id: int
+    ) -> List[Food]:
+        return self._get_by_date_for_user(Food, food_habits_date, user_id)
+
+    def _get_food_habits_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[Food]:
+        return self._get_page_for_user(Food, user_id, page_request)
+
+    def _get_food_habits_view_by_id_for_user(
+        self, food_habits_id: int, user_id: int
+    ) -> Ownership[FoodView]:
+        return self._get_view_by_id_for_user(Food, food_habits_id, user_id)
+
+    def _get_food_habits_views_by_date_for_user(
+        self, food_habits_date: datetime, user_id: int
+    ) -> List[FoodView]:
+        return self._get_views_by_date_for_user(Food, food_habits_date, user_id)
+
+    def _get_food_habits_views_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[FoodView]:
+        return self._get_views_page_for_user(Food, user_id, page_request)
+
+    def _update_food_habits(self, food_habits: Food, food_habits_data: dict) -> None:
+        self._set(food_habits, food_habits_data)
+
+    def _update_food_habits_by_id_for_user(
+        self, food_habits_id: int, user_id: int, food_habits_data: dict
+    ) -> Ownership[Food]:
+        return self._update_by_id_for_user(
+            Food, food_habits_id, user_id, food_habits_data
+        )
+
+    def _delete_food_habits(self, food_habits: Food) -> None:
+        self._remove(food_habits)
+
+    def _delete_food_habits_by_date_for_user(
+        self, food_habits_date: datetime, user_id: int
+    ) -> Deletion:
+        return self._delete_by_date_for_user(Food, food_habits_date, user_id)
+
+    def _add_sleep(self, sleep: Sleep) -> None:
+        self._insert(sleep)
+
+    def _get_sleep_by_id(self, sleep_id: int) -> Sleep:
+        return self.rows[Sleep].get(sleep_id)
+
+    def _get_sleep_by_id_for_user(
+        self, sleep_id: int, user_id: int
+    ) -> Ownership[Sleep]:
+        return self._get_by_id_for_user(Sleep, sleep_id, user_id)
+
+    def _get_sleep_by_date(self, sleep_date: datetime) -> Rows:
+        return self._get_by_date(Sleep, sleep_date)
+
+    def _get_sleep_by_date_for_user(
+        self, sleep_date: datetime, user_id: int
+    ) -> List[Sleep]:
+        return self._get_by_date_for_user(Sleep, sleep_date, user_id)
+
+    def _get_sleep_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[Sleep]:
+        return self._get_page_for_user(Sleep, user_id, page_request)
+
+    def _get_sleep_view_by_id_for_user(
+        self, sleep_id: int, user_id: int
+    ) -> Ownership[SleepView]:
+        return self._get_view_by_id_for_user(Sleep, sleep_id, user_id)
+
+    def _get_sleep_views_by_date_for_user(
+        self, sleep_date: datetime, user_id: int
+    ) -> List[SleepView]:
+        return self._get_views_by_date_for_user(Sleep, sleep_date, user_id)
+
+    def _get_sleep_views_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[SleepView]:
+        return self._get_views_page_for_user(Sleep, user_id, page_request)
+
+    def _update_sleep(self, sleep: Sleep, sleep_data: dict) -> None:
+        self._set(sleep, sleep_data)
+
+    def _update_sleep_by_id_for_user(
+        self, sleep_id: int, user_id: int, sleep_data: dict
+    ) -> Ownership[Sleep]:
+        return self._update_by_id_for_user(Sleep, sleep_id, user_id, sleep_data)
+
+    def _delete_sleep(self, sleep: Sleep) -> None:
+        self._remove(sleep)
+
+    def _delete_sleep_by_date_for_user(
+        self, sleep_date: datetime, user_id: int
+    ) -> Deletion:
+        return self._delete_by_date_for_user(Sleep, sleep_date, user_id)
+
+    def _add_mood(self, mood: Mood) -> None:
+        self._insert(mood)
+
+    def _get_mood_by_id(self, mood_id: int) -> Mood:
+        return self.rows[Mood].get(mood_id)
+
+    def _get_mood_by_id_for_user(self, mood_id: int, user_id: int) -> Ownership[Mood]:
+        return self._get_by_id_for_user(Mood, mood_id, user_id)
+
+    def _get_mood_by_date(self, mood_date: datetime) -> Rows:
+        return self._get_by_date(Mood, mood_date)
+
+    def _get_mood_by_date_for_user(
+        self, mood_date: datetime, user_id: int
+    ) -> List[Mood]:
+        return self._get_by_date_for_user(Mood, mood_date, user_id)
+
+    def _get_mood_document_by_id_for_user(
+        self, mood_id: int, user_id: int
+    ) -> Ownership[dict]:
+        mood, found = self._get_by_id_for_user(Mood, mood_id, user_id)
+        return Ownership(None if mood is None else mood.as_dict(), found)
+
+    def _get_mood_documents_by_date_for_user(
+        self, mood_date: datetime, user_id: int
+    ) -> List[dict]:
+        moods = self._get_by_date_for_user(Mood, mood_date, user_id)
+        return [mood.as_dict() for mood in moods]
+
+    def _get_mood_documents_page_for_user(
+        self, user_id: int, page_request: PageRequest
+    ) -> Page[dict]:
+        keyed = [
+            ((mood.date, mood.id), mood.as_dict())
+            for mood in self._page_moods(user_id, page_request)
+        ]
+        return self._page(keyed, page_request)
+
+    def _get_or_add_mood_id(self, mood_date: datetime, user_id: int) -> int:
+        mood = self.moods_by_user_date.get(user_id, {}).get(_as_date(mood_date))
+        if mood is None:
+            mood = Mood(user_id=user_id, date=mood_date)
+            self._insert(mood)
+        return mood.id
+
+    def _delete_mood(self, mood: Mood) -> None:
+        self._remove(mood)
+
+    def _delete_mood_by_date_for_user(
+        self, mood_date: datetime, user_id: int
+    ) -> Deletion:
+        return self._delete_by_date_for_user(Mood, mood_date, user_id)
+
+    def _add_user(self, user: User) -> None:
+        self._insert(user)
+
+    def _get_user_by_id(self, user_id: int) -> User:
+        return self.rows[User].get(user_id)
+
+    def _update_user(self, user: User, user_data: dict) -> None:
+        self._set(user, user_data)
+
+    def _add_user_auth(self, user_auth: UserAuth) -> None:
+        self._insert(user_auth)
+
+    def _get_all_user_auth(self) -> Rows:
+        return Rows(self.rows[UserAuth].values())
+
+    def _get_user_auth_by_username(self, username: str) -> UserAuth:
+        return self.user_auth_by_username.get(username)
+
+    def _update_user_auth(self, user_auth: UserAuth, user_auth_data: dict) -> None:
+        self._set(user_auth, user_auth_data)
+
+    def _deactivate_user_auth(self, user_auth: UserAuth) -> None:
+        self._set(user_auth, {"active": False})
+        self._revoke_user_tokens(user_auth)
+
+    def _delete_user_auth(self, user_auth: UserAuth) -> None:
+        self._revoke_user_tokens(user_auth)
+        self._remove(user_auth)
+
+    def _revoke_user_tokens(self, user_auth: UserAuth) -> None:
+        self._add_token_revocation(user_revocation(user_auth))
+
+    def _add_token_revocation(self, revocation: TokenRevocation) -> None:
+        version = self.revocation_version
+        self.revocation_version += 1
+        self._undo_log.append(lambda: setattr(self, "revocation_version", version))
+        revocation.version = self.revocation_version
+        now = int(time.time())
+        for expired in [
+            row
+            for row in self.rows[TokenRevocation].values()
+            if row.expires_at is not None and row.expires_at <= now
+        ]:
+            self._remove(expired)
+        self._insert(revocation)
+
+    def _get_token_revocations_since(self, version: int) -> List[TokenRevocation]:
+        now = int(time.time())
+        return sorted(
+            (
+                revocation
+                for revocation in self.rows[TokenRevocation].values()
+                if revocation.version > version
+                and (revocation.expires_at is None or revocation.expires_at > now)
+            ),
+            key=lambda revocation: revocation.version,
+        )
+
+    def _get_many(self, model: Type[T], ids: List[int]) -> List[T]:
+        rows = self.rows[model]
+        return [rows[item_id] for item_id in sorted(set(ids)) if item_id in rows]
+
+    def _add_many(self, items: Sequence[T]) -> None:
+        for item in items:
+            self._insert(item)
+
+    def _update_many(self, model: Type[T], items_data: Sequence[dict]) -> None:
+        """
+        Raises `StaleDataError`, naming the ids not found, when some of the
+        rows don't exist. No row is updated then.
+        """
+        missing = [
+            item_data["id"]
+            for item_data in items_data
+            if item_data["id"] not in self.rows[model]
+        ]
+        if missing:
+            raise StaleDataError(
+                f"UPDATE statement on table '{model.__tablename__}' found no "
+                f"rows with ids {missing}."
+            )
+        for item_data in items_data:
+            item_data = dict(item_data)
+            self._set(self.rows[model][item_data.pop("id")], item_data)
+
+    def _delete_many(self, model: Type[T], ids: List[int]) -> int:
+        items = self._get_many(model, ids)
+        for item in items:
+            self._remove(item)
+        return len(items)
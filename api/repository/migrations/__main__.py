@@ -0,0 +1,62 @@
+import click
+from sqlalchemy import create_engine
+
+from api.config.config import get_db_uri
+from api.repository.migrations.runner import MigrationRunner
+
+
+@click.group()
+@click.pass_context
+def cli(ctx: click.Context) -> None:
+    """
+    Manages the database schema.
+
+    Run it once per deploy, before starting the workers:
+
+        python -m api.repository.migrations upgrade
+    """
+    ctx.obj = MigrationRunner(create_engine(get_db_uri()))
+
+
+@cli.command()
+@click.option(
+    "--target", default=None, help="Revision to upgrade to. Defaults to the latest."
+)
+@click.pass_obj
+def upgrade(runner: MigrationRunner, target: str) -> None:
+    """Applies pending migrations."""
+    applied = runner.upgrade(target)
+    for migration in applied:
+        click.echo(f"Applied {migration.revision}: {migration.description}")
+    if not applied:
+        click.echo("Database is up to date.")
+
+
+@cli.command()
+@click.option(
+    "--target",
+    default=None,
+    help="Revision to downgrade to, or `base` to revert everything. Defaults to one step back.",
+)
+@click.pass_obj
+def downgrade(runner: MigrationRunner, target: str) -> None:
+    """Reverts applied migrations."""
+    reverted = runner.downgrade(target)
+    for migration in reverted:
+        click.echo(f"Reverted {migration.revision}: {migration.description}")
+    if not reverted:
+        click.echo("Nothing to revert.")
+
+
+@cli.command()
+@click.pass_obj
+def status(runner: MigrationRunner) -> None:
+    """Lists every migration and whether it is applied."""
+    applied = set(runner.applied_revisions())
+    for migration in runner.migrations:
+        state = "applied" if migration.revision in applied else "pending"
+        click.echo(f"{migration.revision} [{state}] {migration.description}")
+
+
+if __name__ == "__main__":
+    cli()
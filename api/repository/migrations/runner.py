@@ -0,0 +1,199 @@
+import importlib
+import logging
+import logging.config
+import pkgutil
+from contextlib import contextmanager
+from datetime import datetime
+from types import ModuleType
+from typing import Iterator, List, Optional
+
+from sqlalchemy import Connection, Engine, text
+
+from api.config.config import get_logging_conf
+from api.repository.migrations import versions
+
+logging.config.fileConfig(get_logging_conf())
+simpleLogger = logging.getLogger("simpleLogger")
+detailedLogger = logging.getLogger("detailedLogger")
+
+VERSION_TABLE = "schema_version"
+# Arbitrary key shared by every runner, so concurrent deploys apply migrations one at a time.
+ADVISORY_LOCK_KEY = 7_311_624
+
+
+class Migration:
+    """
+    A versioned schema change loaded from a module in `versions`.
+
+    The module must define `revision`, `description`, `upgrade(connection)` and
+    `downgrade(connection)`. Revisions are applied in lexicographic order.
+
+    A module may set `transactional = False` for statements Postgres won't run
+    in a transaction, like `CREATE INDEX CONCURRENTLY`. Its statements then
+    commit one by one, so a failed migration must be safe to run again.
+    """
+
+    def __init__(self, module: ModuleType) -> None:
+        self.revision: str = module.revision
+        self.description: str = module.description
+        self.upgrade = module.upgrade
+        self.downgrade = module.downgrade
+        self.transactional: bool = getattr(module, "transactional", True)
+
+    def __repr__(self) -> str:
+        return f'Migration("revision"="{self.revision}", "description"="{self.description}")'
+
+
+def load_migrations() -> List[Migration]:
+    migrations = [
+        Migration(importlib.import_module(f"{versions.__name__}.{module.name}"))
+        for module in pkgutil.iter_modules(versions.__path__)
+    ]
+    return sorted(migrations, key=lambda migration: migration.revision)
+
+
+class MigrationRunner:
+    """
+    Applies and reverts migrations, recording each applied revision in the
+    version table. Every migration runs in its own transaction, unless it is
+    not transactional.
+    """
+
+    def __init__(
+        self, engine: Engine, migrations: Optional[List[Migration]] = None
+    ) -> None:
+        self.engine = engine
+        self.migrations = migrations if migrations is not None else load_migrations()
+
+    def applied_revisions(self) -> List[str]:
+        with self.engine.begin() as connection:
+            self._create_version_table(connection)
+            rows = connection.execute(
+                text(f"SELECT revision FROM {VERSION_TABLE} ORDER BY revision")
+            )
+            return [row.revision for row in rows]
+
+    def current_revision(self) -> Optional[str]:
+        applied = self.applied_revisions()
+        return applied[-1] if applied else None
+
+    def pending(self) -> List[Migration]:
+        applied = set(self.applied_revisions())
+        return [m for m in self.migrations if m.revision not in applied]
+
+    def upgrade(self, target: Optional[str] = None) -> List[Migration]:
+        """
+        Applies every pending migration up to and including `target`.
+        """
+        self._check_target(target)
+        applied = []
+        for migration in self.pending():
+            if target and migration.revision > target:
+                break
+            with self._connect(migration) as connection:
+                if self._is_applied(connection, migration):
+                    continue
+                simpleLogger.info(f"Applying migration {migration.revision}.")
+                migration.upgrade(connection)
+                connection.execute(
+                    text(
+                        f"INSERT INTO {VERSION_TABLE} (revision, description, applied_at) "
+                        "VALUES (:revision, :description, :applied_at)"
+                    ),
+                    {
+                        "revision": migration.revision,
+                        "description": migration.description,
+                        "applied_at": datetime.now(),
+                    },
+                )
+            applied.append(migration)
+        return applied
+
+    def downgrade(self, target: Optional[str] = None) -> List[Migration]:
+        """
+        Reverts applied migrations newer than `target`.
+
+        Without a target only the latest migration is reverted. Use `base` as
+        target to revert all of them.
+        """
+        if target != "base":
+            self._check_target(target)
+        applied = set(self.applied_revisions())
+        to_revert = [m for m in reversed(self.migrations) if m.revision in applied]
+        if target is None:
+            to_revert = to_revert[:1]
+        elif target != "base":
+            to_revert = [m for m in to_revert if m.revision > target]
+
+        reverted = []
+        for migration in to_revert:
+            with self._connect(migration) as connection:
+                if not self._is_applied(connection, migration):
+                    continue
+                simpleLogger.info(f"Reverting migration {migration.revision}.")
+                migration.downgrade(connection)
+                connection.execute(
+                    text(f"DELETE FROM {VERSION_TABLE} WHERE revision = :revision"),
+                    {"revision": migration.revision},
+                )
+            reverted.append(migration)
+        return reverted
+
+    def _check_target(self, target: Optional[str]) -> None:
+        if target and target not in [m.revision for m in self.migrations]:
+            raise ValueError(f"Unknown migration revision {target}.")
+
+    def _is_applied(self, connection: Connection, migration: Migration) -> bool:
+        return bool(
+            connection.execute(
+                text(f"SELECT 1 FROM {VERSION_TABLE} WHERE revision = :revision"),
+                {"revision": migration.revision},
+            ).first()
+        )
+
+    @contextmanager
+    def _connect(self, migration: Migration) -> Iterator[Connection]:
+        """
+        Yields a connection holding the advisory lock, in a transaction
+        committed on exit for transactional migrations, in autocommit mode
+        otherwise.
+        """
+        if migration.transactional:
+            with self.engine.begin() as connection:
+                self._lock(connection)
+                yield connection
+            return
+
+        with self.engine.connect() as connection:
+            connection.execution_options(isolation_level="AUTOCOMMIT")
+            self._lock(connection, session=True)
+            try:
+                yield connection
+            finally:
+                if connection.dialect.name == "postgresql":
+                    connection.execute(
+                        text("SELECT pg_advisory_unlock(:key)"),
+                        {"key": ADVISORY_LOCK_KEY},
+                    )
+
+    def _lock(self, connection: Connection, session: bool = False) -> None:
+        """
+        Takes the advisory lock until the transaction ends, or, with
+        `session`, until it is released.
+        """
+        self._create_version_table(connection)
+        if connection.dialect.name == "postgresql":
+            function = "pg_advisory_lock" if session else "pg_advisory_xact_lock"
+            connection.execute(
+                text(f"SELECT {function}(:key)"), {"key": ADVISORY_LOCK_KEY}
+            )
+
+    def _create_version_table(self, connection: Connection) -> None:
+        connection.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {VERSION_TABLE} ("
+                "revision VARCHAR(32) PRIMARY KEY, "
+                "description VARCHAR(256) NOT NULL, "
+                "applied_at TIMESTAMP NOT NULL)"
+            )
+        )
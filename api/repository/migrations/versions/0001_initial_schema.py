@@ -0,0 +1,113 @@
+"""
+Creates the tables that used to be created by `Base.metadata.create_all`.
+
+Every statement is idempotent, so databases created before migrations existed
+are adopted as they are.
+"""
+from sqlalchemy import Connection, text
+
+revision = "0001"
+description = "Initial schema"
+
+TABLES = {
+    "users": """
+        CREATE TABLE IF NOT EXISTS users (
+            id SERIAL NOT NULL,
+            PRIMARY KEY (id)
+        )
+    """,
+    "user_auth": """
+        CREATE TABLE IF NOT EXISTS user_auth (
+            id SERIAL NOT NULL,
+            username VARCHAR(128) NOT NULL,
+            password VARCHAR(256) NOT NULL,
+            created_at DATE NOT NULL,
+            last_login DATE NOT NULL,
+            token VARCHAR(512) NOT NULL,
+            active BOOLEAN NOT NULL,
+            user_id INTEGER NOT NULL,
+            PRIMARY KEY (id),
+            UNIQUE (username),
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    """,
+    "user_mood": """
+        CREATE TABLE IF NOT EXISTS user_mood (
+            id SERIAL NOT NULL,
+            date DATE NOT NULL,
+            score INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            PRIMARY KEY (id),
+            UNIQUE (date),
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    """,
+    "user_exercises": """
+        CREATE TABLE IF NOT EXISTS user_exercises (
+            id SERIAL NOT NULL,
+            date DATE NOT NULL,
+            minutes INTEGER NOT NULL,
+            description VARCHAR,
+            mood_id INTEGER NOT NULL,
+            PRIMARY KEY (id),
+            FOREIGN KEY (mood_id) REFERENCES user_mood (id)
+        )
+    """,
+    "user_food_habits": """
+        CREATE TABLE IF NOT EXISTS user_food_habits (
+            id SERIAL NOT NULL,
+            date DATE NOT NULL,
+            value INTEGER NOT NULL,
+            description VARCHAR(256) NOT NULL,
+            mood_id INTEGER NOT NULL,
+            PRIMARY KEY (id),
+            FOREIGN KEY (mood_id) REFERENCES user_mood (id)
+        )
+    """,
+    "user_humor": """
+        CREATE TABLE IF NOT EXISTS user_humor (
+            id SERIAL NOT NULL,
+            date DATE NOT NULL,
+            value INTEGER NOT NULL,
+            description VARCHAR,
+            health_based BOOLEAN NOT NULL,
+            mood_id INTEGER NOT NULL,
+            PRIMARY KEY (id),
+            FOREIGN KEY (mood_id) REFERENCES user_mood (id)
+        )
+    """,
+    "user_sleep": """
+        CREATE TABLE IF NOT EXISTS user_sleep (
+            id SERIAL NOT NULL,
+            date DATE NOT NULL,
+            value INTEGER NOT NULL,
+            minutes INTEGER NOT NULL,
+            description VARCHAR,
+            mood_id INTEGER NOT NULL,
+            PRIMARY KEY (id),
+            FOREIGN KEY (mood_id) REFERENCES user_mood (id)
+        )
+    """,
+    "user_water_intake": """
+        CREATE TABLE IF NOT EXISTS user_water_intake (
+            id SERIAL NOT NULL,
+            date DATE NOT NULL,
+            milliliters INTEGER NOT NULL,
+            description VARCHAR,
+            pee BOOLEAN NOT NULL,
+            mood_id INTEGER NOT NULL,
+            PRIMARY KEY (id),
+            FOREIGN KEY (mood_id) REFERENCES user_mood (id)
+        )
+    """,
+}
+
+
+def upgrade(connection: Connection) -> None:
+    for statement in TABLES.values():
+        connection.execute(text(statement))
+
+
+def downgrade(connection: Connection) -> None:
+    for table in reversed(TABLES):
+        connection.execute(text(f"DROP TABLE IF EXISTS {table}"))
@@ -0,0 +1,45 @@
+"""
+Adds the token revocation list and the counter that versions it.
+"""
+from sqlalchemy import Connection, text
+
+revision = "0002"
+description = "Token revocation"
+
+TABLES = {
+    "token_revocation": """
+        CREATE TABLE IF NOT EXISTS token_revocation (
+            id SERIAL NOT NULL,
+            version BIGINT NOT NULL,
+            jti VARCHAR(64),
+            user_auth_id INTEGER,
+            revoked_at BIGINT NOT NULL,
+            expires_at BIGINT,
+            PRIMARY KEY (id),
+            UNIQUE (version)
+        )
+    """,
+    "token_revocation_counter": """
+        CREATE TABLE IF NOT EXISTS token_revocation_counter (
+            id INTEGER NOT NULL,
+            value BIGINT NOT NULL,
+            PRIMARY KEY (id)
+        )
+    """,
+}
+
+
+def upgrade(connection: Connection) -> None:
+    for statement in TABLES.values():
+        connection.execute(text(statement))
+    connection.execute(
+        text(
+            "INSERT INTO token_revocation_counter (id, value) VALUES (1, 0) "
+            "ON CONFLICT (id) DO NOTHING"
+        )
+    )
+
+
+def downgrade(connection: Connection) -> None:
+    for table in reversed(TABLES):
+        connection.execute(text(f"DROP TABLE IF EXISTS {table}"))
@@ -0,0 +1,78 @@
+"""
+Indexes the per-user, per-date access paths.
+
+`user_mood.date` was unique across every user, so only one user could log a
+mood per day. It becomes unique per user instead, through an index on
+`(user_id, date)` that also serves the by-date lookups. The child tables get
+indexes on `mood_id`, for the joins from their mood, and on `date`.
+
+Index names follow SQLAlchemy's `ix_<table>_<column>`, so databases created by
+`Base.metadata.create_all` end up the same.
+
+The indexes are built `CONCURRENTLY`, so the tables still take writes while
+they are. That can't run in a transaction, so neither does this migration. A
+build that fails leaves an invalid index behind, which the next run drops and
+builds again. The per-user unique index is built before the unique `date`
+constraint is dropped, so no duplicate can slip in between.
+"""
+from sqlalchemy import Connection, text
+
+revision = "0003"
+description = "Per-user date indexes"
+transactional = False
+
+CHILD_TABLES = [
+    "user_humor",
+    "user_water_intake",
+    "user_exercises",
+    "user_food_habits",
+    "user_sleep",
+]
+
+INDEXES = {
+    "uq_user_mood_user_id_date": """
+        CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_user_mood_user_id_date
+        ON user_mood (user_id, date)
+    """,
+}
+for table in CHILD_TABLES:
+    for column in ["mood_id", "date"]:
+        name = f"ix_{table}_{column}"
+        INDEXES[name] = (
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} " f"({column})"
+        )
+
+
+def drop_if_invalid(connection: Connection, index: str) -> None:
+    """
+    Drops `index` if a failed concurrent build left it invalid, since
+    `IF NOT EXISTS` would keep it as is.
+    """
+    invalid = connection.execute(
+        text(
+            "SELECT 1 FROM pg_index JOIN pg_class ON pg_class.oid = pg_index.indexrelid "
+            "WHERE pg_class.relname = :index AND NOT pg_index.indisvalid"
+        ),
+        {"index": index},
+    ).first()
+    if invalid:
+        connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index}"))
+
+
+def upgrade(connection: Connection) -> None:
+    for index, statement in INDEXES.items():
+        drop_if_invalid(connection, index)
+        connection.execute(text(statement))
+    # The name Postgres gave to the `UNIQUE (date)` of the initial schema.
+    connection.execute(
+        text("ALTER TABLE user_mood DROP CONSTRAINT IF EXISTS user_mood_date_key")
+    )
+
+
+def downgrade(connection: Connection) -> None:
+    # Fails when users share a date, which only the new schema allows.
+    connection.execute(
+        text("ALTER TABLE user_mood ADD CONSTRAINT user_mood_date_key UNIQUE (date)")
+    )
+    for index in reversed(INDEXES):
+        connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index}"))
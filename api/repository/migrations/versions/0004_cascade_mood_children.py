@@ -0,0 +1,42 @@
+"""
+Deletes the children of a mood along with it, in the database.
+
+Deleting moods by date is a single `DELETE` that never loads the children, so
+their foreign keys must cascade. Each constraint is swapped in one
+`ALTER TABLE`, so the table is never left without it.
+"""
+from sqlalchemy import Connection, text
+
+revision = "0004"
+description = "Cascade mood deletes to its children"
+
+CHILD_TABLES = [
+    "user_humor",
+    "user_water_intake",
+    "user_exercises",
+    "user_food_habits",
+    "user_sleep",
+]
+
+
+def _replace_foreign_key(connection: Connection, table: str, on_delete: str) -> None:
+    # `<table>_mood_id_fkey` is the name Postgres gave to the constraint of
+    # the initial schema.
+    connection.execute(
+        text(
+            f"ALTER TABLE {table} "
+            f"DROP CONSTRAINT IF EXISTS {table}_mood_id_fkey, "
+            f"ADD CONSTRAINT {table}_mood_id_fkey FOREIGN KEY (mood_id) "
+            f"REFERENCES user_mood (id) {on_delete}"
+        )
+    )
+
+
+def upgrade(connection: Connection) -> None:
+    for table in CHILD_TABLES:
+        _replace_foreign_key(connection, table, "ON DELETE CASCADE")
+
+
+def downgrade(connection: Connection) -> None:
+    for table in reversed(CHILD_TABLES):
+        _replace_foreign_key(connection, table, "")
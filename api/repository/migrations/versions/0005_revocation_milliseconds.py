@@ -0,0 +1,30 @@
+"""
+Keeps milliseconds in the time of token revocations.
+
+Revocations of every token of a user compare it to the `iat` of the tokens,
+and, in whole seconds, a token issued in the second of the revocation was
+rejected along with the ones before it. The downgrade rounds up, which keeps
+every token issued before a revocation rejected.
+"""
+from sqlalchemy import Connection, text
+
+revision = "0005"
+description = "Token revocation times in milliseconds"
+
+
+def upgrade(connection: Connection) -> None:
+    connection.execute(
+        text(
+            "ALTER TABLE token_revocation "
+            "ALTER COLUMN revoked_at TYPE NUMERIC(16, 3)"
+        )
+    )
+
+
+def downgrade(connection: Connection) -> None:
+    connection.execute(
+        text(
+            "ALTER TABLE token_revocation "
+            "ALTER COLUMN revoked_at TYPE BIGINT USING ceil(revoked_at)"
+        )
+    )
@@ -1,8 +1,20 @@
 import json
-from datetime import datetime
+from datetime import date, datetime
 from typing import List, Optional
 
-from sqlalchemy import Boolean, Date, ForeignKey, Integer, String
+from sqlalchemy import (
+    DDL,
+    BigInteger,
+    Boolean,
+    Date,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    TypeDecorator,
+    event,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -10,16 +22,37 @@ class Base(DeclarativeBase):
     pass
 
 
+class ISODate(TypeDecorator):
+    """
+    Date column that also accepts `YYYY-MM-DD` strings as bound values.
+
+    psycopg2 lets Postgres cast strings, but asyncpg and SQLite only take
+    `date` objects.
+    """
+
+    impl = Date
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if isinstance(value, str):
+            return date.fromisoformat(value)
+        return value
+
+
 class Humor(Base):
     __tablename__ = "user_humor"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    date: Mapped[Date] = mapped_column(Date, default=datetime.today().date())
+    date: Mapped[Date] = mapped_column(
+        ISODate, default=datetime.today().date(), index=True
+    )
     value: Mapped[int] = mapped_column(Integer, default=5)
     description: Mapped[Optional[str]]
     health_based: Mapped[bool] = mapped_column(Boolean, default=False)
 
-    mood_id: Mapped[int] = mapped_column(ForeignKey("user_mood.id"))
+    mood_id: Mapped[int] = mapped_column(
+        ForeignKey("user_mood.id", ondelete="CASCADE"), index=True
+    )
     mood: Mapped["Mood"] = relationship(back_populates="humors")
 
     def __str__(self) -> str:
@@ -54,12 +87,16 @@ class Water(Base):
     __tablename__ = "user_water_intake"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    date: Mapped[Date] = mapped_column(Date, default=datetime.today().date())
+    date: Mapped[Date] = mapped_column(
+        ISODate, default=datetime.today().date(), index=True
+    )
     milliliters: Mapped[int]
     description: Mapped[Optional[str]]
     pee: Mapped[bool] = mapped_column(Boolean, default=False)
 
-    mood_id: Mapped[int] = mapped_column(ForeignKey("user_mood.id"))
+    mood_id: Mapped[int] = mapped_column(
+        ForeignKey("user_mood.id", ondelete="CASCADE"), index=True
+    )
     mood: Mapped["Mood"] = relationship(back_populates="water_intakes")
 
     def __str__(self) -> str:
@@ -94,11 +131,15 @@ class Exercises(Base):
     __tablename__ = "user_exercises"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    date: Mapped[Date] = mapped_column(Date, default=datetime.today().date())
+    date: Mapped[Date] = mapped_column(
+        ISODate, default=datetime.today().date(), index=True
+    )
     minutes: Mapped[int] = mapped_column(Integer, default=0)
     description: Mapped[Optional[str]]
 
-    mood_id: Mapped[int] = mapped_column(ForeignKey("user_mood.id"))
+    mood_id: Mapped[int] = mapped_column(
+        ForeignKey("user_mood.id", ondelete="CASCADE"), index=True
+    )
     mood: Mapped["Mood"] = relationship(back_populates="exercises")
 
     def __str__(self) -> str:
@@ -126,11 +167,15 @@ class Food(Base):
     __tablename__ = "user_food_habits"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    date: Mapped[Date] = mapped_column(Date, default=datetime.today().date())
+    date: Mapped[Date] = mapped_column(
+        ISODate, default=datetime.today().date(), index=True
+    )
     value: Mapped[int]
     description: Mapped[str] = mapped_column(String(256))
 
-    mood_id: Mapped[int] = mapped_column(ForeignKey("user_mood.id"))
+    mood_id: Mapped[int] = mapped_column(
+        ForeignKey("user_mood.id", ondelete="CASCADE"), index=True
+    )
     mood: Mapped["Mood"] = relationship(back_populates="food_habits")
 
     def __str__(self) -> str:
@@ -163,12 +208,16 @@ class Sleep(Base):
     __tablename__ = "user_sleep"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    date: Mapped[Date] = mapped_column(Date, default=datetime.today().date())
+    date: Mapped[Date] = mapped_column(
+        ISODate, default=datetime.today().date(), index=True
+    )
     value: Mapped[int] = mapped_column(Integer, default=5)
     minutes: Mapped[int] = mapped_column(Integer, default=0)
     description: Mapped[Optional[str]]
 
-    mood_id: Mapped[int] = mapped_column(ForeignKey("user_mood.id"))
+    mood_id: Mapped[int] = mapped_column(
+        ForeignKey("user_mood.id", ondelete="CASCADE"), index=True
+    )
     mood: Mapped["Mood"] = relationship(back_populates="sleeps")
 
     def __str__(self) -> str:
@@ -201,27 +250,30 @@ class Sleep(Base):
 
 class Mood(Base):
     __tablename__ = "user_mood"
+    # One mood per user and day. It also serves the by-date lookups, which
+    # always filter on the owner.
+    __table_args__ = (
+        Index("uq_user_mood_user_id_date", "user_id", "date", unique=True),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    date: Mapped[Date] = mapped_column(
-        Date, default=datetime.today().date(), unique=True
-    )
+    date: Mapped[Date] = mapped_column(ISODate, default=datetime.today().date())
     score: Mapped[int] = mapped_column(Integer, default=0)
 
     humors: Mapped[List["Humor"]] = relationship(
-        back_populates="mood", cascade="all, delete-orphan"
+        back_populates="mood", cascade="all, delete-orphan", passive_deletes=True
     )
     water_intakes: Mapped[List["Water"]] = relationship(
-        back_populates="mood", cascade="all, delete-orphan"
+        back_populates="mood", cascade="all, delete-orphan", passive_deletes=True
     )
     exercises: Mapped[List["Exercises"]] = relationship(
-        back_populates="mood", cascade="all, delete-orphan"
+        back_populates="mood", cascade="all, delete-orphan", passive_deletes=True
     )
     food_habits: Mapped[List["Food"]] = relationship(
-        back_populates="mood", cascade="all, delete-orphan"
+        back_populates="mood", cascade="all, delete-orphan", passive_deletes=True
     )
     sleeps: Mapped[List["Sleep"]] = relationship(
-        back_populates="mood", cascade="all, delete-orphan"
+        back_populates="mood", cascade="all, delete-orphan", passive_deletes=True
     )
 
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
@@ -305,3 +357,54 @@ class UserAuth(Base):
 
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     user: Mapped["User"] = relationship(back_populates="user_auth")
+
+
+class TokenRevocation(Base):
+    """
+    A revoked token, identified by its `jti`, or, without a `jti`, every
+    token of `user_auth_id` issued before `revoked_at`.
+
+    Times are Unix timestamps, like the token claims. `revoked_at` keeps
+    milliseconds, so a token issued right after a revocation, within the same
+    second, is told from the ones it revokes. `version` orders the
+    revocations, so each instance only fetches the ones it hasn't seen.
+
+    Once every token it revokes has expired, at `expires_at`, a revocation is
+    deleted along with the next one added.
+    """
+
+    __tablename__ = "token_revocation"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, unique=True)
+    jti: Mapped[Optional[str]] = mapped_column(String(64))
+    user_auth_id: Mapped[Optional[int]] = mapped_column(Integer)
+    revoked_at: Mapped[float] = mapped_column(Numeric(16, 3, asdecimal=False))
+    expires_at: Mapped[Optional[int]] = mapped_column(BigInteger)
+
+    def __repr__(self) -> str:
+        return (
+            f'TokenRevocation("version"="{self.version}", "jti"="{self.jti}", '
+            f'"user_auth_id"="{self.user_auth_id}")'
+        )
+
+
+class TokenRevocationCounter(Base):
+    """
+    Single row holding the last `TokenRevocation.version`.
+
+    Incrementing it locks the row until the transaction ends, so versions
+    become visible in order and readers never skip one.
+    """
+
+    __tablename__ = "token_revocation_counter"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    value: Mapped[int] = mapped_column(BigInteger, default=0)
+
+
+event.listen(
+    TokenRevocationCounter.__table__,
+    "after_create",
+    DDL("INSERT INTO token_revocation_counter (id, value) VALUES (1, 0)"),
+)
@@ -0,0 +1,147 @@
+import logging
+import logging.config
+import math
+import random
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence
+
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session
+
+from api.config.config import get_logging_conf
+
+logging.config.fileConfig(get_logging_conf())
+detailedLogger = logging.getLogger("detailedLogger")
+
+
+class ReadYourWritesTracker:
+    """
+    Remembers when each principal last wrote, so their reads can stay on the
+    primary until the replicas have caught up.
+
+    The state is kept per process, which covers every thread of a worker but
+    not the other workers: a write through one worker doesn't keep reads on
+    the primary in another. `RedisReadYourWritesTracker` shares it.
+    """
+
+    def __init__(self, window: float) -> None:
+        self.window = window
+        self._last_writes: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record_write(self, principal: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._last_writes[principal] = now
+            if len(self._last_writes) > 1024:
+                self._prune(now)
+
+    def is_sticky(self, principal: str) -> bool:
+        last_write = self._last_writes.get(principal)
+        return last_write is not None and time.monotonic() - last_write < self.window
+
+    def _prune(self, now: float) -> None:
+        self._last_writes = {
+            principal: last_write
+            for principal, last_write in self._last_writes.items()
+            if now - last_write < self.window
+        }
+
+
+class RedisReadYourWritesTracker(ReadYourWritesTracker):
+    """
+    Tracker keeping the last writes in Redis, so a write through any worker,
+    of the WSGI or the ASGI app, keeps the principal's reads on the primary
+    in all of them.
+
+    A write sets a key expiring after the window, and a read checks whether
+    it is still there. When Redis can't be reached, reads go to the primary,
+    as a replica could miss the principal's writes.
+    """
+
+    def __init__(
+        self, client, window: float, prefix: str = "read_your_writes:"
+    ) -> None:
+        super().__init__(window)
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, window: float) -> "RedisReadYourWritesTracker":
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError(
+                "DB_READ_YOUR_WRITES_REDIS_URL is set but the redis package is not "
+                "installed."
+            )
+        return cls(redis.Redis.from_url(url), window)
+
+    def record_write(self, principal: str) -> None:
+        if self.window <= 0:
+            return
+        try:
+            self.client.set(
+                self.prefix + principal, 1, px=math.ceil(self.window * 1000)
+            )
+        except Exception:
+            detailedLogger.error("Could not record a write in Redis.", exc_info=True)
+
+    def is_sticky(self, principal: str) -> bool:
+        if self.window <= 0:
+            return False
+        try:
+            return bool(self.client.exists(self.prefix + principal))
+        except Exception:
+            detailedLogger.error("Could not check writes in Redis.", exc_info=True)
+            return True
+
+
+class RoutingSession(Session):
+    """
+    Session that sends SELECTs of read-only requests to a replica and
+    everything else to the primary.
+
+    `info["read_only"]` and `info["principal"]` are set by the Unit of Work for
+    each request. A principal that wrote within the tracker's window keeps
+    reading from the primary, so they always see their own writes. A write is
+    recorded once per session, which is one per request.
+
+    A session reads from one replica, picked on its first read, so a request
+    never mixes replicas at different points of replication.
+    """
+
+    def __init__(
+        self,
+        primary: Engine,
+        replicas: Sequence[Engine] = (),
+        tracker: Optional[ReadYourWritesTracker] = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.tracker = tracker or ReadYourWritesTracker(window=0)
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kwargs: Any) -> Engine:
+        principal = self.info.get("principal")
+        is_select = getattr(clause, "is_select", False)
+
+        if self._flushing or (clause is not None and not is_select):
+            if principal and self.info.get("write_recorded") != principal:
+                self.tracker.record_write(principal)
+                self.info["write_recorded"] = principal
+            return self.primary
+
+        if (
+            self.replicas
+            and is_select
+            and self.info.get("read_only")
+            and not (principal and self.tracker.is_sticky(principal))
+        ):
+            if "replica" not in self.info:
+                self.info["replica"] = random.choice(self.replicas)
+            return self.info["replica"]
+
+        return self.primary
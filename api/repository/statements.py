@@ -0,0 +1,137 @@
+"""
+Statements of the hot repository queries, built once.
+
+Building a statement and generating its cache key, which the engine looks its
+compiled form up with, costs more Python than running a cached compilation.
+These are built at import time, with bound parameters where the values go, so
+their cache key is generated on the first call and memoized for the next ones.
+"""
+from sqlalchemy import bindparam, exists, func, select
+from sqlalchemy.dialects.postgresql import JSON, aggregate_order_by
+from sqlalchemy.orm import joinedload, selectinload
+
+from api.repository.models import (
+    Exercises,
+    Food,
+    Humor,
+    Mood,
+    Sleep,
+    User,
+    UserAuth,
+    Water,
+)
+from api.repository.views import MODEL_VIEWS
+
+# How moods are read along with their entries:
+#   `joined`: one query, joining the five collections, whose rows multiply;
+#   `selectin`: one query for the moods, then one per collection;
+#   `json`: one query that aggregates each collection into a JSON array,
+#           only for the documents returned by the API.
+MOOD_LOADERS = ["joined", "selectin", "json"]
+MOOD_COLLECTIONS = {
+    "humors": Humor,
+    "water_intakes": Water,
+    "exercises": Exercises,
+    "food_habits": Food,
+    "sleeps": Sleep,
+}
+ENTRY_MODELS = list(MOOD_COLLECTIONS.values())
+
+
+def mood_loader_options(mood_loader: str) -> list:
+    loader = joinedload if mood_loader == "joined" else selectinload
+    return [loader(getattr(Mood, key)) for key in MOOD_COLLECTIONS]
+
+
+def select_views(model, *columns):
+    """
+    Selects the columns of the view of `model`, followed by `columns`, from
+    the `model` table joined to its mood.
+    """
+    table = model.__table__
+    mood = Mood.__table__
+    return select(
+        *[table.c[name] for name in MODEL_VIEWS[model].__slots__], *columns
+    ).select_from(table.join(mood, table.c.mood_id == mood.c.id))
+
+
+def select_mood_documents():
+    """
+    Selects moods with each of their collections aggregated by a `json_agg`
+    subquery, so every mood is a single row however many entries it has.
+    """
+    collections = [
+        select(
+            func.json_agg(
+                aggregate_order_by(model.__table__.table_valued(), model.id),
+                type_=JSON,
+            )
+        )
+        .where(model.mood_id == Mood.id)
+        .scalar_subquery()
+        .label(key)
+        for key, model in MOOD_COLLECTIONS.items()
+    ]
+    return select(Mood.id, Mood.date, Mood.score, Mood.user_id, *collections)
+
+
+USER_BY_ID = select(User).where(User.id == bindparam("user_id")).limit(1)
+USER_AUTH_BY_USERNAME = (
+    select(UserAuth).where(UserAuth.username == bindparam("username")).limit(1)
+)
+
+ENTRY_BY_ID_FOR_USER = {
+    model: select(model, Mood.user_id)
+    .join(model.mood)
+    .where(model.id == bindparam("item_id"))
+    .limit(1)
+    for model in ENTRY_MODELS
+}
+ENTRIES_BY_DATE_FOR_USER = {
+    model: select(model)
+    .join(model.mood)
+    .where(model.date == bindparam("item_date"), Mood.user_id == bindparam("user_id"))
+    for model in ENTRY_MODELS
+}
+VIEW_BY_ID_FOR_USER = {
+    model: select_views(model, Mood.__table__.c.user_id).where(
+        model.__table__.c.id == bindparam("item_id")
+    )
+    for model in ENTRY_MODELS
+}
+VIEWS_BY_DATE_FOR_USER = {
+    model: select_views(model).where(
+        model.__table__.c.date == bindparam("item_date"),
+        Mood.__table__.c.user_id == bindparam("user_id"),
+    )
+    for model in ENTRY_MODELS
+}
+
+# Keyed by mood loader, only those loading ORM instances.
+MOOD_BY_ID = {
+    mood_loader: select(Mood)
+    .options(*mood_loader_options(mood_loader))
+    .where(Mood.id == bindparam("mood_id"))
+    .limit(1)
+    for mood_loader in ["joined", "selectin"]
+}
+MOOD_BY_ID_FOR_USER = {
+    mood_loader: select(Mood)
+    .options(*mood_loader_options(mood_loader))
+    .where(Mood.id == bindparam("mood_id"), Mood.user_id == bindparam("user_id"))
+    .limit(1)
+    for mood_loader in ["joined", "selectin"]
+}
+MOODS_BY_DATE_FOR_USER = {
+    mood_loader: select(Mood)
+    .options(*mood_loader_options(mood_loader))
+    .where(Mood.date == bindparam("mood_date"), Mood.user_id == bindparam("user_id"))
+    for mood_loader in ["joined", "selectin"]
+}
+MOOD_DOCUMENT_BY_ID_FOR_USER = select_mood_documents().where(
+    Mood.id == bindparam("mood_id"), Mood.user_id == bindparam("user_id")
+)
+MOOD_EXISTS = select(exists().where(Mood.id == bindparam("mood_id")))
+MOOD_DOCUMENTS_BY_DATE_FOR_USER = select_mood_documents().where(
+    Mood.date == bindparam("mood_date"), Mood.user_id == bindparam("user_id")
+)
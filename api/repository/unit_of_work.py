@@ -1,17 +1,112 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any, Callable
+from typing import Any, Callable, Optional
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy import Engine, create_engine, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_scoped_session,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session, scoped_session, sessionmaker
 
-from api.config.config import get_db_uri
+from api.config.config import (
+    get_async_db_replica_uris,
+    get_async_db_uri,
+    get_db_engine_options,
+    get_db_prepared_statement_cache_size,
+    get_db_read_your_writes_redis_url,
+    get_db_read_your_writes_window,
+    get_db_replica_uris,
+    get_db_uri,
+    get_lookup_cache_size,
+    get_lookup_cache_ttl,
+    get_mood_loader,
+)
+from api.repository.cache import LookupCache
 from api.repository.database import AbstractRepository, SQLRepository
-from api.repository.models import Base
+from api.repository.in_memory import InMemoryRepository
+from api.repository.routing import (
+    ReadYourWritesTracker,
+    RedisReadYourWritesTracker,
+    RoutingSession,
+)
 
-engine = create_engine(get_db_uri(), echo=True)
-# TODO: remove create tables from application
-Base.metadata.create_all(bind=engine)
-DEFAULT_SESSION = sessionmaker(bind=engine, expire_on_commit=False)()
+
+def build_engine(db_uri: Optional[str] = None) -> Engine:
+    """
+    Creates an engine whose connection pool is configured from settings.
+    """
+    return create_engine(db_uri or get_db_uri(), **get_db_engine_options())
+
+
+def build_async_engine(db_uri: Optional[str] = None) -> AsyncEngine:
+    """
+    Creates an asyncio engine whose connection pool is configured from settings.
+
+    asyncpg prepares statements on the server and keeps them per connection,
+    so the repeated ones are only parsed and planned once. psycopg2, used by
+    the WSGI app, has no server-side prepared statements.
+    """
+    url = make_url(db_uri or get_async_db_uri())
+    if url.get_driver_name() == "asyncpg":
+        url = url.update_query_dict(
+            {
+                "prepared_statement_cache_size": str(
+                    get_db_prepared_statement_cache_size()
+                )
+            }
+        )
+    return create_async_engine(url, **get_db_engine_options())
+
+
+def build_read_your_writes_tracker() -> ReadYourWritesTracker:
+    """
+    Creates the tracker keeping reads on the primary after a write, shared
+    by every worker through Redis when a URL is configured.
+    """
+    window = get_db_read_your_writes_window()
+    redis_url = get_db_read_your_writes_redis_url()
+    if redis_url:
+        return RedisReadYourWritesTracker.from_url(redis_url, window)
+    return ReadYourWritesTracker(window=window)
+
+
+def build_async_session_factory() -> async_sessionmaker:
+    """
+    Creates the session factory used by the ASGI app.
+
+    Sessions route statements like the WSGI ones do, only through the
+    asyncpg driver.
+    """
+    async_engine = build_async_engine()
+    async_replica_engines = [
+        build_async_engine(db_uri) for db_uri in get_async_db_replica_uris()
+    ]
+    return async_sessionmaker(
+        sync_session_class=RoutingSession,
+        primary=async_engine.sync_engine,
+        replicas=[replica.sync_engine for replica in async_replica_engines],
+        tracker=build_read_your_writes_tracker(),
+        expire_on_commit=False,
+    )
+
+
+engine = build_engine()
+replica_engines = [build_engine(db_uri) for db_uri in get_db_replica_uris()]
+DEFAULT_SESSION_FACTORY = sessionmaker(
+    class_=RoutingSession,
+    primary=engine,
+    replicas=replica_engines,
+    tracker=build_read_your_writes_tracker(),
+    expire_on_commit=False,
+)
+DEFAULT_LOOKUP_CACHE = LookupCache(
+    maxsize=get_lookup_cache_size(), ttl=get_lookup_cache_ttl()
+)
+DEFAULT_MOOD_LOADER = get_mood_loader()
 
 
 class AbstractUnitOfWork(ABC):
@@ -32,6 +127,12 @@ class AbstractUnitOfWork(ABC):
     def flush(self):
         self._flush()
 
+    def close(self):
+        self._close()
+
+    def set_read_only(self, read_only: bool, principal: Optional[str] = None):
+        self._set_read_only(read_only, principal)
+
     @abstractmethod
     def _commit(self):
         raise NotImplementedError
@@ -44,18 +145,127 @@ class AbstractUnitOfWork(ABC):
     def _flush(self):
         raise NotImplementedError
 
+    @abstractmethod
+    def _close(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def _set_read_only(self, read_only: bool, principal: Optional[str]):
+        raise NotImplementedError
+
 
 class SQLAlchemyUnitOfWork(AbstractUnitOfWork):
-    def __init__(self, session: Callable[[], Session] = DEFAULT_SESSION) -> None:
-        self.session = session
+    """
+    Unit of Work backed by a thread-local session registry.
+
+    Each thread gets its own session from `session_factory` the first time it
+    touches `session` or `repository`, and `close` discards it, so the next
+    request handled by that thread starts with a fresh session and an empty
+    identity map.
+
+    With a `RoutingSession` factory, `set_read_only` lets reads of the current
+    request go to a replica.
+
+    `cache` is shared by the repositories of every session, and keeps user
+    lookups out of the database. Pass `None` to disable it.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = DEFAULT_SESSION_FACTORY,
+        cache: Optional[LookupCache] = DEFAULT_LOOKUP_CACHE,
+        mood_loader: str = DEFAULT_MOOD_LOADER,
+    ) -> None:
+        self.session_factory = session_factory
+        self.cache = cache
+        self.mood_loader = mood_loader
+        self.sessions = scoped_session(session_factory)
+
+    @property
+    def session(self) -> Session:
+        return self.sessions()
 
-    def __enter__(self) -> AbstractUnitOfWork:
-        self.repository = SQLRepository(self.session)
-        return super().__enter__()
+    @property
+    def repository(self) -> AbstractRepository:
+        session = self.session
+        if "repository" not in session.info:
+            session.info["repository"] = SQLRepository(
+                session, self.cache, self.mood_loader
+            )
+        return session.info["repository"]
 
     def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
         super().__exit__(exc_type, exc_val, exc_tb)
-        self.session.close()
+        self.close()
+
+    def _commit(self):
+        self.session.commit()
+
+    def _rollback(self):
+        self.session.rollback()
+
+    def _flush(self):
+        self.session.flush()
+
+    def _close(self):
+        self.sessions.remove()
+
+    def _set_read_only(self, read_only: bool, principal: Optional[str]):
+        self.session.info["read_only"] = read_only
+        self.session.info["principal"] = principal
+
+
+class AsyncSQLAlchemyUnitOfWork(AbstractUnitOfWork):
+    """
+    Unit of Work backed by an `AsyncSession` per asyncio task.
+
+    The repository and the synchronous methods inherited from
+    `AbstractUnitOfWork` operate on the session's `sync_session`, so they must
+    be called from a function passed to `run_sync`. SQLAlchemy runs that
+    function in a greenlet and awaits every database round-trip on the event
+    loop, which lets the synchronous resources serve ASGI requests without
+    blocking it.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        cache: Optional[LookupCache] = DEFAULT_LOOKUP_CACHE,
+        mood_loader: str = DEFAULT_MOOD_LOADER,
+    ) -> None:
+        self.session_factory = session_factory
+        self.cache = cache
+        self.mood_loader = mood_loader
+        self.sessions = async_scoped_session(
+            session_factory, scopefunc=asyncio.current_task
+        )
+
+    @property
+    def async_session(self) -> AsyncSession:
+        return self.sessions()
+
+    @property
+    def session(self) -> Session:
+        return self.async_session.sync_session
+
+    @property
+    def repository(self) -> AbstractRepository:
+        session = self.session
+        if "repository" not in session.info:
+            session.info["repository"] = SQLRepository(
+                session, self.cache, self.mood_loader
+            )
+        return session.info["repository"]
+
+    async def run_sync(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        return await self.async_session.run_sync(lambda _: fn(*args, **kwargs))
+
+    async def __aenter__(self) -> "AsyncSQLAlchemyUnitOfWork":
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        await self.async_session.rollback()
+        await self.sessions.remove()
 
     def _commit(self):
         self.session.commit()
@@ -65,3 +275,40 @@ class SQLAlchemyUnitOfWork(AbstractUnitOfWork):
 
     def _flush(self):
         self.session.flush()
+
+    def _close(self):
+        self.session.close()
+        self.sessions.registry.clear()
+
+    def _set_read_only(self, read_only: bool, principal: Optional[str]):
+        self.session.info["read_only"] = read_only
+        self.session.info["principal"] = principal
+
+
+class InMemoryUnitOfWork(AbstractUnitOfWork):
+    """
+    Unit of Work over an `InMemoryRepository`, for tests and benchmarks that
+    run the resources without a database.
+
+    The repository applies changes right away. `commit` keeps them, while
+    `rollback`, and `close` after a request that didn't commit, undo them.
+    Every thread shares the one repository, so requests must not overlap.
+    """
+
+    def __init__(self, repository: Optional[InMemoryRepository] = None) -> None:
+        self.repository = repository or InMemoryRepository()
+
+    def _commit(self):
+        self.repository.commit()
+
+    def _rollback(self):
+        self.repository.rollback()
+
+    def _flush(self):
+        pass
+
+    def _close(self):
+        self.repository.rollback()
+
+    def _set_read_only(self, read_only: bool, principal: Optional[str]):
+        pass
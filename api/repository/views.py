@@ -0,0 +1,81 @@
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+
+from api.repository.models import Exercises, Food, Humor, Sleep, Water
+
+
+class View:
+    """
+    Read-only copy of a row, for the GET handlers. Views hold plain values in
+    slots, so building one costs a tuple unpacking, and nothing tracks them.
+
+    Fields are named and ordered after the columns of the table, so a view is
+    built from a row selecting those columns with `View(*row)`.
+    """
+
+    __slots__ = ()
+
+    def as_dict(self) -> dict:
+        """
+        Same as the `as_dict` of the model, with every value as a string.
+        """
+        return {name: str(getattr(self, name)) for name in self.__slots__}
+
+
+@dataclass(frozen=True, slots=True)
+class HumorView(View):
+    id: int
+    date: date
+    value: int
+    description: Optional[str]
+    health_based: bool
+    mood_id: int
+
+
+@dataclass(frozen=True, slots=True)
+class WaterView(View):
+    id: int
+    date: date
+    milliliters: int
+    description: Optional[str]
+    pee: bool
+    mood_id: int
+
+
+@dataclass(frozen=True, slots=True)
+class ExercisesView(View):
+    id: int
+    date: date
+    minutes: int
+    description: Optional[str]
+    mood_id: int
+
+
+@dataclass(frozen=True, slots=True)
+class FoodView(View):
+    id: int
+    date: date
+    value: int
+    description: str
+    mood_id: int
+
+
+@dataclass(frozen=True, slots=True)
+class SleepView(View):
+    id: int
+    date: date
+    value: int
+    minutes: int
+    description: Optional[str]
+    mood_id: int
+
+
+# The view of each model.
+MODEL_VIEWS = {
+    Humor: HumorView,
+    Water: WaterView,
+    Exercises: ExercisesView,
+    Food: FoodView,
+    Sleep: SleepView,
+}
@@ -1,14 +1,48 @@
+import base64
+import binascii
+import json
 import logging
 import logging.config
+from datetime import date, datetime
+from typing import Callable, Optional, Tuple
 
-from api.config.config import get_logging_conf
-from api.repository.models import Mood, User
+import falcon
+
+from api.config.config import get_logging_conf, get_max_page_size, get_page_size
+from api.repository.database import Page, PageRequest
 from api.repository.unit_of_work import AbstractUnitOfWork
 
 logging.config.fileConfig(get_logging_conf())
 simpleLogger = logging.getLogger("simpleLogger")
 detailedLogger = logging.getLogger("detailedLogger")
 
+PAGE_SIZE = get_page_size()
+MAX_PAGE_SIZE = get_max_page_size()
+
+
+def encode_cursor(after: Tuple[date, int]) -> str:
+    """
+    Turns the key a page ends at into the opaque cursor clients send back.
+    """
+    after_date, after_id = after
+    key = json.dumps([after_date.isoformat(), after_id])
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[date, int]:
+    """
+    Turns a cursor of `encode_cursor` back into its key. Raises `ValueError`
+    when it wasn't made by `encode_cursor`.
+    """
+    try:
+        after_date, after_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        after_date = datetime.strptime(after_date, "%Y-%m-%d").date()
+    except (binascii.Error, TypeError, ValueError) as e:
+        raise ValueError(f"Cursor {cursor} is malformed!") from e
+    if type(after_id) is not int:
+        raise ValueError(f"Cursor {cursor} is malformed!")
+    return after_date, after_id
+
 
 class Resource:
     """
@@ -18,34 +52,91 @@ class Resource:
     def __init__(self, uow: AbstractUnitOfWork) -> None:
         self.uow = uow
 
-    def _get_user(self, username: str) -> User:
-        if not username:
-            return None
+    def _get_mood_id_from_date(self, date: str, user_id: int) -> Optional[int]:
+        """
+        Returns the id of the user's mood of `date`, adding it when missing.
+
+        The upsert is atomic, so concurrent posts for the same day share one
+        mood, and it's committed along with the entry that needs it.
+        """
+        try:
+            return self.uow.repository.get_or_add_mood_id(date, user_id)
+        except Exception as e:
+            detailedLogger.error("Could not perform add mood operation!", exc_info=True)
+            self.uow.rollback()
+            return
 
-        user_id = self.uow.repository.get_user_auth_by_username(username).user_id
-        if not user_id:
-            return None
+    @staticmethod
+    def _get_page_request(req: falcon.Request) -> PageRequest:
+        """
+        Reads the `from`, `to`, `cursor` and `limit` parameters of a list
+        request. Raises `ValueError`, with a message for the client, when one
+        is malformed.
+        """
+        dates = {}
+        for param in ["from", "to"]:
+            value = req.get_param(param)
+            if value is None:
+                dates[param] = None
+                continue
+            try:
+                dates[param] = datetime.strptime(value, "%Y-%m-%d").date()
+            except ValueError as e:
+                raise ValueError(
+                    f"Date {value} is malformed! Correct format is YYYY-MM-DD."
+                ) from e
 
-        return self.uow.repository.get_user_by_id(user_id)
+        limit = req.get_param("limit", default=str(PAGE_SIZE))
+        if not limit.isdigit() or not 1 <= int(limit) <= MAX_PAGE_SIZE:
+            raise ValueError(f"Limit must be between 1 and {MAX_PAGE_SIZE}.")
 
-    def _get_mood_from_date(self, date: str, user_id: int) -> Mood:
-        mood = (
-            self.uow.repository.get_mood_by_date(date)
-            .filter_by(user_id=user_id)
-            .first()
+        cursor = req.get_param("cursor")
+        return PageRequest(
+            limit=int(limit),
+            date_from=dates["from"],
+            date_to=dates["to"],
+            after=decode_cursor(cursor) if cursor is not None else None,
         )
-        if mood:
-            return mood
 
-        mood = Mood(user_id=user_id, date=date)
+    def _get_page(
+        self,
+        req: falcon.Request,
+        resp: falcon.Response,
+        name: str,
+        get_page: Callable[[int, PageRequest], Page],
+        serialize: Callable[[object], dict],
+    ) -> None:
+        """
+        Responds with a page of the user's `name` entries, fetched by
+        `get_page`, as `{"items": [...], "next_cursor": ...}`. Entries are
+        ordered by date then id, and `next_cursor` is null on the last page.
+        """
+        principal = req.context["principal"]
+
         try:
-            self.uow.repository.add_mood(mood)
+            simpleLogger.debug(f"Reading the page parameters for {name}.")
+            page_request = self._get_page_request(req)
+        except ValueError as e:
+            detailedLogger.warning(str(e), exc_info=True)
+            resp.text = json.dumps({"error": str(e)})
+            resp.status = falcon.HTTP_BAD_REQUEST
+            return
+
+        try:
+            simpleLogger.debug(f"Fetching a page of {name} from database.")
+            page = get_page(principal.user_id, page_request)
+            items = [serialize(item) for item in page.items]
             self.uow.commit()
         except Exception as e:
-            detailedLogger.error("Could not perform add mood operation!", exc_info=True)
+            detailedLogger.error(
+                f"Could not perform fetch {name} database operation!", exc_info=True
+            )
+            resp.text = json.dumps({"error": f"The server could not fetch the {name}."})
+            resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
             return
-        return (
-            self.uow.repository.get_mood_by_date(date)
-            .filter_by(user_id=user_id)
-            .first()
-        )
+
+        next_cursor = None
+        if page.next_after is not None:
+            next_cursor = encode_cursor(page.next_after)
+        resp.text = json.dumps({"items": items, "next_cursor": next_cursor})
+        resp.status = falcon.HTTP_OK
@@ -18,6 +18,8 @@ class ExercisesResource(Resource):
     """
     Manages Exercises.
 
+    `GET` /exercises?from={date}&to={date}&cursor={cursor}&limit={limit}
+        Retrieves a page of exercises' data, ordered by date
     `GET` /exercises/{exercises_id}
         Retrieves a single exercise's data using its ID
     `GET` /exercises/date/{exercises_date}
@@ -34,6 +36,37 @@ class ExercisesResource(Resource):
         Deletes all exercises' data using the creation date
     """
 
+    def on_get_collection(self, req: falcon.Request, resp: falcon.Response):
+        """
+        Retrieves a page of exercises' data, ordered by date
+
+        `GET` /exercises?from={date}&to={date}&cursor={cursor}&limit={limit}
+
+        Args:
+            from: the first date to include, as YYYY-MM-DD
+            to: the last date to include, as YYYY-MM-DD
+            cursor: the `next_cursor` of the previous page
+            limit: the number of exercises per page
+
+        Responses:
+            `400 Bad Request`: Parameters could not be parsed
+
+            `500 Server Error`: Database error
+
+            `200 OK`: Page of exercises' data successfully retrieved, with the
+            `next_cursor` of the next page, if any
+        """
+        simpleLogger.info("GET /exercises")
+        self._get_page(
+            req,
+            resp,
+            "exercises",
+            self.uow.repository.get_exercises_views_page_for_user,
+            lambda item: item.as_dict(),
+        )
+        if resp.status == falcon.HTTP_OK:
+            simpleLogger.info("GET /exercises : successful")
+
     def on_get(self, req: falcon.Request, resp: falcon.Response, exercises_id: int):
         """
         Retrieves a single exercise's data using its ID
@@ -51,12 +84,14 @@ class ExercisesResource(Resource):
             `200 OK`: Exercise's data successfully retrieved
         """
         simpleLogger.info(f"GET /exercises/{exercises_id}")
-        user = self._get_user(req.context.get("username"))
+        principal = req.context["principal"]
         exercises = None
 
         try:
             simpleLogger.debug("Fetching exercises from database using id.")
-            exercises = self.uow.repository.get_exercises_by_id(exercises_id)
+            exercises, found = self.uow.repository.get_exercises_view_by_id_for_user(
+                exercises_id, principal.user_id
+            )
             self.uow.commit()
         except Exception as e:
             detailedLogger.error(
@@ -68,7 +103,7 @@ class ExercisesResource(Resource):
             resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
             return
 
-        if not exercises:
+        if not found:
             simpleLogger.debug(f"No Exercises data with id {exercises_id}.")
             resp.text = json.dumps(
                 {"error": f"No Exercises data with id {exercises_id}."}
@@ -76,7 +111,7 @@ class ExercisesResource(Resource):
             resp.status = falcon.HTTP_NOT_FOUND
             return
 
-        if user.id != exercises.mood.user_id:
+        if not exercises:
             simpleLogger.debug(f"Invalid user for exercise {exercises_id}.")
             resp.text = json.dumps(
                 {"error": f"Invalid user for exercise {exercises_id}."}
@@ -109,7 +144,7 @@ class ExercisesResource(Resource):
             `200 OK`: Exercises' data successfully retrieved
         """
         simpleLogger.info(f"GET /exercises/date/{exercises_date}")
-        user = self._get_user(req.context.get("username"))
+        principal = req.context["principal"]
         exercises = None
 
         try:
@@ -129,7 +164,9 @@ class ExercisesResource(Resource):
 
         try:
             simpleLogger.debug("Fetching exercises from database using date.")
-            exercises = self.uow.repository.get_exercises_by_date(exercises_date)
+            exercises = self.uow.repository.get_exercises_views_by_date_for_user(
+                exercises_date, principal.user_id
+            )
             self.uow.commit()
         except Exception as e:
             detailedLogger.error(
@@ -141,7 +178,7 @@ class ExercisesResource(Resource):
             resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
             return
 
-        if not exercises.first():
+        if not exercises:
             simpleLogger.debug(f"No Exercises data in date {exercises_date}.")
             resp.text = json.dumps(
                 {"error": f"No Exercises data in date {exercises_date}."}
@@ -149,17 +186,13 @@ class ExercisesResource(Resource):
             resp.status = falcon.HTTP_NOT_FOUND
             return
 
-        all_exercises = {
-            exercise.id: exercise.as_dict()
-            for exercise in exercises
-            if exercise.mood.user_id == user.id
-        }
+        all_exercises = {exercise.id: exercise.as_dict() for exercise in exercises}
 
         resp.text = json.dumps(all_exercises)
         resp.status = falcon.HTTP_OK
         simpleLogger.info(f"GET /exercises/date/{exercises_date} : successful")
 
-    def on_post_add(self, req: falcon.Request, resp: falcon.Response):
+    def on_post_collection(self, req: falcon.Request, resp: falcon.Response):
         """
         Adds a new exercise entry
 
@@ -201,11 +234,15 @@ class ExercisesResource(Resource):
             return
 
         exercise_date = body.get("date") or str(datetime.today().date())
-        user = self._get_user(req.context.get("username"))
-        mood = self._get_mood_from_date(exercise_date, user.id)
+        principal = req.context["principal"]
+        mood_id = self._get_mood_id_from_date(exercise_date, principal.user_id)
+        if mood_id is None:
+            resp.text = json.dumps({"error": "The server could not add the mood."})
+            resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
+            return
 
         try:
-            exercise = Exercises(**body, mood_id=mood.id)
+            exercise = Exercises(**body, mood_id=mood_id)
         except Exception as e:
             detailedLogger.error("Could not create a Exercise instance!", exc_info=True)
             resp.text = json.dumps(
@@ -248,24 +285,39 @@ class ExercisesResource(Resource):
             `200 OK`: Exercises's data successfully updated
         """
         simpleLogger.info(f"PATCH /exercises/{exercises_id}")
-        user = self._get_user(req.context.get("username"))
-        exercises = None
+        principal = req.context["principal"]
+
+        body = req.stream.read(req.content_length or 0)
+        body = json.loads(body.decode("utf-8"))
+        allowed_params = ["minutes", "description"]
+        # A valid body is applied right away, as the update also tells
+        # whether the row exists and is the user's. Otherwise the row is
+        # only looked up, so a 404 or 403 still comes before a 400.
+        valid = bool(body) and not set(body.keys()).difference(allowed_params)
 
         try:
-            simpleLogger.debug("Fetching exercises from database using id.")
-            exercises = self.uow.repository.get_exercises_by_id(exercises_id)
+            if valid:
+                simpleLogger.debug("Updating exercises from database using id.")
+                exercises, found = self.uow.repository.update_exercises_by_id_for_user(
+                    exercises_id, principal.user_id, body
+                )
+            else:
+                simpleLogger.debug("Fetching exercises from database using id.")
+                exercises, found = self.uow.repository.get_exercises_by_id_for_user(
+                    exercises_id, principal.user_id
+                )
             self.uow.commit()
         except Exception as e:
             detailedLogger.error(
-                "Could not perform fetch exercises database operation!", exc_info=True
+                "Could not perform update exercises database operation!", exc_info=True
             )
             resp.text = json.dumps(
-                {"error": "The server could not fetch the exercises."}
+                {"error": "The server could not update the exercises."}
             )
             resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
             return
 
-        if not exercises:
+        if not found:
             simpleLogger.debug(f"No Exercises data with id {exercises_id}.")
             resp.text = json.dumps(
                 {"error": f"No Exercises data with id {exercises_id}."}
@@ -273,7 +325,7 @@ class ExercisesResource(Resource):
             resp.status = falcon.HTTP_NOT_FOUND
             return
 
-        if user.id != exercises.mood.user_id:
+        if not exercises:
             simpleLogger.debug(f"Invalid user for exercise {exercises_id}.")
             resp.text = json.dumps(
                 {"error": f"Invalid user for exercise {exercises_id}."}
@@ -281,15 +333,12 @@ class ExercisesResource(Resource):
             resp.status = falcon.HTTP_FORBIDDEN
             return
 
-        body = req.stream.read(req.content_length or 0)
-        body = json.loads(body.decode("utf-8"))
         if not body:
             simpleLogger.debug("Missing request body for exercises.")
             resp.text = json.dumps({"error": "Missing request body for exercises."})
             resp.status = falcon.HTTP_BAD_REQUEST
             return
 
-        allowed_params = ["minutes", "description"]
         if set(body.keys()).difference(allowed_params):
             simpleLogger.debug("Incorrect parameters in request body for mood.")
             resp.text = json.dumps(
@@ -298,23 +347,7 @@ class ExercisesResource(Resource):
             resp.status = falcon.HTTP_BAD_REQUEST
             return
 
-        try:
-            simpleLogger.debug("Updating exercises from database using id.")
-            self.uow.repository.update_exercises(exercises, body)
-            self.uow.commit()
-        except Exception as e:
-            detailedLogger.error(
-                "Could not perform update exercises database operation!", exc_info=True
-            )
-            resp.text = json.dumps(
-                {"error": "The server could not update the exercises."}
-            )
-            resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
-            return
-
-        updated_exercises = self.uow.repository.get_exercises_by_id(exercises_id)
-
-        resp.text = json.dumps(updated_exercises.as_dict())
+        resp.text = json.dumps(exercises.as_dict())
         resp.status = falcon.HTTP_OK
         simpleLogger.info(f"PATCH /exercises/{exercises_id} : successful")
 
@@ -335,12 +368,14 @@ class ExercisesResource(Resource):
             `204 No Content`: Exercise's data successfully deleted
         """
         simpleLogger.info(f"DELETE /exercises/{exercises_id}")
-        user = self._get_user(req.context.get("username"))
+        principal = req.context["principal"]
         exercise = None
 
         try:
             simpleLogger.debug("Fetching exercise from database using id.")
-            exercise = self.uow.repository.get_exercises_by_id(exercises_id)
+            exercise, found = self.uow.repository.get_exercises_by_id_for_user(
+                exercises_id, principal.user_id
+            )
             self.uow.commit()
         except Exception as e:
             detailedLogger.error(
@@ -352,7 +387,7 @@ class ExercisesResource(Resource):
             resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
             return
 
-        if not exercise:
+        if not found:
             simpleLogger.debug(f"No Exercise data with id {exercises_id}.")
             resp.text = json.dumps(
                 {"error": f"No Exercise data with id {exercises_id}."}
@@ -360,7 +395,7 @@ class ExercisesResource(Resource):
             resp.status = falcon.HTTP_NOT_FOUND
             return
 
-        if user.id != exercise.mood.user_id:
+        if not exercise:
             simpleLogger.debug(f"Invalid user for exercise {exercises_id}.")
             resp.text = json.dumps(
                 {"error": f"Invalid user for exercise {exercises_id}."}
@@ -406,8 +441,7 @@ class ExercisesResource(Resource):
             `204 No Content`: Exercises' data successfully deleted
         """
         simpleLogger.info(f"DELETE /exercises/date/{exercises_date}")
-        user = self._get_user(req.context.get("username"))
-        exercises = None
+        principal = req.context["principal"]
 
         try:
             simpleLogger.debug("Formatting the date for exercise.")
@@ -425,20 +459,22 @@ class ExercisesResource(Resource):
             return
 
         try:
-            simpleLogger.debug("Fetching exercise from database using date.")
-            exercises = self.uow.repository.get_exercises_by_date(exercises_date)
+            simpleLogger.debug("Deleting exercises from database using date.")
+            deletion = self.uow.repository.delete_exercises_by_date_for_user(
+                exercises_date, principal.user_id
+            )
             self.uow.commit()
         except Exception as e:
             detailedLogger.error(
-                "Could not perform fetch exercise database operation!", exc_info=True
+                "Could not perform delete exercises database operation!", exc_info=True
             )
             resp.text = json.dumps(
-                {"error": "The server could not fetch the exercise."}
+                {"error": "The server could not delete the exercises."}
             )
             resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
             return
 
-        if not exercises.first():
+        if not deletion.found:
             simpleLogger.debug(f"No Exercise data in date {exercises_date}.")
             resp.text = json.dumps(
                 {"error": f"No Exercise data in date {exercises_date}."}
@@ -446,28 +482,16 @@ class ExercisesResource(Resource):
             resp.status = falcon.HTTP_NOT_FOUND
             return
 
-        try:
-            simpleLogger.debug("Deleting exercises from database using date.")
-            for exercise in exercises:
-                if user.id != exercise.mood.user_id:
-                    simpleLogger.debug(f"Invalid user for exercise {exercise.id}.")
-                    resp.text = json.dumps(
-                        {"error": f"Invalid user for exercise {exercise.id}."}
-                    )
-                    resp.status = falcon.HTTP_FORBIDDEN
-                    self.uow.rollback()
-                    return
-                self.uow.repository.delete_exercises(exercise)
-            self.uow.commit()
-        except Exception as e:
-            detailedLogger.error(
-                "Could not perform delete exercise database operation!", exc_info=True
+        if not deletion.deleted:
+            simpleLogger.debug(
+                f"Invalid user for exercise data in date {exercises_date}."
             )
             resp.text = json.dumps(
-                {"error": "The server could not delete the exercises."}
+                {"error": f"Invalid user for exercise data in date {exercises_date}."}
             )
-            resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
+            resp.status = falcon.HTTP_FORBIDDEN
             return
 
+        simpleLogger.debug(f"Deleted {deletion.deleted} exercises.")
         resp.status = falcon.HTTP_NO_CONTENT
         simpleLogger.info(f"DELETE /exercises/date/{exercises_date} : successful")
@@ -18,6 +18,8 @@ class FoodResource(Resource):
     """
     Manages Food Habits.
 
+    `GET` /food?from={date}&to={date}&cursor={cursor}&limit={limit}
+        Retrieves a page of food habits' data, ordered by date
     `GET` /food/{food_id}
         Retrieves a single food habit's data using its ID
     `GET` /food/date/{food_date}
@@ -34,6 +36,37 @@ class FoodResource(Resource):
         Deletes all food habits' data using the creation date
     """
 
+    def on_get_collection(self, req: falcon.Request, resp: falcon.Response):
+        """
+        Retrieves a page of food habits' data, ordered by date
+
+        `GET` /food?from={date}&to={date}&cursor={cursor}&limit={limit}
+
+        Args:
+            from: the first date to include, as YYYY-MM-DD
+            to: the last date to include, as YYYY-MM-DD
+            cursor: the `next_cursor` of the previous page
+            limit: the number of food habits per page
+
+        Responses:
+            `400 Bad Request`: Parameters could not be parsed
+
+            `500 Server Error`: Database error
+
+            `200 OK`: Page of food habits' data successfully retrieved, with the
+            `next_cursor` of the next page, if any
+        """
+        simpleLogger.info("GET /food")
+        self._get_page(
+            req,
+            resp,
+            "food habits",
+            self.uow.repository.get_food_habits_views_page_for_user,
+            lambda item: item.as_dict(),
+        )
+        if resp.status == falcon.HTTP_OK:
+            simpleLogger.info("GET /food : successful")
+
     def on_get(self, req: falcon.Request, resp: falcon.Response, food_id: int):
         """
         Retrieves a single food habit's data using its ID
@@ -51,12 +84,14 @@ class FoodResource(Resource):
             `200 OK`: Food habit's data successfully retrieved
         """
         simpleLogger.info(f"GET /food/{food_id}")
-        user = self._get_user(req.context.get("username"))
+        principal = req.context["principal"]
         food = None
 
         try:
             simpleLogger.debug("Fetching food habits from database using id.")
-            food = self.uow.repository.get_food_habits_by_id(food_id)
+            food, found = self.uow.repository.get_food_habits_view_by_id_for_user(
+                food_id, principal.user_id
+            )
             self.uow.commit()
         except Exception as e:
             detailedLogger.error(
@@ -68,13 +103,13 @@ class FoodResource(Resource):
             resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
             return
 
-        if not food:
+        if not found:
             simpleLogger.debug(f"No Food data with id {food_id}.")
             resp.text = json.dumps({"error": f"No Food data with id {food_id}."})
             resp.status = falcon.HTTP_NOT_FOUND
             return
 
-        if user.id != food.mood.user_id:
+        if not food:
             simpleLogger.debug(f"Invalid user for food {food_id}.")
             resp.text = json.dumps({"error": f"Invalid user for food {food_id}."})
             resp.status = falcon.HTTP_FORBIDDEN
@@ -103,7 +138,7 @@ class FoodResource(Resource):
             `200 OK`: Food habits' data successfully retrieved
         """
         simpleLogger.info(f"GET /food/date/{food_date}")
-        user = self._get_user(req.context.get("username"))
+        principal = req.context["principal"]
         foods = None
 
         try:
@@ -121,7 +156,9 @@ class FoodResource(Resource):
 
         try:
             simpleLogger.debug("Fetching food habits from database using date.")
-            foods = self.uow.repository.get_food_habits_by_date(food_date)
+            foods = self.uow.repository.get_food_habits_views_by_date_for_user(
+                food_date, principal.user_id
+            )
             self.uow.commit()
         except Exception as e:
             detailedLogger.error(
@@ -131,21 +168,19 @@ class FoodResource(Resource):
             resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
             return
 
-        if not foods.first():
+        if not foods:
             simpleLogger.debug(f"No Food data in date {food_date}.")
             resp.text = json.dumps({"error": f"No Food data in date {food_date}."})
             resp.status = falcon.HTTP_NOT_FOUND
             return
 
-        all_foods = {
-            food.id: food.as_dict() for food in foods if food.mood.user_id == user.id
-        }
+        all_foods = {food.id: food.as_dict() for food in foods}
 
         resp.text = json.dumps(all_foods)
         resp.status = falcon.HTTP_OK
         simpleLogger.info(f"GET /food/date/{food_date} : successful")
 
-    def on_post_add(self, req: falcon.Request, resp: falcon.Response):
+    def on_post_collection(self, req: falcon.Request, resp: falcon.Response):
         """
         Adds a new food habit entry
 
@@ -186,11 +221,15 @@ class FoodResource(Resource):
             resp.status = falcon.HTTP_BAD_REQUEST
             return
         food_date = body.get("date") or str(datetime.today().date())
-        user = self._get_user(req.context.get("username"))
-        mood = self._get_mood_from_date(food_date, user.id)
+        principal = req.context["principal"]
+        mood_id = self._get_mood_id_from_date(food_date, principal.user_id)
+        if mood_id is None:
+            resp.text = json.dumps({"error": "The server could not add the mood."})
+            resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
+            return
 
         try:
-            food = Food(**body, mood_id=mood.id)
+            food = Food(**body, mood_id=mood_id)
         except Exception as e:
             detailedLogger.error("Could not create a Food instance!", exc_info=True)
             resp.text = json.dumps(
@@ -236,44 +275,60 @@ class FoodResource(Resource):
             `200 OK`: Food's data successfully updated
         """
         simpleLogger.info(f"PATCH /food/{food_id}")
-        user = self._get_user(req.context.get("username"))
-        food_habits = None
+        principal = req.context["principal"]
+
+        body = req.stream.read(req.content_length or 0)
+        body = json.loads(body.decode("utf-8"))
+        allowed_params = ["value", "description"]
+        # A valid body is applied right away, as the update also tells
+        # whether the row exists and is the user's. Otherwise the row is
+        # only looked up, so a 404 or 403 still comes before a 400.
+        valid = bool(body) and not set(body.keys()).difference(allowed_params)
 
         try:
-            simpleLogger.debug("Fetching food habits from database using id.")
-            food_habits = self.uow.repository.get_food_habits_by_id(food_id)
+            if valid:
+                simpleLogger.debug("Updating food habits from database using id.")
+                (
+                    food_habits,
+                    found,
+                ) = self.uow.repository.update_food_habits_by_id_for_user(
+                    food_id, principal.user_id, body
+                )
+            else:
+                simpleLogger.debug("Fetching food habits from database using id.")
+                food_habits, found = self.uow.repository.get_food_habits_by_id_for_user(
+                    food_id, principal.user_id
+                )
             self.uow.commit()
         except Exception as e:
             detailedLogger.error(
-                "Could not perform fetch food habits database operation!", exc_info=True
+                "Could not perform update food habits database operation!",
+                exc_info=True,
             )
             resp.text = json.dumps(
-                {"error": "The server could not fetch the food habits."}
+                {"error": "The server could not update the food habits."}
             )
             resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
             return
 
-        if not food_habits:
+        if not found:
             simpleLogger.debug(f"No Food Habits data with id {food_id}.")
             resp.text = json.dumps({"error": f"No Food Habits data with id {food_id}."})
             resp.status = falcon.HTTP_NOT_FOUND
             return
 
-        if user.id != food_habits.mood.user_id:
+        if not food_habits:
             simpleLogger.debug(f"Invalid user for food {food_id}.")
             resp.text = json.dumps({"error": f"Invalid user for food {food_id}."})
             resp.status = falcon.HTTP_FORBIDDEN
             return
 
-        body = req.stream.read(req.content_length or 0)
-        body = json.loads(body.decode("utf-8"))
         if not body:
             simpleLogger.debug("Missing request body for food habits.")
             resp.text = json.dumps({"error": "Missing request body for food habits."})
             resp.status = falcon.HTTP_BAD_REQUEST
             return
 
-        allowed_params = ["value", "description"]
         if set(body.keys()).difference(allowed_params):
             simpleLogger.debug("Incorrect parameters in request body for food.")
             resp.text = json.dumps(
@@ -282,23 +337,7 @@ class FoodResource(Resource):
             resp.status = falcon.HTTP_BAD_REQUEST
             return
 
-        try:
-            simpleLogger.debug("Updating food habits from database using id.")
-            self.uow.repository.update_food_habits(food_habits, body)
-            self.uow.commit()
-        except Exception as e:
-            detailedLogger.error(
-                "Could not perform update food habits database operation!",
-                exc_info=True,
-            )
-            resp.text = json.dumps(
-                {"error": "The server could not update the food habits."}
-            )
-            resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
-            return
-
-        updated_food = self.uow.repository.get_food_habits_by_id(food_id)
-        resp.text = json.dumps(updated_food.as_dict())
+        resp.text = json.dumps(food_habits.as_dict())
         resp.status = falcon.HTTP_OK
         simpleLogger.info(f"PATCH /food/{food_id} : successful")
 
@@ -319,12 +358,14 @@ class FoodResource(Resource):
             `204 No Content`: Food's data successfully deleted
         """
         simpleLogger.info(f"DELETE /food/{food_id}")
-        user = self._get_user(req.context.get("username"))
+        principal = req.context["principal"]
         food = None
 
         try:
             simpleLogger.debug("Fetching food from database using id.")
-            food = self.uow.repository.get_food_habits_by_id(food_id)
+            food, found = self.uow.repository.get_food_habits_by_id_for_user(
+                food_id, principal.user_id
+            )
             self.uow.commit()
         except Exception as e:
             detailedLogger.error(
@@ -334,13 +375,13 @@ class FoodResource(Resource):
             resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
             return
 
-        if not food:
+        if not found:
             simpleLogger.debug(f"No Food data with id {food_id}.")
             resp.text = json.dumps({"error": f"No Food data with id {food_id}."})
             resp.status = falcon.HTTP_NOT_FOUND
             return
 
-        if user.id != food.mood.user_id:
+        if not food:
             simpleLogger.debug(f"Invalid user for food {food_id}.")
             resp.text = json.dumps({"error": f"Invalid user for food {food_id}."})
             resp.status = falcon.HTTP_FORBIDDEN
@@ -382,8 +423,7 @@ class FoodResource(Resource):
             `204 No Content`: Foods' data successfully deleted
         """
         simpleLogger.info(f"DELETE /food/date/{food_date}")
-        user = self._get_user(req.context.get("username"))
-        foods = None
+        principal = req.context["principal"]
 
         try:
             simpleLogger.debug("Formatting the date for food.")
@@ -399,43 +439,33 @@ class FoodResource(Resource):
             return
 
         try:
-            simpleLogger.debug("Fetching foods from database using date.")
-            foods = self.uow.repository.get_food_habits_by_date(food_date)
+            simpleLogger.debug("Deleting foods from database using date.")
+            deletion = self.uow.repository.delete_food_habits_by_date_for_user(
+                food_date, principal.user_id
+            )
             self.uow.commit()
         except Exception as e:
             detailedLogger.error(
-                "Could not perform fetch food database operation!", exc_info=True
+                "Could not perform delete foods database operation!", exc_info=True
             )
-            resp.text = json.dumps({"error": "The server could not fetch the food."})
+            resp.text = json.dumps({"error": "The server could not delete the foods."})
             resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
             return
 
-        if not foods.first():
+        if not deletion.found:
             simpleLogger.debug(f"No Food data in date {food_date}.")
             resp.text = json.dumps({"error": f"No Food data in date {food_date}."})
             resp.status = falcon.HTTP_NOT_FOUND
             return
 
-        try:
-            simpleLogger.debug("Deleting foods from database using date.")
-            for food in foods:
-                if user.id != food.mood.user_id:
-                    simpleLogger.debug(f"Invalid user for food {food.id}.")
-                    resp.text = json.dumps(
-                        {"error": f"Invalid user for food {food.id}."}
-                    )
-                    resp.status = falcon.HTTP_FORBIDDEN
-                    self.uow.rollback()
-                    return
-                self.uow.repository.delete_food_habits(food)
-            self.uow.commit()
-        except Exception as e:
-            detailedLogger.error(
-                "Could not perform delete foods database operation!", exc_info=True
+        if not deletion.deleted:
+            simpleLogger.debug(f"Invalid user for food data in date {food_date}.")
+            resp.text = json.dumps(
+                {"error": f"Invalid user for food data in date {food_date}."}
             )
-            resp.text = json.dumps({"error": "The server could not delete the foods."})
-            resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
+            resp.status = falcon.HTTP_FORBIDDEN
             return
 
+        simpleLogger.debug(f"Deleted {deletion.deleted} foods.")
         resp.status = falcon.HTTP_NO_CONTENT
         simpleLogger.info(f"DELETE /food/date/{food_date} : successful")
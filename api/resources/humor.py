@@ -18,6 +18,8 @@ class HumorResource(Resource):
     """
     Manages Humor.
 
+    `GET` /humor?from={date}&to={date}&cursor={cursor}&limit={limit}
+        Retrieves a page of humors' data, ordered by date
     `GET` /humor/{humor_id}
         Retrieves a single humor's data using its ID
     `GET` /humor/date/{humor_date}
@@ -35,6 +37,37 @@ class HumorResource(Resource):
         Deletes all humors' data using the creation date
     """
 
+    def on_get_collection(self, req: falcon.Request, resp: falcon.Response):
+        """
+        Retrieves a page of humors' data, ordered by date
+
+        `GET` /humor?from={date}&to={date}&cursor={cursor}&limit={limit}
+
+        Args:
+            from: the first date to include, as YYYY-MM-DD
+            to: the last date to include, as YYYY-MM-DD
+            cursor: the `next_cursor` of the previous page
+            limit: the number of humors per page
+
+        Responses:
+            `400 Bad Request`: Parameters could not be parsed
+
+            `500 Server Error`: Database error
+
+            `200 OK`: Page of humors' data successfully retrieved, with the
+            `next_cursor` of the next page, if any
+        """
+        simpleLogger.info("GET /humor")
+        self._get_page(
+            req,
+            resp,
+            "humors",
+            self.uow.repository.get_humor_views_page_for_user,
+            lambda item: item.as_dict(),
+        )
+        if resp.status == falcon.HTTP_OK:
+            simpleLogger.info("GET /humor : successful")
+
     def on_get(self, req: falcon.Request, resp: falcon.Response, humor_id: int):
         """
         Retrieves a single humor's data using its ID
@@ -52,12 +85,14 @@ class HumorResource(Resource):
             `200 OK`: Humor's data successfully retrieved
         """
         simpleLogger.info(f"GET /humor/{humor_id}")
-        user = self._get_user(req.context.get("username"))
+        principal = req.context["principal"]
         humor = None
 
         try:
             simpleLogger.debug("Fetching humor from database using id.")
-            humor = self.uow.repository.get_humor_by_id(humor_id)
+            humor, found = self.uow.repository.get_humor_view_by_id_for_user(
+                humor_id, principal.user_id
+            )
             self.uow.commit()
         except Exception as e:
             detailedLogger.error(
@@ -67,13 +102,13 @@ class HumorResource(Resource):
             resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
             return
 
-        if not humor:
+        if not found:
             simpleLogger.debug(f"No Humor data with id {humor_id}.")
             resp.text = json.dumps({"error": f"No Humor data with id {humor_id}."})
             resp.status = falcon.HTTP_NOT_FOUND
             return
 
-        if user.id != humor.mood.user_id:
+        if not humor:
             simpleLogger.debug(f"Invalid user for humor {humor_id}.")
             resp.text = json.dumps({"error": f"Invalid user for humor {humor_id}."})
             resp.status = falcon.HTTP_FORBIDDEN
@@ -102,7 +137,7 @@ class HumorResource(Resource):
             `200 OK`: Humors' data successfully retrieved
         """
         simpleLogger.info(f"GET /humor/date/{humor_date}")
-        user = self._get_user(req.context.get("username"))
+        principal = req.context["principal"]
         humors = None
 
         try:
@@ -120,7 +155,9 @@ class HumorResource(Resource):
 
         try:
             simpleLogger.debug("Fetching humor from database using date.")
-            humors = self.uow.repository.get_humor_by_date(humor_date)
+            humors = self.uow.repository.get_humor_views_by_date_for_user(
+                humor_date, principal.user_id
+            )
             self.uow.commit()
         except Exception as e:
             detailedLogger.error(
@@ -130,23 +167,19 @@ class HumorResource(Resource):
             resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
             return
 
-        if not humors.first():
+        if not humors:
             simpleLogger.debug(f"No Humor data in date {humor_date}.")
             resp.text = json.dumps({"error": f"No Humor data in date {humor_date}."})
             resp.status = falcon.HTTP_NOT_FOUND
             return
 
-        all_humors = {
-            humor.id: humor.as_dict()
-            for humor in humors
-            if humor.mood.user_id == user.id
-        }
+        all_humors = {humor.id: humor.as_dict() for humor in humors}
 
         resp.text = json.dumps(all_humors)
         resp.status = falcon.HTTP_OK
         simpleLogger.info(f"GET /humor/date/{humor_date} : successful")
 
-    def on_post_add(self, req: falcon.Request, resp: falcon.Response):
+    def on_post_collection(self, req: falcon.Request, resp: falcon.Response):
         """
         Adds a new humor entry
 
@@ -188,11 +221,15 @@ class HumorResource(Resource):
             resp.status = falcon.HTTP_BAD_REQUEST
             return
         humor_date = body.get("date") or str(datetime.today().date())
-        user = self._get_user(req.context.get("username"))
-        mood = self._get_mood_from_date(humor_date, user.id)
+        principal = req.context["principal"]
+        mood_id = self._get_mood_id_from_date(humor_date, principal.user_id)
+        if mood_id is None:
+            resp.text = json.dumps({"error": "The server could not add the mood."})
+            resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
+            return
 
         try:
-            humor = Humor(**body, mood_id=mood.id)
+            humor = Humor(**body, mood_id=mood_id)
         except Exception as e:
             detailedLogger.error("Could not create a Humor instance!", exc_info=True)
             resp.text = json.dumps(
@@ -235,42 +272,54 @@ class HumorResource(Resource):
             `200 OK`: Humor's data successfully updated
         """
         simpleLogger.info(f"PATCH /humor/{humor_id}")
-        user = self._get_user(req.context.get("username"))
-        humor = None
+        principal = req.context["principal"]
+
+        body = req.stream.read(req.content_length or 0)
+        body = json.loads(body.decode("utf-8"))
+        allowed_params = ["value", "description", "health_based"]
+        # A valid body is applied right away, as the update also tells
+        # whether the row exists and is the user's. Otherwise the row is
+        # only looked up, so a 404 or 403 still comes before a 400.
+        valid = bool(body) and not set(body.keys()).difference(allowed_params)
 
         try:
-            simpleLogger.debug("Fetching humor from database using id.")
-            humor = self.uow.repository.get_humor_by_id(humor_id)
+            if valid:
+                simpleLogger.debug("Updating humor from database using id.")
+                humor, found = self.uow.repository.update_humor_by_id_for_user(
+                    humor_id, principal.user_id, body
+                )
+            else:
+                simpleLogger.debug("Fetching humor from database using id.")
+                humor, found = self.uow.repository.get_humor_by_id_for_user(
+                    humor_id, principal.user_id
+                )
             self.uow.commit()
         except Exception as e:
             detailedLogger.error(
-                "Could not perform fetch humor database operation!", exc_info=True
+                "Could not perform update humor database operation!", exc_info=True
             )
-            resp.text = json.dumps({"error": "The server could not fetch the humor."})
+            resp.text = json.dumps({"error": "The server could not update the humor."})
             resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
             return
 
-        if not humor:
+        if not found:
             simpleLogger.debug(f"No Humor data with id {humor_id}.")
             resp.text = json.dumps({"error": f"No Humor data with id {humor_id}."})
             resp.status = falcon.HTTP_NOT_FOUND
             return
 
-        if user.id != humor.mood.user_id:
+        if not humor:
             simpleLogger.debug(f"Invalid user for exercise {humor_id}.")
             resp.text = json.dumps({"error": f"Invalid user for exercise {humor_id}."})
             resp.status = falcon.HTTP_FORBIDDEN
             return
 
-        body = req.stream.read(req.content_length or 0)
-        body = json.loads(body.decode("utf-8"))
         if not body:
             simpleLogger.debug("Missing request body for humor.")
             resp.text = json.dumps({"error": "Missing request body for humor."})
             resp.status = falcon.HTTP_BAD_REQUEST
             return
 
-        allowed_params = ["value", "description", "health_based"]
         if set(body.keys()).difference(allowed_params):
             simpleLogger.debug("Incorrect parameters in request body for mood.")
             resp.text = json.dumps(
@@ -279,20 +328,7 @@ class HumorResource(Resource):
             resp.status = falcon.HTTP_BAD_REQUEST
             return
 
-        try:
-            simpleLogger.debug("Updating humor from database using id.")
-            self.uow.repository.update_humor(humor, body)
-            self.uow.commit()
-        except Exception as e:
-            detailedLogger.error(
-                "Could not perform update humor database operation!", exc_info=True
-            )
-            resp.text = json.dumps({"error": "The server could not update the humor."})
-            resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
-            return
-
-        updated_humor = self.uow.repository.get_humor_by_id(humor_id)
-        resp.text = json.dumps(updated_humor.as_dict())
+        resp.text = json.dumps(humor.as_dict())
         resp.status = falcon.HTTP_OK
         simpleLogger.info(f"PATCH /humor/{humor_id} : successful")
 
@@ -313,12 +349,14 @@ class HumorResource(Resource):
             `204 No Content`: Humor's data successfully deleted
         """
         simpleLogger.info(f"DELETE /humor/{humor_id}")
-        user = self._get_user(req.context.get("username"))
+        principal = req.context["principal"]
         humor = None
 
         try:
             simpleLogger.debug("Fetching humor from database using id.")
-            humor = self.uow.repository.get_humor_by_id(humor_id)
+            humor, found = self.uow.repository.get_humor_by_id_for_user(
+                humor_id, principal.user_id
+            )
             self.uow.commit()
         except Exception as e:
             detailedLogger.error(
@@ -328,13 +366,13 @@ class HumorResource(Resource):
             resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
             return
 
-        if not humor:
+        if not found:
             simpleLogger.debug(f"No Humor data with id {humor_id}.")
             resp.text = json.dumps({"error": f"No Humor data with id {humor_id}."})
             resp.status = falcon.HTTP_NOT_FOUND
             return
 
-        if user.id != humor.mood.user_id:
+        if not humor:
             simpleLogger.debug(f"Invalid user for humor {humor_id}.")
             resp.text = json.dumps({"error": f"Invalid user for humor {humor_id}."})
             resp.status = falcon.HTTP_FORBIDDEN
@@ -376,8 +414,7 @@ class HumorResource(Resource):
             `204 No Content`: Humors' data successfully deleted
         """
         simpleLogger.info(f"DELETE /humor/date/{humor_date}")
-        user = self._get_user(req.context.get("username"))
-        humors = None
+        principal = req.context["principal"]
 
         try:
             simpleLogger.debug("Formatting the date for humor.")
@@ -393,43 +430,33 @@ class HumorResource(Resource):
             return
 
         try:
-            simpleLogger.debug("Fetching humors from database using date.")
-            humors = self.uow.repository.get_humor_by_date(humor_date)
+            simpleLogger.debug("Deleting humors from database using date.")
+            deletion = self.uow.repository.delete_humor_by_date_for_user(
+                humor_date, principal.user_id
+            )
             self.uow.commit()
         except Exception as e:
             detailedLogger.error(
-                "Could not perform fetch humor database operation!", exc_info=True
+                "Could not perform delete humors database operation!", exc_info=True
             )
-            resp.text = json.dumps({"error": "The server could not fetch the humor."})
+            resp.text = json.dumps({"error": "The server could not delete the humors."})
             resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
             return
 
-        if not humors.first():
+        if not deletion.found:
             simpleLogger.debug(f"No Humor data in date {humor_date}.")
             resp.text = json.dumps({"error": f"No Humor data in date {humor_date}."})
             resp.status = falcon.HTTP_NOT_FOUND
             return
 
-        try:
-            simpleLogger.debug("Deleting humor from database using date.")
-            for humor in humors:
-                if user.id != humor.mood.user_id:
-                    simpleLogger.debug(f"Invalid user for humor {humor.id}.")
-                    resp.text = json.dumps(
-                        {"error": f"Invalid user for humor {humor.id}."}
-                    )
-                    resp.status = falcon.HTTP_FORBIDDEN
-                    self.uow.rollback()
-                    return
-                self.uow.repository.delete_humor(humor)
-            self.uow.commit()
-        except Exception as e:
-            detailedLogger.error(
-                "Could not perform delete humors database operation!", exc_info=True
+        if not deletion.deleted:
+            simpleLogger.debug(f"Invalid user for humor data in date {humor_date}.")
+            resp.text = json.dumps(
+                {"error": f"Invalid user for humor data in date {humor_date}."}
             )
-            resp.text = json.dumps({"error": "The server could not delete the humors."})
-            resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
+            resp.status = falcon.HTTP_FORBIDDEN
             return
 
+        simpleLogger.debug(f"Deleted {deletion.deleted} humors.")
         resp.status = falcon.HTTP_NO_CONTENT
         simpleLogger.info(f"DELETE /humor/date/{humor_date} : successful")
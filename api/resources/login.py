@@ -1,15 +1,19 @@
 import json
 import logging
 import logging.config
+import uuid
 from datetime import datetime, timedelta
 
 import falcon
-import jwt
-from psycopg2.errors import UniqueViolation
+from psycopg2.errorcodes import UNIQUE_VIOLATION
 from sqlalchemy.exc import IntegrityError
 
-from api.config.config import get_auth_ttl, get_jwt_secret_key, get_logging_conf
-from api.repository.models import User, UserAuth
+from api.config.config import get_auth_ttl, get_logging_conf
+from api.middleware.key_ring import KeyRing
+from api.middleware.passwords import PasswordHasher, PasswordHasherBusy
+from api.middleware.revocation import RevocationList
+from api.repository.models import TokenRevocation, User, UserAuth
+from api.repository.unit_of_work import AbstractUnitOfWork
 from api.resources.base import Resource
 
 logging.config.fileConfig(get_logging_conf())
@@ -29,8 +33,22 @@ class LoginResource(Resource):
         Creates a new user with credentials:
             username: user's username
             password: user's password
+    `POST` /logout
+        Revokes the token used for the request
     """
 
+    def __init__(
+        self,
+        uow: AbstractUnitOfWork,
+        key_ring: KeyRing,
+        revocations: RevocationList,
+        password_hasher: PasswordHasher,
+    ) -> None:
+        super().__init__(uow)
+        self.key_ring = key_ring
+        self.revocations = revocations
+        self.password_hasher = password_hasher
+
     def on_post(self, req: falcon.Request, resp: falcon.Response):
         """
         Validates credentials for authentication
@@ -50,6 +68,8 @@ class LoginResource(Resource):
 
             `500 Server Error`: Database error
 
+            `503 Service Unavailable`: Too many logins in progress
+
             `204 No Content`: User's data successfully validated
         """
         simpleLogger.info("POST /login")
@@ -79,23 +99,38 @@ class LoginResource(Resource):
             resp.status = falcon.HTTP_NOT_FOUND
             return
 
-        if not body.get("password") == user_auth.password:
+        password = str(body.get("password"))
+        try:
+            valid = self.password_hasher.verify(password, user_auth.password)
+            if valid and self.password_hasher.needs_rehash(user_auth.password):
+                simpleLogger.debug(f"Upgrading password hash of {user_auth.username}.")
+                self.uow.repository.update_user_auth(
+                    user_auth, {"password": self.password_hasher.hash(password)}
+                )
+        except PasswordHasherBusy:
+            resp.text = json.dumps({"error": "Too many logins in progress."})
+            resp.status = falcon.HTTP_SERVICE_UNAVAILABLE
+            resp.set_header("Retry-After", "1")
+            return
+
+        if not valid:
             simpleLogger.debug(f"Invalid credentials for {user_auth.username}.")
             resp.text = json.dumps({"error": "Invalid credentials."})
             resp.status = falcon.HTTP_UNAUTHORIZED
             return
 
         self.uow.repository.update_user_auth(user_auth, {"last_login": datetime.now()})
+        now = datetime.now()
         login_data = {
-            "exp": str(
-                int((datetime.now() + timedelta(minutes=get_auth_ttl())).timestamp())
-            ),
+            "exp": str(int((now + timedelta(minutes=get_auth_ttl())).timestamp())),
+            "iat": round(now.timestamp(), 3),
+            "jti": uuid.uuid4().hex,
             "user_auth_id": str(user_auth.id),
             "user_auth_username": str(user_auth.username),
             "user_auth_user_id": str(user_auth.user_id),
             "user_auth_last_login": str(user_auth.last_login),
         }
-        token = jwt.encode(login_data, get_jwt_secret_key(), algorithm="HS256")
+        token = self.key_ring.encode(login_data)
 
         try:
             self.uow.repository.update_user_auth(user_auth, {"token": token})
@@ -125,6 +160,8 @@ class LoginResource(Resource):
 
             `500 Server Error`: Database error
 
+            `503 Service Unavailable`: Too many logins in progress
+
             `204 No Content`: User's data successfully created
         """
         simpleLogger.info("POST /register")
@@ -145,13 +182,22 @@ class LoginResource(Resource):
             resp.status = falcon.HTTP_BAD_REQUEST
             return
 
+        try:
+            if "password" in body:
+                body["password"] = self.password_hasher.hash(str(body["password"]))
+        except PasswordHasherBusy:
+            resp.text = json.dumps({"error": "Too many logins in progress."})
+            resp.status = falcon.HTTP_SERVICE_UNAVAILABLE
+            resp.set_header("Retry-After", "1")
+            return
+
         try:
             user = User()
             user_auth = UserAuth(**body, user=user, token="")
             self.uow.repository.add_user_auth(user_auth)
             self.uow.commit()
         except IntegrityError as e:
-            if isinstance(e.orig, UniqueViolation):
+            if getattr(e.orig, "pgcode", None) == UNIQUE_VIOLATION:
                 detailedLogger.error("Username already exists.", exc_info=True)
                 resp.text = json.dumps({"error": "Username already exists."})
                 resp.status = falcon.HTTP_FORBIDDEN
@@ -168,3 +214,42 @@ class LoginResource(Resource):
 
         resp.status = falcon.HTTP_NO_CONTENT
         simpleLogger.info(f"POST /login : successful")
+
+    def on_post_logout(self, req: falcon.Request, resp: falcon.Response):
+        """
+        Revokes the token used for the request
+
+        `POST` /logout
+
+        Tokens issued before logout had ids are revoked along with every
+        other token of the user.
+
+        Responses:
+            `500 Server Error`: Database error
+
+            `204 No Content`: Token successfully revoked
+        """
+        simpleLogger.info("POST /logout")
+        claims = req.context.get("token_claims")
+        principal = req.context.get("principal")
+        now = datetime.now().timestamp()
+        revocation = TokenRevocation(
+            jti=claims.get("jti"),
+            user_auth_id=principal.user_auth_id,
+            revoked_at=round(now, 3),
+            # Tokens refreshed before logout share the id and may expire later.
+            expires_at=max(int(claims.get("exp", 0)), int(now) + get_auth_ttl() * 60),
+        )
+
+        try:
+            self.uow.repository.add_token_revocation(revocation)
+            self.uow.commit()
+        except Exception:
+            detailedLogger.error("Could not revoke token.", exc_info=True)
+            resp.text = json.dumps({"error": "Could not revoke token."})
+            resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
+            return
+
+        self.revocations.add(revocation)
+        resp.status = falcon.HTTP_NO_CONTENT
+        simpleLogger.info("POST /logout : successful")
@@ -3,6 +3,7 @@ import logging
 import logging.config
 from collections import namedtuple
 from datetime import datetime
+from typing import Optional
 
 import falcon
 
@@ -19,12 +20,14 @@ class MoodResource(Resource):
     """
     Manages Mood.
 
+    `GET` /mood?from={date}&to={date}&cursor={cursor}&limit={limit}
+        Retrieves a page of moods' data, ordered by date
     `GET` /mood/{mood_id}
         Retrieves a single mood's data using its ID
     `GET` /mood/date/{mood_date}
         Retrieves all moods' data using the creation date
     `POST` /mood
-        Adds a new mood entry with:
+        Adds a new mood entry, or a list of them, with:
             exercises: data for exercises entry
             food_habits: data for food habits entry
             humors: data for humors entry
@@ -40,6 +43,37 @@ class MoodResource(Resource):
         Deletes all moods' data using the creation date
     """
 
+    def on_get_collection(self, req: falcon.Request, resp: falcon.Response):
+        """
+        Retrieves a page of moods' data, ordered by date
+
+        `GET` /mood?from={date}&to={date}&cursor={cursor}&limit={limit}
+
+        Args:
+            from: the first date to include, as YYYY-MM-DD
+            to: the last date to include, as YYYY-MM-DD
+            cursor: the `next_cursor` of the previous page
+            limit: the number of moods per page
+
+        Responses:
+            `400 Bad Request`: Parameters could not be parsed
+
+            `500 Server Error`: Database error
+
+            `200 OK`: Page of moods' data successfully retrieved, with the
+            `next_cursor` of the next page, if any
+        """
+        simpleLogger.info("GET /mood")
+        self._get_page(
+            req,
+            resp,
+            "moods",
+            self.uow.repository.get_mood_documents_page_for_user,
+            lambda mood: mood,
+        )
+        if resp.status == falcon.HTTP_OK:
+            simpleLogger.info("GET /mood : successful")
+
     def on_get(self, req: falcon.Request, resp: falcon.Response, mood_id: int):
         """
         Retrieves a single mood's data using its ID
@@ -57,12 +91,14 @@ class MoodResource(Resource):
             `200 OK`: Mood's data successfully retrieved
         """
         simpleLogger.info(f"GET /mood/{mood_id}")
-        user = self._get_user(req.context.get("username"))
+        principal = req.context["principal"]
         mood = None
 
         try:
             simpleLogger.debug("Fetching mood from database using id.")
-            mood = self.uow.repository.get_mood_by_id(mood_id)
+            mood, found = self.uow.repository.get_mood_document_by_id_for_user(
+                mood_id, principal.user_id
+            )
             self.uow.commit()
         except Exception as e:
             detailedLogger.error(
@@ -72,19 +108,19 @@ class MoodResource(Resource):
             resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
             return
 
-        if not mood:
+        if not found:
             simpleLogger.debug(f"No Mood data with id {mood_id}.")
             resp.text = json.dumps({"error": f"No Mood data with id {mood_id}."})
             resp.status = falcon.HTTP_NOT_FOUND
             return
 
-        if user.id != mood.user_id:
+        if not mood:
             simpleLogger.debug(f"Invalid user for mood {mood_id}.")
             resp.text = json.dumps({"error": f"Invalid user for mood {mood_id}."})
             resp.status = falcon.HTTP_FORBIDDEN
             return
 
-        resp.text = json.dumps(mood.as_dict())
+        resp.text = json.dumps(mood)
         resp.status = falcon.HTTP_OK
         simpleLogger.info(f"GET /mood/{mood_id} : successful")
 
@@ -107,7 +143,7 @@ class MoodResource(Resource):
             `200 OK`: moods' data successfully retrieved
         """
         simpleLogger.info(f"GET /mood/date/{mood_date}")
-        user = self._get_user(req.context.get("username"))
+        principal = req.context["principal"]
         moods = None
 
         try:
@@ -125,7 +161,9 @@ class MoodResource(Resource):
 
         try:
             simpleLogger.debug("Fetching mood from database using date.")
-            moods = self.uow.repository.get_mood_by_date(mood_date)
+            moods = self.uow.repository.get_mood_documents_by_date_for_user(
+                mood_date, principal.user_id
+            )
             self.uow.commit()
         except Exception as e:
             detailedLogger.error(
@@ -135,53 +173,40 @@ class MoodResource(Resource):
             resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
             return
 
-        if not moods.first():
+        if not moods:
             simpleLogger.debug(f"No Mood data in date {mood_date}.")
             resp.text = json.dumps({"error": f"No Mood data in date {mood_date}."})
             resp.status = falcon.HTTP_NOT_FOUND
             return
 
-        all_moods = {
-            mood.id: mood.as_dict() for mood in moods if mood.user_id == user.id
-        }
+        all_moods = {mood["id"]: mood for mood in moods}
 
         resp.text = json.dumps(all_moods)
         resp.status = falcon.HTTP_OK
         simpleLogger.info(f"GET /mood/date/{mood_date} : successful")
 
-    def on_post(self, req: falcon.Request, resp: falcon.Response):
+    def _build_mood(
+        self, resp: falcon.Response, body: dict, user_id: int
+    ) -> Optional[Mood]:
         """
-        Adds a new mood entry
-
-        `POST` /mood
-
-        Required Body:
-            `humors`: a Humor object
-            `water_intakes`: a Water object.
-            `exercises`: an Exercises object.
-            `food_habits`: a Food object.
-
-        Responses:
-            `400 Bad Request`: Body data is missing
-
-            `500 Server Error`: The server could not create a Mood instance
-
-            `500 Server Error`: Database error
-
-            `201 CREATED`: Mood's data successfully added
+        Builds the mood of one document of a `POST` body, with its entries.
+        Returns `None`, with the error set on `resp`, when it is invalid.
         """
-        simpleLogger.info("POST /mood")
-        user = self._get_user(req.context.get("username"))
-        body = req.stream.read(req.content_length or 0)
-        body = json.loads(body.decode("utf-8"))
         if not body:
             simpleLogger.debug("Missing request body for mood.")
             resp.text = json.dumps({"error": "Missing request body for mood."})
             resp.status = falcon.HTTP_BAD_REQUEST
             return
 
-        allowed_params = ["date", "humors", "water_intakes", "exercises", "food_habits", "sleeps"]
-        if set(body.keys()).difference(allowed_params):
+        allowed_params = [
+            "date",
+            "humors",
+            "water_intakes",
+            "exercises",
+            "food_habits",
+            "sleeps",
+        ]
+        if not isinstance(body, dict) or set(body.keys()).difference(allowed_params):
             simpleLogger.debug("Incorrect parameters in request body for mood.")
             resp.text = json.dumps(
                 {"error": "Incorrect parameters in request body for mood."}
@@ -199,8 +224,21 @@ class MoodResource(Resource):
 
         try:
             mood_params = {
-                key: [params_classes.get(key)(**body.get(key))]
-                for key in ["humors", "water_intakes", "exercises", "food_habits", "sleeps"]
+                key: [
+                    params_classes.get(key)(**entry)
+                    for entry in (
+                        body.get(key)
+                        if isinstance(body.get(key), list)
+                        else [body.get(key)]
+                    )
+                ]
+                for key in [
+                    "humors",
+                    "water_intakes",
+                    "exercises",
+                    "food_habits",
+                    "sleeps",
+                ]
             }
         except TypeError as e:
             detailedLogger.warning("Missing Mood parameter.")
@@ -213,8 +251,7 @@ class MoodResource(Resource):
 
         try:
             simpleLogger.debug("Trying to create a Mood instance.")
-            mood = Mood(**mood_params, user_id=user.id)
-            mood_params["mood"] = mood
+            return Mood(**mood_params, user_id=user_id)
         except TypeError as e:
             detailedLogger.error("Could not create a Mood instance!", exc_info=True)
             resp.text = json.dumps(
@@ -225,35 +262,59 @@ class MoodResource(Resource):
             resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
             return
 
-        params_db_functions = {
-            "humors": self.uow.repository.add_humor,
-            "water_intakes": self.uow.repository.add_water_intake,
-            "exercises": self.uow.repository.add_exercises,
-            "food_habits": self.uow.repository.add_food_habits,
-            "sleeps": self.uow.repository.add_sleep,
-            "mood": self.uow.repository.add_mood,
-        }
+    def on_post_collection(self, req: falcon.Request, resp: falcon.Response):
+        """
+        Adds a new mood entry, or one per document of a list body
 
-        for key in ["mood", "humors", "water_intakes", "exercises", "food_habits", "sleeps"]:
-            try:
-                simpleLogger.debug(
-                    f"Trying to add {key.title().replace('_', ' ')} data to database."
-                )
-                if isinstance(mood_params[key], Mood):
-                    params_db_functions[key](mood_params[key])
-                else:
-                    params_db_functions[key](mood_params[key].pop())
-                self.uow.commit()
-            except Exception as e:
-                detailedLogger.error(
-                    f"Could not perform add {key.title().replace('_', ' ')} to database operation!",
-                    exc_info=True,
-                )
-                resp.text = json.dumps(
-                    {"error": f"The server could not add the {key.replace('_', ' ')}."}
-                )
-                resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
+        `POST` /mood
+
+        Required Body:
+            `humors`: a Humor object, or a list of them.
+            `water_intakes`: a Water object, or a list of them.
+            `exercises`: an Exercises object, or a list of them.
+            `food_habits`: a Food object, or a list of them.
+            `sleeps`: a Sleep object, or a list of them.
+
+        Responses:
+            `400 Bad Request`: Body data is missing
+
+            `500 Server Error`: The server could not create a Mood instance
+
+            `500 Server Error`: Database error
+
+            `201 CREATED`: Mood's data successfully added
+        """
+        simpleLogger.info("POST /mood")
+        principal = req.context["principal"]
+        body = req.stream.read(req.content_length or 0)
+        body = json.loads(body.decode("utf-8"))
+        if not body:
+            simpleLogger.debug("Missing request body for mood.")
+            resp.text = json.dumps({"error": "Missing request body for mood."})
+            resp.status = falcon.HTTP_BAD_REQUEST
+            return
+
+        moods = []
+        for mood_body in body if isinstance(body, list) else [body]:
+            mood = self._build_mood(resp, mood_body, principal.user_id)
+            if mood is None:
                 return
+            moods.append(mood)
+
+        try:
+            # The moods are added together with their children, and flushed
+            # as one multi-row INSERT per table, so the whole body is
+            # committed or none of it.
+            simpleLogger.debug(f"Trying to add {len(moods)} Mood data to database.")
+            self.uow.repository.add_many(moods)
+            self.uow.commit()
+        except Exception as e:
+            detailedLogger.error(
+                "Could not perform add Mood to database operation!", exc_info=True
+            )
+            resp.text = json.dumps({"error": "The server could not add the mood."})
+            resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
+            return
 
         resp.status = falcon.HTTP_CREATED
         simpleLogger.info("POST /mood : successful")
@@ -275,11 +336,13 @@ class MoodResource(Resource):
             `200 OK`: Humor's data successfully updated
         """
         simpleLogger.info(f"PATCH /mood/{mood_id}")
-        user = self._get_user(req.context.get("username"))
+        principal = req.context["principal"]
         mood = None
         try:
             simpleLogger.debug("Fetching mood from database using id.")
-            mood = self.uow.repository.get_mood_by_id(mood_id)
+            mood, found = self.uow.repository.get_mood_by_id_for_user(
+                mood_id, principal.user_id
+            )
             self.uow.commit()
         except Exception as e:
             detailedLogger.error(
@@ -289,13 +352,13 @@ class MoodResource(Resource):
             resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
             return
 
-        if not mood:
+        if not found:
             simpleLogger.debug(f"No Mood data with id {mood_id}.")
             resp.text = json.dumps({"error": f"No Mood data with id {mood_id}."})
             resp.status = falcon.HTTP_NOT_FOUND
             return
 
-        if user.id != mood.user_id:
+        if not mood:
             simpleLogger.debug(f"Invalid user for mood {mood_id}.")
             resp.text = json.dumps({"error": f"Invalid user for mood {mood_id}."})
             resp.status = falcon.HTTP_FORBIDDEN
@@ -309,7 +372,13 @@ class MoodResource(Resource):
             resp.status = falcon.HTTP_BAD_REQUEST
             return
 
-        allowed_params = ["humors", "water_intakes", "exercises", "food_habits", "sleeps"]
+        allowed_params = [
+            "humors",
+            "water_intakes",
+            "exercises",
+            "food_habits",
+            "sleeps",
+        ]
         if set(body.keys()).difference(allowed_params):
             simpleLogger.debug("Incorrect parameters in request body for mood.")
             resp.text = json.dumps(
@@ -323,7 +392,7 @@ class MoodResource(Resource):
             "water_intakes": Water,
             "exercises": Exercises,
             "food_habits": Food,
-            "sleeps": Sleep
+            "sleeps": Sleep,
         }
         try:
             mood_params = {
@@ -360,8 +429,7 @@ class MoodResource(Resource):
             resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
             return
 
-        updated_mood = self.uow.repository.get_mood_by_id(mood_id)
-        resp.text = json.dumps(updated_mood.as_dict())
+        resp.text = json.dumps(mood.as_dict())
         resp.status = falcon.HTTP_OK
         simpleLogger.info(f"PATCH /mood/{mood_id} : successful")
 
@@ -382,11 +450,13 @@ class MoodResource(Resource):
             `204 No Content`: Mood's data successfully deleted
         """
         simpleLogger.info(f"DELETE /mood/{mood_id}")
-        user = self._get_user(req.context.get("username"))
+        principal = req.context["principal"]
         mood = None
         try:
             simpleLogger.debug("Fetching mood from database using id.")
-            mood = self.uow.repository.get_mood_by_id(mood_id)
+            mood, found = self.uow.repository.get_mood_by_id_for_user(
+                mood_id, principal.user_id
+            )
             self.uow.commit()
         except Exception as e:
             detailedLogger.error(
@@ -396,13 +466,13 @@ class MoodResource(Resource):
             resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
             return
 
-        if not mood:
+        if not found:
             simpleLogger.debug(f"No Mood data with id {mood_id}.")
             resp.text = json.dumps({"error": f"No Mood data with id {mood_id}."})
             resp.status = falcon.HTTP_NOT_FOUND
             return
 
-        if user.id != mood.user_id:
+        if not mood:
             simpleLogger.debug(f"Invalid user for mood {mood_id}.")
             resp.text = json.dumps({"error": f"Invalid user for mood {mood_id}."})
             resp.status = falcon.HTTP_FORBIDDEN
@@ -444,8 +514,7 @@ class MoodResource(Resource):
             `204 No Content`: Moods' data successfully deleted
         """
         simpleLogger.info(f"DELETE /mood/date/{mood_date}")
-        user = self._get_user(req.context.get("username"))
-        moods = None
+        principal = req.context["principal"]
 
         try:
             simpleLogger.debug("Formatting the date for mood.")
@@ -461,43 +530,33 @@ class MoodResource(Resource):
             return
 
         try:
-            simpleLogger.debug("Fetching mood from database using date.")
-            moods = self.uow.repository.get_mood_by_date(mood_date)
+            simpleLogger.debug("Deleting moods from database using date.")
+            deletion = self.uow.repository.delete_mood_by_date_for_user(
+                mood_date, principal.user_id
+            )
             self.uow.commit()
         except Exception as e:
             detailedLogger.error(
-                "Could not perform fetch mood database operation!", exc_info=True
+                "Could not perform delete moods database operation!", exc_info=True
             )
-            resp.text = json.dumps({"error": "The server could not fetch the mood."})
+            resp.text = json.dumps({"error": "The server could not delete the moods."})
             resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
             return
 
-        if not moods.first():
+        if not deletion.found:
             simpleLogger.debug(f"No Mood data in date {mood_date}.")
             resp.text = json.dumps({"error": f"No Mood data in date {mood_date}."})
             resp.status = falcon.HTTP_NOT_FOUND
             return
 
-        try:
-            simpleLogger.debug("Deleting mood from database using date.")
-            for mood in moods:
-                if user.id != mood.user_id:
-                    simpleLogger.debug(f"Invalid user for mood {mood.id}.")
-                    resp.text = json.dumps(
-                        {"error": f"Invalid user for mood {mood.id}."}
-                    )
-                    resp.status = falcon.HTTP_FORBIDDEN
-                    self.uow.rollback()
-                    return
-                self.uow.repository.delete_mood(mood)
-            self.uow.commit()
-        except Exception as e:
-            detailedLogger.error(
-                "Could not perform delete moods database operation!", exc_info=True
+        if not deletion.deleted:
+            simpleLogger.debug(f"Invalid user for mood data in date {mood_date}.")
+            resp.text = json.dumps(
+                {"error": f"Invalid user for mood data in date {mood_date}."}
             )
-            resp.text = json.dumps({"error": "The server could not delete the moods."})
-            resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
+            resp.status = falcon.HTTP_FORBIDDEN
             return
 
+        simpleLogger.debug(f"Deleted {deletion.deleted} moods.")
         resp.status = falcon.HTTP_NO_CONTENT
         simpleLogger.info(f"DELETE /mood/date/{mood_date} : successful")
@@ -18,6 +18,8 @@ class SleepResource(Resource):
     """
     Manages Sleep.
 
+    `GET` /sleep?from={date}&to={date}&cursor={cursor}&limit={limit}
+        Retrieves a page of sleeps' data, ordered by date
     `GET` /sleep/{sleep_id}
         Retrieves a single sleep's data using its ID
     `GET` /sleep/date/{sleep_date}
@@ -35,6 +37,37 @@ class SleepResource(Resource):
         Deletes all sleeps' data using the creation date
     """
 
+    def on_get_collection(self, req: falcon.Request, resp: falcon.Response):
+        """
+        Retrieves a page of sleeps' data, ordered by date
+
+        `GET` /sleep?from={date}&to={date}&cursor={cursor}&limit={limit}
+
+        Args:
+            from: the first date to include, as YYYY-MM-DD
+            to: the last date to include, as YYYY-MM-DD
+            cursor: the `next_cursor` of the previous page
+            limit: the number of sleeps per page
+
+        Responses:
+            `400 Bad Request`: Parameters could not be parsed
+
+            `500 Server Error`: Database error
+
+            `200 OK`: Page of sleeps' data successfully retrieved, with the
+            `next_cursor` of the next page, if any
+        """
+        simpleLogger.info("GET /sleep")
+        self._get_page(
+            req,
+            resp,
+            "sleeps",
+            self.uow.repository.get_sleep_views_page_for_user,
+            lambda item: item.as_dict(),
+        )
+        if resp.status == falcon.HTTP_OK:
+            simpleLogger.info("GET /sleep : successful")
+
     def on_get(self, req: falcon.Request, resp: falcon.Response, sleep_id: int):
         """
         Retrieves a single sleep's data using its ID
@@ -52,12 +85,14 @@ class SleepResource(Resource):
             `200 OK`: Sleep's data successfully retrieved
         """
         simpleLogger.info(f"GET /sleep/{sleep_id}")
-        user = self._get_user(req.context.get("username"))
+        principal = req.context["principal"]
         sleep = None
 
         try:
             simpleLogger.debug("Fetching sleep from database using id.")
-            sleep = self.uow.repository.get_sleep_by_id(sleep_id)
+            sleep, found = self.uow.repository.get_sleep_view_by_id_for_user(
+                sleep_id, principal.user_id
+            )
             self.uow.commit()
         except Exception as e:
             detailedLogger.error(
@@ -67,13 +102,13 @@ class SleepResource(Resource):
             resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
             return
 
-        if not sleep:
+        if not found:
             simpleLogger.debug(f"No Sleep data with id {sleep_id}.")
             resp.text = json.dumps({"error": f"No Sleep data with id {sleep_id}."})
             resp.status = falcon.HTTP_NOT_FOUND
             return
 
-        if user.id != sleep.mood.user_id:
+        if not sleep:
             simpleLogger.debug(f"Invalid user for sleep {sleep_id}.")
             resp.text = json.dumps({"error": f"Invalid user for sleep {sleep_id}."})
             resp.status = falcon.HTTP_FORBIDDEN
@@ -102,7 +137,7 @@ class SleepResource(Resource):
             `200 OK`: Sleeps' data successfully retrieved
         """
         simpleLogger.info(f"GET /sleep/date/{sleep_date}")
-        user = self._get_user(req.context.get("username"))
+        principal = req.context["principal"]
         sleeps = None
 
         try:
@@ -120,7 +155,9 @@ class SleepResource(Resource):
 
         try:
             simpleLogger.debug("Fetching sleep from database using date.")
-            sleeps = self.uow.repository.get_sleep_by_date(sleep_date)
+            sleeps = self.uow.repository.get_sleep_views_by_date_for_user(
+                sleep_date, principal.user_id
+            )
             self.uow.commit()
         except Exception as e:
             detailedLogger.error(
@@ -130,23 +167,19 @@ class SleepResource(Resource):
             resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
             return
 
-        if not sleeps.first():
+        if not sleeps:
             simpleLogger.debug(f"No Sleep data in date {sleep_date}.")
             resp.text = json.dumps({"error": f"No Sleep data in date {sleep_date}."})
             resp.status = falcon.HTTP_NOT_FOUND
             return
 
-        all_sleeps = {
-            sleep.id: sleep.as_dict()
-            for sleep in sleeps
-            if sleep.mood.user_id == user.id
-        }
+        all_sleeps = {sleep.id: sleep.as_dict() for sleep in sleeps}
 
         resp.text = json.dumps(all_sleeps)
         resp.status = falcon.HTTP_OK
         simpleLogger.info(f"GET /sleep/date/{sleep_date} : successful")
 
-    def on_post_add(self, req: falcon.Request, resp: falcon.Response):
+    def on_post_collection(self, req: falcon.Request, resp: falcon.Response):
         """
         Adds a new sleep entry
 
@@ -188,11 +221,15 @@ class SleepResource(Resource):
             resp.status = falcon.HTTP_BAD_REQUEST
             return
         sleep_date = body.get("date") or str(datetime.today().date())
-        user = self._get_user(req.context.get("username"))
-        mood = self._get_mood_from_date(sleep_date, user.id)
+        principal = req.context["principal"]
+        mood_id = self._get_mood_id_from_date(sleep_date, principal.user_id)
+        if mood_id is None:
+            resp.text = json.dumps({"error": "The server could not add the mood."})
+            resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
+            return
 
         try:
-            sleep = Sleep(**body, mood_id=mood.id)
+            sleep = Sleep(**body, mood_id=mood_id)
         except Exception as e:
             detailedLogger.error("Could not create a Sleep instance!", exc_info=True)
             resp.text = json.dumps(
@@ -235,42 +272,54 @@ class SleepResource(Resource):
             `200 OK`: Sleep's data successfully updated
         """
         simpleLogger.info(f"PATCH /sleep/{sleep_id}")
-        user = self._get_user(req.context.get("username"))
-        sleep = None
+        principal = req.context["principal"]
+
+        body = req.stream.read(req.content_length or 0)
+        body = json.loads(body.decode("utf-8"))
+        allowed_params = ["value", "minutes", "description"]
+        # A valid body is applied right away, as the update also tells
+        # whether the row exists and is the user's. Otherwise the row is
+        # only looked up, so a 404 or 403 still comes before a 400.
+        valid = bool(body) and not set(body.keys()).difference(allowed_params)
 
         try:
-            simpleLogger.debug("Fetching sleep from database using id.")
-            sleep = self.uow.repository.get_sleep_by_id(sleep_id)
+            if valid:
+                simpleLogger.debug("Updating sleep from database using id.")
+                sleep, found = self.uow.repository.update_sleep_by_id_for_user(
+                    sleep_id, principal.user_id, body
+                )
+            else:
+                simpleLogger.debug("Fetching sleep from database using id.")
+                sleep, found = self.uow.repository.get_sleep_by_id_for_user(
+                    sleep_id, principal.user_id
+                )
             self.uow.commit()
         except Exception as e:
             detailedLogger.error(
-                "Could not perform fetch sleep database operation!", exc_info=True
+                "Could not perform update sleep database operation!", exc_info=True
             )
-            resp.text = json.dumps({"error": "The server could not fetch the sleep."})
+            resp.text = json.dumps({"error": "The server could not update the sleep."})
             resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
             return
 
-        if not sleep:
+        if not found:
             simpleLogger.debug(f"No Sleep data with id {sleep_id}.")
             resp.text = json.dumps({"error": f"No Sleep data with id {sleep_id}."})
             resp.status = falcon.HTTP_NOT_FOUND
             return
 
-        if user.id != sleep.mood.user_id:
+        if not sleep:
             simpleLogger.debug(f"Invalid user for exercise {sleep_id}.")
             resp.text = json.dumps({"error": f"Invalid user for exercise {sleep_id}."})
             resp.status = falcon.HTTP_FORBIDDEN
             return
 
-        body = req.stream.read(req.content_length or 0)
-        body = json.loads(body.decode("utf-8"))
         if not body:
             simpleLogger.debug("Missing request body for sleep.")
             resp.text = json.dumps({"error": "Missing request body for sleep."})
             resp.status = falcon.HTTP_BAD_REQUEST
             return
 
-        allowed_params = ["value", "minutes", "description"]
         if set(body.keys()).difference(allowed_params):
             simpleLogger.debug("Incorrect parameters in request body for mood.")
             resp.text = json.dumps(
@@ -279,20 +328,7 @@ class SleepResource(Resource):
             resp.status = falcon.HTTP_BAD_REQUEST
             return
 
-        try:
-            simpleLogger.debug("Updating sleep from database using id.")
-            self.uow.repository.update_sleep(sleep, body)
-            self.uow.commit()
-        except Exception as e:
-            detailedLogger.error(
-                "Could not perform update sleep database operation!", exc_info=True
-            )
-            resp.text = json.dumps({"error": "The server could not update the sleep."})
-            resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
-            return
-
-        updated_sleep = self.uow.repository.get_sleep_by_id(sleep_id)
-        resp.text = json.dumps(updated_sleep.as_dict())
+        resp.text = json.dumps(sleep.as_dict())
         resp.status = falcon.HTTP_OK
         simpleLogger.info(f"PATCH /sleep/{sleep_id} : successful")
 
@@ -313,12 +349,14 @@ class SleepResource(Resource):
             `204 No Content`: Sleep's data successfully deleted
         """
         simpleLogger.info(f"DELETE /sleep/{sleep_id}")
-        user = self._get_user(req.context.get("username"))
+        principal = req.context["principal"]
         sleep = None
 
         try:
             simpleLogger.debug("Fetching sleep from database using id.")
-            sleep = self.uow.repository.get_sleep_by_id(sleep_id)
+            sleep, found = self.uow.repository.get_sleep_by_id_for_user(
+                sleep_id, principal.user_id
+            )
             self.uow.commit()
         except Exception as e:
             detailedLogger.error(
@@ -328,13 +366,13 @@ class SleepResource(Resource):
             resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
             return
 
-        if not sleep:
+        if not found:
             simpleLogger.debug(f"No Sleep data with id {sleep_id}.")
             resp.text = json.dumps({"error": f"No Sleep data with id {sleep_id}."})
             resp.status = falcon.HTTP_NOT_FOUND
             return
 
-        if user.id != sleep.mood.user_id:
+        if not sleep:
             simpleLogger.debug(f"Invalid user for sleep {sleep_id}.")
             resp.text = json.dumps({"error": f"Invalid user for sleep {sleep_id}."})
             resp.status = falcon.HTTP_FORBIDDEN
@@ -376,8 +414,7 @@ class SleepResource(Resource):
             `204 No Content`: Sleeps' data successfully deleted
         """
         simpleLogger.info(f"DELETE /sleep/date/{sleep_date}")
-        user = self._get_user(req.context.get("username"))
-        sleeps = None
+        principal = req.context["principal"]
 
         try:
             simpleLogger.debug("Formatting the date for sleep.")
@@ -393,43 +430,33 @@ class SleepResource(Resource):
             return
 
         try:
-            simpleLogger.debug("Fetching sleeps from database using date.")
-            sleeps = self.uow.repository.get_sleep_by_date(sleep_date)
+            simpleLogger.debug("Deleting sleeps from database using date.")
+            deletion = self.uow.repository.delete_sleep_by_date_for_user(
+                sleep_date, principal.user_id
+            )
             self.uow.commit()
         except Exception as e:
             detailedLogger.error(
-                "Could not perform fetch sleep database operation!", exc_info=True
+                "Could not perform delete sleeps database operation!", exc_info=True
             )
-            resp.text = json.dumps({"error": "The server could not fetch the sleep."})
+            resp.text = json.dumps({"error": "The server could not delete the sleeps."})
             resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
             return
 
-        if not sleeps.first():
+        if not deletion.found:
             simpleLogger.debug(f"No Sleep data in date {sleep_date}.")
             resp.text = json.dumps({"error": f"No Sleep data in date {sleep_date}."})
             resp.status = falcon.HTTP_NOT_FOUND
             return
 
-        try:
-            simpleLogger.debug("Deleting sleep from database using date.")
-            for sleep in sleeps:
-                if user.id != sleep.mood.user_id:
-                    simpleLogger.debug(f"Invalid user for sleep {sleep.id}.")
-                    resp.text = json.dumps(
-                        {"error": f"Invalid user for sleep {sleep.id}."}
-                    )
-                    resp.status = falcon.HTTP_FORBIDDEN
-                    self.uow.rollback()
-                    return
-                self.uow.repository.delete_sleep(sleep)
-            self.uow.commit()
-        except Exception as e:
-            detailedLogger.error(
-                "Could not perform delete sleeps database operation!", exc_info=True
+        if not deletion.deleted:
+            simpleLogger.debug(f"Invalid user for sleep data in date {sleep_date}.")
+            resp.text = json.dumps(
+                {"error": f"Invalid user for sleep data in date {sleep_date}."}
             )
-            resp.text = json.dumps({"error": "The server could not delete the sleeps."})
-            resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
+            resp.status = falcon.HTTP_FORBIDDEN
             return
 
+        simpleLogger.debug(f"Deleted {deletion.deleted} sleeps.")
         resp.status = falcon.HTTP_NO_CONTENT
         simpleLogger.info(f"DELETE /sleep/date/{sleep_date} : successful")
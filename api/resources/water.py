@@ -18,6 +18,8 @@ class WaterResource(Resource):
     """
     Manages Water Intake.
 
+    `GET` /water-intake?from={date}&to={date}&cursor={cursor}&limit={limit}
+        Retrieves a page of water intakes' data, ordered by date
     `GET` /water-intake/{water_intake_id}
         Retrieves a single water intake's data using its ID
     `GET` /water-intake/date/{water_intake_date}
@@ -35,6 +37,37 @@ class WaterResource(Resource):
         Deletes all water intakes' data using the creation date
     """
 
+    def on_get_collection(self, req: falcon.Request, resp: falcon.Response):
+        """
+        Retrieves a page of water intakes' data, ordered by date
+
+        `GET` /water-intake?from={date}&to={date}&cursor={cursor}&limit={limit}
+
+        Args:
+            from: the first date to include, as YYYY-MM-DD
+            to: the last date to include, as YYYY-MM-DD
+            cursor: the `next_cursor` of the previous page
+            limit: the number of water intakes per page
+
+        Responses:
+            `400 Bad Request`: Parameters could not be parsed
+
+            `500 Server Error`: Database error
+
+            `200 OK`: Page of water intakes' data successfully retrieved, with the
+            `next_cursor` of the next page, if any
+        """
+        simpleLogger.info("GET /water-intake")
+        self._get_page(
+            req,
+            resp,
+            "water intakes",
+            self.uow.repository.get_water_intake_views_page_for_user,
+            lambda item: item.as_dict(),
+        )
+        if resp.status == falcon.HTTP_OK:
+            simpleLogger.info("GET /water-intake : successful")
+
     def on_get(self, req: falcon.Request, resp: falcon.Response, water_intake_id: int):
         """
         Retrieves a single water intake's data using its ID
@@ -52,12 +85,17 @@ class WaterResource(Resource):
             `200 OK`: Water intake's data successfully retrieved
         """
         simpleLogger.info(f"GET /water-intake/{water_intake_id}")
-        user = self._get_user(req.context.get("username"))
+        principal = req.context["principal"]
         water_intake = None
 
         try:
             simpleLogger.debug("Fetching water intake from database using id.")
-            water_intake = self.uow.repository.get_water_intake_by_id(water_intake_id)
+            (
+                water_intake,
+                found,
+            ) = self.uow.repository.get_water_intake_view_by_id_for_user(
+                water_intake_id, principal.user_id
+            )
             self.uow.commit()
         except Exception as e:
             detailedLogger.error(
@@ -70,7 +108,7 @@ class WaterResource(Resource):
             resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
             return
 
-        if not water_intake:
+        if not found:
             simpleLogger.debug(f"No Water data with id {water_intake_id}.")
             resp.text = json.dumps(
                 {"error": f"No Water data with id {water_intake_id}."}
@@ -78,7 +116,7 @@ class WaterResource(Resource):
             resp.status = falcon.HTTP_NOT_FOUND
             return
 
-        if user.id != water_intake.mood.user_id:
+        if not water_intake:
             simpleLogger.debug(f"Invalid user for water intake {water_intake_id}.")
             resp.text = json.dumps(
                 {"error": f"Invalid user for water intake {water_intake_id}."}
@@ -111,7 +149,7 @@ class WaterResource(Resource):
             `200 OK`: Water intakes' data successfully retrieved
         """
         simpleLogger.info(f"GET /water-intake/date/{water_intake_date}")
-        user = self._get_user(req.context.get("username"))
+        principal = req.context["principal"]
         water_intakes = None
 
         try:
@@ -131,8 +169,8 @@ class WaterResource(Resource):
 
         try:
             simpleLogger.debug("Fetching water intake from database using date.")
-            water_intakes = self.uow.repository.get_water_intake_by_date(
-                water_intake_date
+            water_intakes = self.uow.repository.get_water_intake_views_by_date_for_user(
+                water_intake_date, principal.user_id
             )
             self.uow.commit()
         except Exception as e:
@@ -146,7 +184,7 @@ class WaterResource(Resource):
             resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
             return
 
-        if not water_intakes.first():
+        if not water_intakes:
             simpleLogger.debug(f"No Water data in date {water_intake_date}.")
             resp.text = json.dumps(
                 {"error": f"No Water data in date {water_intake_date}."}
@@ -155,16 +193,14 @@ class WaterResource(Resource):
             return
 
         all_water_intakes = {
-            water_intake.id: water_intake.as_dict()
-            for water_intake in water_intakes
-            if water_intake.mood.user_id == user.id
+            water_intake.id: water_intake.as_dict() for water_intake in water_intakes
         }
 
         resp.text = json.dumps(all_water_intakes)
         resp.status = falcon.HTTP_OK
         simpleLogger.info(f"GET /water-intake/date/{water_intake_date} : successful")
 
-    def on_post_add(self, req: falcon.Request, resp: falcon.Response):
+    def on_post_collection(self, req: falcon.Request, resp: falcon.Response):
         """
         Adds a new water intake entry
 
@@ -206,11 +242,15 @@ class WaterResource(Resource):
             resp.status = falcon.HTTP_BAD_REQUEST
             return
         water_intake_date = body.get("date") or str(datetime.today().date())
-        user = self._get_user(req.context.get("username"))
-        mood = self._get_mood_from_date(water_intake_date, user.id)
+        principal = req.context["principal"]
+        mood_id = self._get_mood_id_from_date(water_intake_date, principal.user_id)
+        if mood_id is None:
+            resp.text = json.dumps({"error": "The server could not add the mood."})
+            resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
+            return
 
         try:
-            water_intake = Water(**body, mood_id=mood.id)
+            water_intake = Water(**body, mood_id=mood_id)
         except Exception as e:
             detailedLogger.error(
                 "Could not create a Water Intake instance!", exc_info=True
@@ -260,25 +300,46 @@ class WaterResource(Resource):
             `200 OK`: Water Intake's data successfully updated
         """
         simpleLogger.info(f"PATCH /water-intake/{water_intake_id}")
-        user = self._get_user(req.context.get("username"))
-        water_intake = None
+        principal = req.context["principal"]
+
+        body = req.stream.read(req.content_length or 0)
+        body = json.loads(body.decode("utf-8"))
+        allowed_params = ["milliliters", "description", "pee"]
+        # A valid body is applied right away, as the update also tells
+        # whether the row exists and is the user's. Otherwise the row is
+        # only looked up, so a 404 or 403 still comes before a 400.
+        valid = bool(body) and not set(body.keys()).difference(allowed_params)
 
         try:
-            simpleLogger.debug("Fetching water intake from database using id.")
-            water_intake = self.uow.repository.get_water_intake_by_id(water_intake_id)
+            if valid:
+                simpleLogger.debug("Updating water intake from database using id.")
+                (
+                    water_intake,
+                    found,
+                ) = self.uow.repository.update_water_intake_by_id_for_user(
+                    water_intake_id, principal.user_id, body
+                )
+            else:
+                simpleLogger.debug("Fetching water intake from database using id.")
+                (
+                    water_intake,
+                    found,
+                ) = self.uow.repository.get_water_intake_by_id_for_user(
+                    water_intake_id, principal.user_id
+                )
             self.uow.commit()
         except Exception as e:
             detailedLogger.error(
-                "Could not perform fetch water intake database operation!",
+                "Could not perform update water intake database operation!",
                 exc_info=True,
             )
             resp.text = json.dumps(
-                {"error": "The server could not fetch the water intake."}
+                {"error": "The server could not update the water intake."}
             )
             resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
             return
 
-        if not water_intake:
+        if not found:
             simpleLogger.debug(f"No Water Intake data with id {water_intake_id}.")
             resp.text = json.dumps(
                 {"error": f"No Water Intake data with id {water_intake_id}."}
@@ -286,7 +347,7 @@ class WaterResource(Resource):
             resp.status = falcon.HTTP_NOT_FOUND
             return
 
-        if user.id != water_intake.mood.user_id:
+        if not water_intake:
             simpleLogger.debug(f"Invalid user for water intake {water_intake_id}.")
             resp.text = json.dumps(
                 {"error": f"Invalid user for water intake {water_intake_id}."}
@@ -294,15 +355,12 @@ class WaterResource(Resource):
             resp.status = falcon.HTTP_FORBIDDEN
             return
 
-        body = req.stream.read(req.content_length or 0)
-        body = json.loads(body.decode("utf-8"))
         if not body:
             simpleLogger.debug("Missing request body for water intake.")
             resp.text = json.dumps({"error": "Missing request body for water intake."})
             resp.status = falcon.HTTP_BAD_REQUEST
             return
 
-        allowed_params = ["milliliters", "description", "pee"]
         if set(body.keys()).difference(allowed_params):
             simpleLogger.debug("Incorrect parameters in request body for mood.")
             resp.text = json.dumps(
@@ -311,25 +369,7 @@ class WaterResource(Resource):
             resp.status = falcon.HTTP_BAD_REQUEST
             return
 
-        try:
-            simpleLogger.debug("Updating water intake from database using id.")
-            self.uow.repository.update_water_intake(water_intake, body)
-            self.uow.commit()
-        except Exception as e:
-            detailedLogger.error(
-                "Could not perform update water intake database operation!",
-                exc_info=True,
-            )
-            resp.text = json.dumps(
-                {"error": "The server could not update the water intake."}
-            )
-            resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
-            return
-
-        updated_water_intake = self.uow.repository.get_water_intake_by_id(
-            water_intake_id
-        )
-        resp.text = json.dumps(updated_water_intake.as_dict())
+        resp.text = json.dumps(water_intake.as_dict())
         resp.status = falcon.HTTP_OK
         simpleLogger.info(f"PATCH /water-intake/{water_intake_id} : successful")
 
@@ -352,12 +392,14 @@ class WaterResource(Resource):
             `204 No Content`: Water Intake's data successfully deleted
         """
         simpleLogger.info(f"DELETE /water-intake/{water_intake_id}")
-        user = self._get_user(req.context.get("username"))
+        principal = req.context["principal"]
         water_intake = None
 
         try:
             simpleLogger.debug("Fetching water_intake from database using id.")
-            water_intake = self.uow.repository.get_water_intake_by_id(water_intake_id)
+            water_intake, found = self.uow.repository.get_water_intake_by_id_for_user(
+                water_intake_id, principal.user_id
+            )
             self.uow.commit()
         except Exception as e:
             detailedLogger.error(
@@ -370,7 +412,7 @@ class WaterResource(Resource):
             resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
             return
 
-        if not water_intake:
+        if not found:
             simpleLogger.debug(f"No Water Intake data with id {water_intake_id}.")
             resp.text = json.dumps(
                 {"error": f"No Water Intake data with id {water_intake_id}."}
@@ -378,7 +420,7 @@ class WaterResource(Resource):
             resp.status = falcon.HTTP_NOT_FOUND
             return
 
-        if user.id != water_intake.mood.user_id:
+        if not water_intake:
             simpleLogger.debug(f"Invalid user for water intake {water_intake_id}.")
             resp.text = json.dumps(
                 {"error": f"Invalid user for water intake {water_intake_id}."}
@@ -425,8 +467,7 @@ class WaterResource(Resource):
             `204 No Content`: Water Intakes' data successfully deleted
         """
         simpleLogger.info(f"DELETE /water-intake/date/{water_intake_date}")
-        user = self._get_user(req.context.get("username"))
-        water_intakes = None
+        principal = req.context["principal"]
 
         try:
             simpleLogger.debug("Formatting the date for water_intake.")
@@ -444,23 +485,23 @@ class WaterResource(Resource):
             return
 
         try:
-            simpleLogger.debug("Fetching water_intake from database using date.")
-            water_intakes = self.uow.repository.get_water_intake_by_date(
-                water_intake_date
+            simpleLogger.debug("Deleting water_intakes from database using date.")
+            deletion = self.uow.repository.delete_water_intake_by_date_for_user(
+                water_intake_date, principal.user_id
             )
             self.uow.commit()
         except Exception as e:
             detailedLogger.error(
-                "Could not perform fetch water_intake database operation!",
+                "Could not perform delete water_intakes database operation!",
                 exc_info=True,
             )
             resp.text = json.dumps(
-                {"error": "The server could not fetch the water_intake."}
+                {"error": "The server could not delete the water_intakes."}
             )
             resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
             return
 
-        if not water_intakes.first():
+        if not deletion.found:
             simpleLogger.debug(f"No Water Intake data in date {water_intake_date}.")
             resp.text = json.dumps(
                 {"error": f"No Water Intake data in date {water_intake_date}."}
@@ -468,31 +509,18 @@ class WaterResource(Resource):
             resp.status = falcon.HTTP_NOT_FOUND
             return
 
-        try:
-            simpleLogger.debug("Deleting water_intake from database using date.")
-            for water_intake in water_intakes:
-                if user.id != water_intake.mood.user_id:
-                    simpleLogger.debug(
-                        f"Invalid user for water intake {water_intake.id}."
-                    )
-                    resp.text = json.dumps(
-                        {"error": f"Invalid user for water intake {water_intake.id}."}
-                    )
-                    resp.status = falcon.HTTP_FORBIDDEN
-                    self.uow.rollback()
-                    return
-                self.uow.repository.delete_water_intake(water_intake)
-            self.uow.commit()
-        except Exception as e:
-            detailedLogger.error(
-                "Could not perform delete water_intake database operation!",
-                exc_info=True,
+        if not deletion.deleted:
+            simpleLogger.debug(
+                f"Invalid user for water intake data in date {water_intake_date}."
             )
             resp.text = json.dumps(
-                {"error": "The server could not delete the water_intake."}
+                {
+                    "error": f"Invalid user for water intake data in date {water_intake_date}."
+                }
             )
-            resp.status = falcon.HTTP_INTERNAL_SERVER_ERROR
+            resp.status = falcon.HTTP_FORBIDDEN
             return
 
+        simpleLogger.debug(f"Deleted {deletion.deleted} water intakes.")
         resp.status = falcon.HTTP_NO_CONTENT
         simpleLogger.info(f"DELETE /water-intake/date/{water_intake_date} : successful")
@@ -0,0 +1,63 @@
+import logging
+import logging.config
+
+import falcon
+
+from api.config.config import get_logging_conf
+from api.middleware.key_ring import KeyRing
+from api.middleware.passwords import PasswordHasher
+from api.middleware.revocation import RevocationList
+from api.repository.unit_of_work import AbstractUnitOfWork
+from api.resources.exercises import ExercisesResource
+from api.resources.food import FoodResource
+from api.resources.humor import HumorResource
+from api.resources.login import LoginResource
+from api.resources.mood import MoodResource
+from api.resources.sleep import SleepResource
+from api.resources.water import WaterResource
+
+logging.config.fileConfig(get_logging_conf())
+simpleLogger = logging.getLogger("simpleLogger")
+
+
+def load_routes(
+    app: falcon.App,
+    uow: AbstractUnitOfWork,
+    key_ring: KeyRing,
+    revocations: RevocationList,
+    password_hasher: PasswordHasher,
+) -> None:
+    simpleLogger.info("Starting loading routes.")
+    login = LoginResource(uow, key_ring, revocations, password_hasher)
+    app.add_route("/login", login)
+    app.add_route("/register", login, suffix="register")
+    app.add_route("/logout", login, suffix="logout")
+
+    app.add_route("/humor", HumorResource(uow), suffix="collection")
+    app.add_route("/humor/{humor_id:int}", HumorResource(uow))
+    app.add_route("/humor/date/{humor_date}", HumorResource(uow), suffix="date")
+
+    app.add_route("/water-intake", WaterResource(uow), suffix="collection")
+    app.add_route("/water-intake/{water_intake_id:int}", WaterResource(uow))
+    app.add_route(
+        "/water-intake/date/{water_intake_date}", WaterResource(uow), suffix="date"
+    )
+
+    app.add_route("/exercises", ExercisesResource(uow), suffix="collection")
+    app.add_route("/exercises/{exercises_id:int}", ExercisesResource(uow))
+    app.add_route(
+        "/exercises/date/{exercises_date}", ExercisesResource(uow), suffix="date"
+    )
+
+    app.add_route("/food", FoodResource(uow), suffix="collection")
+    app.add_route("/food/{food_id:int}", FoodResource(uow))
+    app.add_route("/food/date/{food_date}", FoodResource(uow), suffix="date")
+
+    app.add_route("/sleep", SleepResource(uow), suffix="collection")
+    app.add_route("/sleep/{sleep_id:int}", SleepResource(uow))
+    app.add_route("/sleep/date/{sleep_date}", SleepResource(uow), suffix="date")
+
+    app.add_route("/mood", MoodResource(uow), suffix="collection")
+    app.add_route("/mood/{mood_id:int}", MoodResource(uow))
+    app.add_route("/mood/date/{mood_date}", MoodResource(uow), suffix="date")
+    simpleLogger.info("Routes added.")
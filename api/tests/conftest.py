@@ -8,6 +8,7 @@ from sqlalchemy.orm import Session, sessionmaker
 
 from api.config.config import get_db_uri, get_jwt_secret_key, settings
 from api.main import run
+from api.repository.cache import LookupCache
 from api.repository.models import (
     Base,
     Exercises,
@@ -19,7 +20,11 @@ from api.repository.models import (
     UserAuth,
     Water,
 )
-from api.repository.unit_of_work import AbstractUnitOfWork, SQLAlchemyUnitOfWork
+from api.repository.unit_of_work import (
+    AbstractUnitOfWork,
+    InMemoryUnitOfWork,
+    SQLAlchemyUnitOfWork,
+)
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -32,7 +37,9 @@ def set_test_settings() -> None:
 def create_access_token() -> str:
     secret_key = get_jwt_secret_key()
     data = {
+        "user_auth_id": "1",
         "user_auth_username": "test_username",
+        "user_auth_user_id": "1",
     }
     token = jwt.encode(data, secret_key, algorithm="HS256")
     return token
@@ -63,7 +70,7 @@ def db_session(engine, create_access_token) -> Session:
 
 @pytest.fixture(scope="function")
 def uow(db_session) -> AbstractUnitOfWork:
-    return SQLAlchemyUnitOfWork(session=db_session)
+    return SQLAlchemyUnitOfWork(session_factory=lambda: db_session, cache=LookupCache())
 
 
 @pytest.fixture(scope="function")
@@ -71,6 +78,18 @@ def client(uow) -> testing.TestClient:
     return testing.TestClient(run(uow))
 
 
+@pytest.fixture(scope="function")
+def memory_uow(create_access_token) -> InMemoryUnitOfWork:
+    uow = InMemoryUnitOfWork()
+    populate_repository(uow, create_access_token)
+    return uow
+
+
+@pytest.fixture(scope="function")
+def memory_client(memory_uow) -> testing.TestClient:
+    return testing.TestClient(run(memory_uow))
+
+
 def populate_db(engine, db_session, create_access_token):
     Base.metadata.drop_all(engine)
     Base.metadata.create_all(engine)
@@ -116,7 +135,7 @@ def populate_db(engine, db_session, create_access_token):
             minutes=480,
             description="sleep description for testing",
             mood_id=1,
-        )
+        ),
     }
 
     for table in params.values():
@@ -124,3 +143,51 @@ def populate_db(engine, db_session, create_access_token):
         db_session.flush()
 
     db_session.commit()
+
+
+def populate_repository(uow, create_access_token):
+    """
+    Adds the rows of `populate_db` to the repository of `uow`, without a
+    database.
+    """
+    today = date.today()
+    repository = uow.repository
+    repository.add_user(User())
+    repository.add_user_auth(
+        UserAuth(
+            username="test_username",
+            password="test_password",
+            created_at=today,
+            last_login=today,
+            token=create_access_token,
+            user_id=1,
+        )
+    )
+    repository.add_mood(Mood(user_id=1))
+    repository.add_many(
+        [
+            Exercises(
+                minutes=31, description="exercises description for testing", mood_id=1
+            ),
+            Food(value=10, description="food description for testing", mood_id=1),
+            Humor(
+                value=10,
+                description="humor description for testing",
+                health_based=True,
+                mood_id=1,
+            ),
+            Water(
+                milliliters=1500,
+                description="water intake description for testing",
+                pee=True,
+                mood_id=1,
+            ),
+            Sleep(
+                value=10,
+                minutes=480,
+                description="sleep description for testing",
+                mood_id=1,
+            ),
+        ]
+    )
+    uow.commit()
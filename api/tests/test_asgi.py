@@ -0,0 +1,108 @@
+from datetime import date
+
+import pytest
+from falcon import testing
+from sqlalchemy import NullPool, create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from api.asgi import run
+from api.repository.cache import LookupCache
+from api.repository.models import Base, Humor, Mood, User, UserAuth
+from api.repository.unit_of_work import AsyncSQLAlchemyUnitOfWork
+
+
+@pytest.fixture(scope="function")
+def async_uow(tmp_path, create_access_token) -> AsyncSQLAlchemyUnitOfWork:
+    db_path = tmp_path / "asgi.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(User())
+        session.add(
+            UserAuth(
+                username="test_username",
+                password="test_password",
+                created_at=date.today(),
+                last_login=date.today(),
+                token=create_access_token,
+                user_id=1,
+            )
+        )
+        session.add(Mood(user_id=1))
+        session.flush()
+        session.add(Humor(value=10, description="humor for testing", mood_id=1))
+        session.commit()
+    engine.dispose()
+
+    # Falcon's test client runs each request in its own event loop, so
+    # connections must not outlive a request.
+    async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool
+    )
+    return AsyncSQLAlchemyUnitOfWork(
+        async_sessionmaker(async_engine, expire_on_commit=False),
+        cache=LookupCache(),
+    )
+
+
+@pytest.fixture(scope="function")
+def async_client(async_uow) -> testing.TestClient:
+    return testing.TestClient(run(async_uow))
+
+
+def test_get(async_client, headers):
+    result = async_client.simulate_get("/humor/1", headers=headers)
+
+    assert result.status_code == 200
+    assert result.json["description"] == "humor for testing"
+
+
+def test_get_without_token_is_unauthorized(async_client):
+    result = async_client.simulate_get("/humor/1")
+
+    assert result.status_code == 401
+
+
+def test_post_then_get_from_date(async_client, headers):
+    body = {
+        "date": "2012-12-21",
+        "value": 7,
+        "description": "posted through ASGI",
+        "health_based": False,
+    }
+
+    result = async_client.simulate_post("/humor", json=body, headers=headers)
+    assert result.status_code == 201
+
+    result = async_client.simulate_get("/humor/date/2012-12-21", headers=headers)
+    assert result.status_code == 200
+    assert [h["description"] for h in result.json.values()] == [body["description"]]
+
+
+def test_patch_then_get_from_date(async_client, headers):
+    body = {"value": 7, "description": "patched through ASGI"}
+
+    result = async_client.simulate_patch("/humor/1", json=body, headers=headers)
+    assert result.status_code == 200
+
+    result = async_client.simulate_get(f"/humor/date/{date.today()}", headers=headers)
+    assert result.status_code == 200
+    assert result.json["1"]["description"] == body["description"]
+
+
+def test_delete(async_client, headers):
+    result = async_client.simulate_delete("/humor/1", headers=headers)
+    assert result.status_code == 204
+
+    result = async_client.simulate_get("/humor/1", headers=headers)
+    assert result.status_code == 404
+
+
+def test_login(async_client):
+    body = {"username": "test_username", "password": "test_password"}
+
+    result = async_client.simulate_post("/login", json=body)
+
+    assert result.status_code == 200
+    assert result.json["token"]
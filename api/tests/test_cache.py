@@ -0,0 +1,145 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from api.repository.cache import LookupCache
+from api.repository.unit_of_work import SQLAlchemyUnitOfWork
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(scope="function")
+def cached_uow(engine, db_session) -> SQLAlchemyUnitOfWork:
+    return SQLAlchemyUnitOfWork(
+        session_factory=sessionmaker(bind=engine, expire_on_commit=False),
+        cache=LookupCache(),
+    )
+
+
+@pytest.fixture(scope="function")
+def statements(engine) -> list:
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LookupCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = LookupCache(ttl=10, clock=clock)
+    cache.set("a", 1)
+
+    clock.now = 9
+    assert cache.get("a") == 1
+    clock.now = 10
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_entry_ttl_overrides_the_cache_ttl():
+    clock = FakeClock()
+    cache = LookupCache(ttl=10, clock=clock)
+    cache.set("a", 1, ttl=2)
+
+    clock.now = 2
+    assert cache.get("a") is None
+
+
+def test_stats_count_hits_and_misses():
+    cache = LookupCache()
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+
+    stats = cache.stats()
+
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+    assert stats["hit_ratio"] == pytest.approx(2 / 3)
+
+
+def test_zero_size_disables_the_cache():
+    cache = LookupCache(maxsize=0)
+    cache.set("a", 1)
+
+    assert cache.get("a") is None
+
+
+def test_cached_user_auth_is_served_without_a_query(cached_uow, statements):
+    with cached_uow:
+        cached_uow.repository.get_user_auth_by_username("test_username")
+    statements.clear()
+
+    with cached_uow:
+        user_auth = cached_uow.repository.get_user_auth_by_username("test_username")
+
+        assert user_auth.username == "test_username"
+        assert user_auth in cached_uow.session
+    assert statements == []
+    assert cached_uow.cache.stats()["hits"] == 1
+
+
+def test_cached_user_is_served_without_a_query(cached_uow, statements):
+    with cached_uow:
+        cached_uow.repository.get_user_by_id(1)
+    statements.clear()
+
+    with cached_uow:
+        assert cached_uow.repository.get_user_by_id(1).id == 1
+    assert statements == []
+
+
+def test_update_user_auth_invalidates_the_entry(cached_uow):
+    with cached_uow:
+        user_auth = cached_uow.repository.get_user_auth_by_username("test_username")
+        cached_uow.repository.update_user_auth(user_auth, {"token": "new_token"})
+        cached_uow.commit()
+
+    with cached_uow:
+        user_auth = cached_uow.repository.get_user_auth_by_username("test_username")
+        assert user_auth.token == "new_token"
+
+
+@pytest.mark.parametrize("operation", ["deactivate_user_auth", "delete_user_auth"])
+def test_user_auth_changes_invalidate_the_entry(cached_uow, operation):
+    with cached_uow:
+        user_auth = cached_uow.repository.get_user_auth_by_username("test_username")
+        getattr(cached_uow.repository, operation)(user_auth)
+        cached_uow.commit()
+
+    assert len(cached_uow.cache) == 0
+
+
+def test_uncommitted_changes_are_not_cached(cached_uow):
+    with cached_uow:
+        user_auth = cached_uow.repository.get_user_auth_by_username("test_username")
+        cached_uow.repository.update_user_auth(user_auth, {"token": "new_token"})
+        cached_uow.repository.get_user_auth_by_username("test_username")
+        cached_uow.rollback()
+
+    with cached_uow:
+        user_auth = cached_uow.repository.get_user_auth_by_username("test_username")
+        assert user_auth.token != "new_token"
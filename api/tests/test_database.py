@@ -1,5 +1,13 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import event
 from sqlalchemy.sql import text
 
+from api.repository.database import MOOD_LOADERS, PageRequest, SQLRepository
+from api.repository.models import Humor, Mood, User, Water
+from api.repository.unit_of_work import AbstractUnitOfWork
+
 
 def test_database(db_session):
     result = db_session.execute(text("SELECT * FROM user_mood"))
@@ -7,3 +15,315 @@ def test_database(db_session):
     # fetchall returns a list, so if database is working,
     # then this list should not be empty
     assert result.fetchall()
+
+
+@pytest.fixture(scope="function")
+def other_user_water(db_session) -> Water:
+    db_session.add(User())
+    mood = Mood(user_id=2, date=date(2012, 12, 21))
+    water_intake = Water(milliliters=500, mood=mood, date=date.today())
+    db_session.add(water_intake)
+    db_session.commit()
+    return water_intake
+
+
+def test_by_date_for_user_filters_in_one_query(
+    uow: AbstractUnitOfWork, engine, other_user_water
+):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        with uow:
+            water_intakes = uow.repository.get_water_intake_by_date_for_user(
+                date.today(), 1
+            )
+            owners = {water_intake.mood_id for water_intake in water_intakes}
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    assert owners == {1}
+    assert len(statements) == 1
+
+
+def test_by_id_for_user_tells_missing_from_forbidden(
+    uow: AbstractUnitOfWork, engine, other_user_water
+):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    with uow:
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            own = uow.repository.get_water_intake_by_id_for_user(1, 1)
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+        other = uow.repository.get_water_intake_by_id_for_user(other_user_water.id, 1)
+        missing = uow.repository.get_water_intake_by_id_for_user(999, 1)
+
+        assert own.found and own.item.id == 1
+        assert other.found and other.item is None
+        assert not missing.found and missing.item is None
+    assert len(statements) == 1
+
+
+def test_delete_by_date_for_user_cascades_in_one_statement(
+    uow: AbstractUnitOfWork, engine, other_user_water
+):
+    other_user_water_id = other_user_water.id
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    with uow:
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            own = uow.repository.delete_mood_by_date_for_user(date.today(), 1)
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+        # The mood's water intake went with it, the other user's one is left.
+        other = uow.repository.delete_water_intake_by_date_for_user(date.today(), 1)
+        missing = uow.repository.delete_sleep_by_date_for_user(date(2000, 1, 1), 1)
+        remaining = uow.repository.get_water_intake_by_date(date.today()).all()
+
+        assert own == (1, True)
+        assert other == (0, True)
+        assert missing == (0, False)
+        assert [water_intake.id for water_intake in remaining] == [other_user_water_id]
+    assert len(statements) == 1
+
+
+def test_update_by_id_for_user_returns_the_row_in_one_statement(
+    uow: AbstractUnitOfWork, engine, other_user_water
+):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    with uow:
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            own = uow.repository.update_water_intake_by_id_for_user(
+                1, 1, {"milliliters": 750}
+            )
+            milliliters = own.item.milliliters
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+        other = uow.repository.update_water_intake_by_id_for_user(
+            other_user_water.id, 1, {"milliliters": 750}
+        )
+        missing = uow.repository.update_water_intake_by_id_for_user(
+            999, 1, {"milliliters": 750}
+        )
+
+        assert own.found and milliliters == 750
+        assert other.found and other.item is None
+        assert not missing.found and missing.item is None
+    assert len(statements) == 1
+
+
+def test_get_or_add_mood_id_is_one_statement_per_user_and_day(
+    uow: AbstractUnitOfWork, engine
+):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    with uow:
+        uow.repository.add_user(User())
+        uow.flush()
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            existing = uow.repository.get_or_add_mood_id(date.today(), 1)
+            added = uow.repository.get_or_add_mood_id(date(2012, 12, 21), 1)
+            added_again = uow.repository.get_or_add_mood_id(date(2012, 12, 21), 1)
+            other_user = uow.repository.get_or_add_mood_id(date(2012, 12, 21), 2)
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    assert existing == 1
+    assert added == added_again != existing
+    assert other_user not in (existing, added)
+    assert len(statements) == 4
+
+
+def test_mood_documents_match_for_every_loader(db_session, engine):
+    documents = {}
+    for mood_loader in MOOD_LOADERS:
+        db_session.expunge_all()
+        repository = SQLRepository(db_session, mood_loader=mood_loader)
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            document, found = repository.get_mood_document_by_id_for_user(1, 1)
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+        assert found
+        assert repository.get_mood_documents_by_date_for_user(date.today(), 1) == [
+            document
+        ]
+        documents[mood_loader] = (document, len(statements))
+
+    assert documents["joined"][0] == documents["selectin"][0] == documents["json"][0]
+    assert documents["json"][1] == 1
+
+
+@pytest.mark.parametrize("mood_loader", MOOD_LOADERS)
+def test_mood_of_another_user_is_not_loaded(
+    db_session, engine, other_user_water, mood_loader
+):
+    repository = SQLRepository(db_session, mood_loader=mood_loader)
+    other_mood_id = other_user_water.mood_id
+    db_session.expunge_all()
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        other = repository.get_mood_document_by_id_for_user(other_mood_id, 1)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    missing = repository.get_mood_document_by_id_for_user(999, 1)
+
+    assert other == (None, True)
+    assert missing == (None, False)
+    # The owner-filtered lookup, then the check for the mood, and no load of
+    # its collections.
+    assert len(statements) == 2
+
+
+def test_pages_follow_the_date_and_id_order(uow: AbstractUnitOfWork, other_user_water):
+    other_user_water_id = other_user_water.id
+    with uow:
+        for day in [3, 1, 2]:
+            mood_id = uow.repository.get_or_add_mood_id(date(2012, 12, day), 1)
+            for milliliters in [100, 200]:
+                uow.repository.add_water_intake(
+                    Water(
+                        milliliters=milliliters,
+                        date=date(2012, 12, day),
+                        mood_id=mood_id,
+                    )
+                )
+        uow.flush()
+
+        pages = []
+        page_request = PageRequest(limit=3)
+        while True:
+            page = uow.repository.get_water_intake_page_for_user(1, page_request)
+            pages.append([(item.date, item.id) for item in page.items])
+            if page.next_after is None:
+                break
+            page_request = page_request._replace(after=page.next_after)
+
+        in_range = uow.repository.get_water_intake_page_for_user(
+            1,
+            PageRequest(
+                limit=10, date_from=date(2012, 12, 2), date_to=date(2012, 12, 3)
+            ),
+        )
+        in_range_dates = [item.date for item in in_range.items]
+        moods = uow.repository.get_mood_documents_page_for_user(1, PageRequest(limit=2))
+
+    keys = [key for page in pages for key in page]
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert keys == sorted(keys)
+    assert other_user_water_id not in {item_id for _, item_id in keys}
+    assert set(in_range_dates) == {date(2012, 12, 2), date(2012, 12, 3)}
+    assert len(in_range_dates) == 4 and in_range.next_after is None
+    assert [mood["date"] for mood in moods.items] == ["2012-12-01", "2012-12-02"]
+    assert moods.next_after is not None
+
+
+def test_pages_filter_on_the_date_of_the_mood(uow: AbstractUnitOfWork):
+    with uow:
+        # The entry is moved to another date, its mood is not.
+        water = uow.repository.get_water_intake_by_id(1)
+        uow.repository.update_water_intake(water, {"date": date(2012, 12, 1)})
+        uow.flush()
+
+        moved = uow.repository.get_water_intake_views_page_for_user(
+            1, PageRequest(limit=10, date_to=date(2012, 12, 1))
+        )
+        of_the_mood = uow.repository.get_water_intake_views_page_for_user(
+            1, PageRequest(limit=10, date_from=date.today())
+        )
+
+    assert moved.items == []
+    assert 1 in [view.id for view in of_the_mood.items]
+
+
+def test_views_match_the_models_without_entering_the_session(
+    uow: AbstractUnitOfWork, other_user_water
+):
+    other_user_water_id = other_user_water.id
+    with uow:
+        water_intakes = uow.repository.get_water_intake_by_date_for_user(
+            date.today(), 1
+        )
+        expected = [water_intake.as_dict() for water_intake in water_intakes]
+        uow.session.expunge_all()
+
+        own = uow.repository.get_water_intake_view_by_id_for_user(1, 1)
+        other = uow.repository.get_water_intake_view_by_id_for_user(
+            other_user_water_id, 1
+        )
+        missing = uow.repository.get_water_intake_view_by_id_for_user(999, 1)
+        by_date = uow.repository.get_water_intake_views_by_date_for_user(
+            date.today(), 1
+        )
+        page = uow.repository.get_water_intake_views_page_for_user(
+            1, PageRequest(limit=10)
+        )
+
+        assert len(uow.session.identity_map) == 0
+
+    assert [own.item.as_dict()] == expected
+    assert other.found and other.item is None
+    assert not missing.found and missing.item is None
+    assert [view.as_dict() for view in by_date] == expected
+    assert [view.as_dict() for view in page.items] == expected
+
+
+def test_batch_methods_send_one_statement_each(uow: AbstractUnitOfWork, engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement.split()[0])
+
+    with uow:
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            uow.repository.add_many([Humor(value=value, mood_id=1) for value in [1, 2]])
+            uow.flush()
+            humors = uow.repository.get_many(Humor, [3, 1, 2, 999])
+            uow.repository.update_many(
+                Humor, [{"id": 2, "value": 20}, {"id": 3, "value": 30}]
+            )
+            deleted = uow.repository.delete_many(Humor, [1, 3, 999])
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+        assert [humor.id for humor in humors] == [1, 2, 3]
+        assert [humor.value for humor in humors[1:]] == [20, 30]
+        assert deleted == 2
+        assert [humor.id for humor in uow.repository.get_many(Humor, [1, 2, 3])] == [2]
+        with pytest.raises(ValueError):
+            uow.repository.get_many(User, [1])
+
+    assert statements == ["INSERT", "SELECT", "UPDATE", "DELETE"]
@@ -0,0 +1,145 @@
+from datetime import date
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+
+from api.repository.database import PageRequest
+from api.repository.models import Humor, Mood, User, UserAuth, Water
+from api.repository.unit_of_work import InMemoryUnitOfWork
+
+
+def test_indexes_follow_updates(memory_uow: InMemoryUnitOfWork):
+    repository = memory_uow.repository
+    mood = repository.get_mood_by_id(1)
+    user_auth = repository.get_user_auth_by_username("test_username")
+
+    repository.update_many(Mood, [{"id": 1, "date": "2012-12-21"}])
+    repository.update_user_auth(user_auth, {"username": "renamed"})
+
+    assert repository.get_mood_by_date_for_user(date(2012, 12, 21), 1) == [mood]
+    assert repository.get_mood_by_date_for_user(date.today(), 1) == []
+    assert repository.get_user_auth_by_username("renamed") is user_auth
+    assert repository.get_user_auth_by_username("test_username") is None
+
+
+def test_rollback_undoes_what_was_not_committed(memory_uow: InMemoryUnitOfWork):
+    repository = memory_uow.repository
+    humor = repository.get_humor_by_id(1)
+    repository.add_humor(Humor(value=1, mood_id=1))
+    memory_uow.commit()
+
+    repository.update_humor(humor, {"value": 1})
+    repository.delete_mood(repository.get_mood_by_id(1))
+    assert repository.get_humor_by_id(1) is None
+    memory_uow.rollback()
+
+    mood = repository.get_mood_by_id(1)
+    assert [humor.id for humor in mood.humors] == [1, 2]
+    assert repository.get_humor_by_id(1).value == 10
+    assert len(repository.get_humor_by_date_for_user(date.today(), 1)) == 2
+
+
+def test_unique_keys_raise_like_the_database(memory_uow: InMemoryUnitOfWork):
+    repository = memory_uow.repository
+
+    with pytest.raises(IntegrityError):
+        repository.add_mood(Mood(user_id=1))
+
+    with pytest.raises(IntegrityError):
+        repository.add_user_auth(
+            UserAuth(username="test_username", password="", token="", user=User())
+        )
+
+    with pytest.raises(IntegrityError):
+        repository.add_water_intake(Water(milliliters=250, mood_id=11))
+
+
+def test_update_of_missing_rows_names_them(memory_uow: InMemoryUnitOfWork):
+    repository = memory_uow.repository
+
+    with pytest.raises(StaleDataError, match=r"\[11, 12\]"):
+        repository.update_many(
+            Humor, [{"id": 1, "value": 1}, {"id": 11, "value": 1}, {"id": 12}]
+        )
+    assert repository.get_humor_by_id(1).value == 10
+
+
+def test_pages_follow_the_date_and_id_order(memory_uow: InMemoryUnitOfWork):
+    repository = memory_uow.repository
+    mood_id = repository.get_or_add_mood_id(date(2012, 12, 21), 1)
+    repository.add_many(
+        [
+            Humor(value=value, date=date(2012, 12, 21), mood_id=mood_id)
+            for value in range(3)
+        ]
+    )
+    memory_uow.commit()
+
+    first = repository.get_humor_views_page_for_user(1, PageRequest(limit=3))
+    second = repository.get_humor_views_page_for_user(
+        1, PageRequest(limit=3, after=first.next_after)
+    )
+
+    assert [view.id for view in first.items] == [2, 3, 4]
+    assert first.next_after == (date(2012, 12, 21), 4)
+    assert [view.id for view in second.items] == [1]
+    assert second.next_after is None
+
+
+def test_pages_filter_on_the_date_of_the_mood(memory_uow: InMemoryUnitOfWork):
+    repository = memory_uow.repository
+    # The entry is moved to another date, its mood is not.
+    repository.update_humor(repository.get_humor_by_id(1), {"date": "2012-12-01"})
+
+    moved = repository.get_humor_page_for_user(
+        1, PageRequest(limit=10, date_to=date(2012, 12, 1))
+    )
+    of_the_mood = repository.get_humor_page_for_user(
+        1, PageRequest(limit=10, date_from=date.today())
+    )
+
+    assert moved.items == []
+    assert 1 in [humor.id for humor in of_the_mood.items]
+
+
+def test_resources_run_on_the_in_memory_repository(memory_client, headers):
+    body = {
+        "date": "2012-12-21",
+        "value": 8,
+        "description": "Humor de teste.",
+        "health_based": False,
+    }
+
+    result = memory_client.simulate_post("/humor", json=body, headers=headers)
+    assert result.status_code == 201
+    result = memory_client.simulate_get("/humor/date/2012-12-21", headers=headers)
+    assert [humor["value"] for humor in result.json.values()] == ["8"]
+
+    result = memory_client.simulate_delete("/mood/date/2012-12-21", headers=headers)
+    assert result.status_code == 204
+    result = memory_client.simulate_get("/humor/date/2012-12-21", headers=headers)
+    assert result.status_code == 404
+
+
+def test_a_list_of_moods_is_added_or_rejected_whole(memory_client, headers):
+    mood = {
+        "humors": {"value": 10, "description": "Humor.", "health_based": False},
+        "water_intakes": {"milliliters": 10, "description": "Água.", "pee": False},
+        "exercises": {"minutes": 10, "description": "Exercícios."},
+        "food_habits": {"value": 10, "description": "Alimentação."},
+        "sleeps": {"value": 10, "minutes": 360, "description": "Sono."},
+    }
+    body = [{**mood, "date": "2012-12-21"}, {**mood, "date": "2012-12-22"}]
+
+    result = memory_client.simulate_post("/mood", json=body, headers=headers)
+    assert result.status_code == 201
+    for mood_date in ["2012-12-21", "2012-12-22"]:
+        result = memory_client.simulate_get(f"/mood/date/{mood_date}", headers=headers)
+        assert result.status_code == 200
+
+    body = [{**mood, "date": "2012-12-23"}, {"date": "2012-12-24"}]
+    result = memory_client.simulate_post("/mood", json=body, headers=headers)
+    assert result.status_code == 400
+    result = memory_client.simulate_get("/mood/date/2012-12-23", headers=headers)
+    assert result.status_code == 404
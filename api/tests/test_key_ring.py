@@ -0,0 +1,107 @@
+import os
+import signal
+
+import jwt
+import pytest
+from falcon import testing
+
+from api.main import run
+from api.middleware.key_ring import KeyRing
+
+
+class Loader:
+    def __init__(self, keys: dict, active_kid) -> None:
+        self.keys = keys
+        self.active_kid = active_kid
+
+    def __call__(self):
+        return self.keys, self.active_kid
+
+
+@pytest.fixture(scope="function")
+def loader() -> Loader:
+    return Loader({"old": "old-secret", None: "legacy-secret"}, "old")
+
+
+def test_tokens_carry_the_active_kid(loader):
+    key_ring = KeyRing(loader)
+
+    token = key_ring.encode({"sub": "1"})
+
+    assert jwt.get_unverified_header(token)["kid"] == "old"
+    assert key_ring.decode(token) == {"sub": "1"}
+
+
+def test_tokens_without_kid_use_the_legacy_key(loader):
+    key_ring = KeyRing(loader)
+    token = jwt.encode({"sub": "1"}, "legacy-secret", algorithm="HS256")
+
+    assert key_ring.decode(token) == {"sub": "1"}
+
+
+def test_unknown_kid_is_rejected(loader):
+    key_ring = KeyRing(loader)
+    token = jwt.encode(
+        {"sub": "1"}, "other", algorithm="HS256", headers={"kid": "other"}
+    )
+
+    with pytest.raises(jwt.InvalidTokenError):
+        key_ring.decode(token)
+
+
+def test_rotation_keeps_tokens_signed_with_the_old_key(loader):
+    key_ring = KeyRing(loader)
+    old_token = key_ring.encode({"sub": "1"})
+
+    loader.keys = {"old": "old-secret", "new": "new-secret"}
+    loader.active_kid = "new"
+    key_ring.reload()
+    new_token = key_ring.encode({"sub": "2"})
+
+    assert key_ring.decode(old_token) == {"sub": "1"}
+    assert jwt.get_unverified_header(new_token)["kid"] == "new"
+    assert key_ring.decode(new_token) == {"sub": "2"}
+
+
+def test_failed_reload_keeps_the_current_keys(loader):
+    key_ring = KeyRing(loader)
+    token = key_ring.encode({"sub": "1"})
+
+    loader.active_kid = "missing"
+    key_ring.reload()
+
+    assert key_ring.active_kid == "old"
+    assert key_ring.decode(token) == {"sub": "1"}
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGHUP"), reason="No SIGHUP")
+def test_signal_reloads_the_keys(loader):
+    key_ring = KeyRing(loader)
+    previous = signal.getsignal(signal.SIGHUP)
+    try:
+        key_ring.install_reload_signal(signal.SIGHUP)
+        loader.keys = {"new": "new-secret"}
+        loader.active_kid = "new"
+        os.kill(os.getpid(), signal.SIGHUP)
+    finally:
+        signal.signal(signal.SIGHUP, previous)
+
+    assert key_ring.active_kid == "new"
+
+
+def test_login_token_is_accepted_after_rotation(uow, loader):
+    key_ring = KeyRing(loader)
+    client = testing.TestClient(run(uow, key_ring))
+    token = client.simulate_post(
+        "/login", json={"username": "test_username", "password": "test_password"}
+    ).json["token"]
+
+    loader.keys = {"old": "old-secret", "new": "new-secret"}
+    loader.active_kid = "new"
+    key_ring.reload()
+    result = client.simulate_get(
+        "/humor/1", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert jwt.get_unverified_header(token)["kid"] == "old"
+    assert result.status_code == 200
@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy import inspect, text
+
+from api.repository.migrations.runner import VERSION_TABLE, MigrationRunner
+from api.repository.models import Base
+
+
+@pytest.fixture(scope="function")
+def runner(engine) -> MigrationRunner:
+    Base.metadata.drop_all(engine)
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP TABLE IF EXISTS {VERSION_TABLE}"))
+
+    yield MigrationRunner(engine)
+
+    Base.metadata.drop_all(engine)
+
+
+def test_upgrade_creates_every_model_table(engine, runner: MigrationRunner):
+    applied = runner.upgrade()
+
+    assert [m.revision for m in applied] == [m.revision for m in runner.migrations]
+    assert runner.current_revision() == runner.migrations[-1].revision
+    assert not runner.pending()
+    assert set(Base.metadata.tables).issubset(inspect(engine).get_table_names())
+
+
+def test_upgrade_is_idempotent(runner: MigrationRunner):
+    runner.upgrade()
+
+    assert runner.upgrade() == []
+
+
+def test_downgrade_to_base_reverts_everything(engine, runner: MigrationRunner):
+    runner.upgrade()
+
+    reverted = runner.downgrade("base")
+
+    assert len(reverted) == len(runner.migrations)
+    assert runner.current_revision() is None
+    assert not set(Base.metadata.tables).intersection(inspect(engine).get_table_names())
+
+
+def test_unknown_target_is_rejected(runner: MigrationRunner):
+    with pytest.raises(ValueError):
+        runner.upgrade("9999")
+
+
+def test_upgrade_creates_the_model_indexes(engine, runner: MigrationRunner):
+    runner.upgrade()
+
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        declared = {index.name for index in table.indexes}
+        created = {index["name"] for index in inspector.get_indexes(table.name)}
+        assert declared.issubset(created), table.name
+
+
+def test_indexes_are_built_concurrently(engine, runner: MigrationRunner):
+    runner.upgrade("0002")
+    date_indexes = next(m for m in runner.migrations if m.revision == "0003")
+
+    runner.upgrade("0003")
+
+    with engine.connect() as connection:
+        invalid = connection.execute(
+            text("SELECT count(*) FROM pg_index WHERE NOT indisvalid")
+        ).scalar_one()
+    assert not date_indexes.transactional
+    assert runner.current_revision() == "0003"
+    assert invalid == 0
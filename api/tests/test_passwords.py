@@ -0,0 +1,61 @@
+import threading
+
+import pytest
+
+from api.middleware.passwords import PasswordHasher, PasswordHasherBusy
+
+
+@pytest.fixture(scope="function")
+def hasher() -> PasswordHasher:
+    hasher = PasswordHasher(n=1024, r=8, p=1, workers=1, queue_size=0)
+    yield hasher
+    hasher.shutdown()
+
+
+def test_hash_is_verified(hasher: PasswordHasher):
+    stored = hasher.hash("secret")
+
+    assert stored.startswith("scrypt$1024$8$1$")
+    assert hasher.verify("secret", stored)
+    assert not hasher.verify("other", stored)
+    assert not hasher.needs_rehash(stored)
+
+
+def test_hashes_are_salted(hasher: PasswordHasher):
+    assert hasher.hash("secret") != hasher.hash("secret")
+
+
+def test_plaintext_password_is_verified_and_needs_rehash(hasher: PasswordHasher):
+    assert hasher.verify("secret", "secret")
+    assert not hasher.verify("other", "secret")
+    assert hasher.needs_rehash("secret")
+
+
+def test_cost_change_needs_rehash(hasher: PasswordHasher):
+    stored = hasher.hash("secret")
+    stronger = PasswordHasher(n=2048, r=8, p=1, workers=1)
+
+    assert stronger.verify("secret", stored)
+    assert stronger.needs_rehash(stored)
+    stronger.shutdown()
+
+
+def test_full_pool_rejects_new_jobs(hasher: PasswordHasher):
+    started, release = threading.Event(), threading.Event()
+
+    def block(*args):
+        started.set()
+        release.wait()
+        return b""
+
+    thread = threading.Thread(target=hasher._run, args=(block,))
+    thread.start()
+    started.wait()
+    try:
+        with pytest.raises(PasswordHasherBusy):
+            hasher.hash("secret")
+    finally:
+        release.set()
+        thread.join()
+
+    assert hasher.verify("secret", hasher.hash("secret"))
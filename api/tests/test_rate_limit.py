@@ -0,0 +1,140 @@
+import pytest
+from falcon import testing
+from sqlalchemy import event
+
+from api.main import run
+from api.middleware.rate_limit import (
+    Limit,
+    MemoryBucketStore,
+    RateLimitMiddleware,
+    RedisBucketStore,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FailingRedis:
+    def register_script(self, script):
+        def call(keys, args):
+            raise ConnectionError()
+
+        return call
+
+
+@pytest.fixture(scope="function")
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture(scope="function")
+def limited_client(uow, clock) -> testing.TestClient:
+    rate_limiter = RateLimitMiddleware(
+        MemoryBucketStore(shards=4, clock=clock),
+        api_limit=Limit(rate=1, burst=2),
+        login_ip_limit=Limit(rate=1, burst=3),
+        login_username_limit=Limit(rate=0.5, burst=2),
+    )
+    return testing.TestClient(run(uow, rate_limiter=rate_limiter))
+
+
+def login(client: testing.TestClient, username: str, remote_addr: str = "10.0.0.1"):
+    return client.simulate_post(
+        "/login",
+        json={"username": username, "password": "test_password"},
+        remote_addr=remote_addr,
+    )
+
+
+def test_bucket_allows_burst_then_refills(clock):
+    store = MemoryBucketStore(clock=clock)
+    limit = Limit(rate=2, burst=2)
+
+    assert store.take("a", limit) == 0
+    assert store.take("a", limit) == 0
+    assert store.take("a", limit) == pytest.approx(0.5)
+
+    clock.now += 0.5
+    assert store.take("a", limit) == 0
+
+
+def test_full_buckets_are_dropped_first(clock):
+    store = MemoryBucketStore(shards=1, max_keys=2, clock=clock)
+    limit = Limit(rate=1, burst=1)
+    store.take("a", limit)
+    clock.now += 1
+    store.take("b", limit)
+    store.take("c", limit)
+
+    assert len(store) == 2
+    assert store.take("b", limit) > 0
+
+
+def test_unreachable_redis_lets_requests_through():
+    store = RedisBucketStore(FailingRedis())
+
+    assert store.take("a", Limit(rate=1, burst=1)) == 0
+
+
+@pytest.mark.parametrize(
+    "trusted_proxies, address",
+    [(0, "10.0.0.9"), (1, "10.0.0.2"), (2, "10.0.0.1"), (3, "10.0.0.1")],
+)
+def test_client_address_is_read_through_trusted_proxies(trusted_proxies, address):
+    limit = Limit(rate=1, burst=1)
+    rate_limiter = RateLimitMiddleware(
+        MemoryBucketStore(), limit, limit, limit, trusted_proxies=trusted_proxies
+    )
+    req = testing.create_req(
+        remote_addr="10.0.0.9", headers={"X-Forwarded-For": "10.0.0.1, 10.0.0.2"}
+    )
+
+    assert rate_limiter._address(req) == address
+
+
+def test_login_within_limit_reads_the_body(limited_client):
+    result = login(limited_client, "test_username")
+
+    assert result.status_code == 200
+
+
+def test_login_is_limited_per_username(limited_client):
+    login(limited_client, "test_username", "10.0.0.1")
+    login(limited_client, "test_username", "10.0.0.2")
+
+    result = login(limited_client, "test_username", "10.0.0.3")
+
+    assert result.status_code == 429
+    assert result.headers["Retry-After"] == "2"
+
+
+def test_login_is_limited_per_ip(limited_client):
+    for n in range(3):
+        login(limited_client, f"user_{n}")
+
+    assert login(limited_client, "test_username").status_code == 429
+    assert login(limited_client, "test_username", "10.0.0.2").status_code == 200
+
+
+def test_rejected_request_does_not_reach_the_database(limited_client, headers, engine):
+    for _ in range(2):
+        limited_client.simulate_get("/humor/1", headers=headers)
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        result = limited_client.simulate_get("/humor/1", headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    assert result.status_code == 429
+    assert result.headers["Retry-After"] == "1"
+    assert statements == []
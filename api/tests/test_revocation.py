@@ -0,0 +1,152 @@
+import pytest
+from falcon import testing
+
+from api.main import run
+from api.middleware.revocation import BloomFilter, RevocationList
+from api.repository.models import TokenRevocation
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(scope="function")
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+def login(client: testing.TestClient) -> dict:
+    token = client.simulate_post(
+        "/login", json={"username": "test_username", "password": "test_password"}
+    ).json["token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom_filter = BloomFilter(100)
+    items = [f"token-{i}" for i in range(100)]
+    for item in items:
+        bloom_filter.add(item)
+
+    assert all(item in bloom_filter for item in items)
+
+
+def test_revoked_token_id_is_rejected(clock):
+    revocations = RevocationList(capacity=10, clock=clock)
+    revocations.add(TokenRevocation(jti="a", revoked_at=1000, expires_at=2000))
+
+    assert revocations.is_revoked({"jti": "a", "user_auth_id": "1"})
+    assert not revocations.is_revoked({"jti": "b", "user_auth_id": "1"})
+
+
+def test_user_revocation_rejects_only_older_tokens(clock):
+    revocations = RevocationList(capacity=10, clock=clock)
+    revocations.add(TokenRevocation(user_auth_id=1, revoked_at=1000))
+
+    assert revocations.is_revoked({"user_auth_id": "1", "iat": 999})
+    assert revocations.is_revoked({"user_auth_id": "1"})
+    assert not revocations.is_revoked({"user_auth_id": "1", "iat": 1001})
+    assert not revocations.is_revoked({"user_auth_id": "2", "iat": 999})
+
+
+def test_user_revocation_keeps_tokens_issued_later_in_the_same_second(clock):
+    revocations = RevocationList(capacity=10, clock=clock)
+    revocations.add(TokenRevocation(user_auth_id=1, revoked_at=1000.25))
+
+    assert revocations.is_revoked({"user_auth_id": "1", "iat": 1000.1})
+    assert not revocations.is_revoked({"user_auth_id": "1", "iat": 1000.5})
+
+
+def test_full_list_drops_expired_token_ids(clock):
+    revocations = RevocationList(capacity=2, clock=clock)
+    revocations.add(TokenRevocation(jti="a", revoked_at=900, expires_at=950))
+    revocations.add(TokenRevocation(jti="b", revoked_at=900, expires_at=2000))
+    revocations.add(TokenRevocation(jti="c", revoked_at=900, expires_at=2000))
+
+    assert not revocations.is_revoked({"jti": "a"})
+    assert revocations.is_revoked({"jti": "b"})
+    assert revocations.is_revoked({"jti": "c"})
+
+
+def test_refresh_evicts_expired_revocations(clock, memory_uow):
+    revocations = RevocationList(refresh_interval=2, capacity=10, clock=clock)
+    revocations.add(TokenRevocation(jti="a", revoked_at=900, expires_at=1500))
+    revocations.add(TokenRevocation(jti="b", revoked_at=900, expires_at=3000))
+    revocations.add(TokenRevocation(user_auth_id=1, revoked_at=900, expires_at=1500))
+    revocations.add(TokenRevocation(user_auth_id=2, revoked_at=900))
+
+    clock.now = 2000
+    revocations.refresh_if_due(memory_uow)
+
+    assert len(revocations) == 2
+    assert revocations.is_revoked({"jti": "b"})
+    assert not revocations.is_revoked({"jti": "a"})
+    assert not revocations.is_revoked({"user_auth_id": "1", "iat": 800})
+    assert revocations.is_revoked({"user_auth_id": "2", "iat": 800})
+
+
+def test_new_revocation_deletes_the_expired_ones(uow):
+    with uow:
+        uow.repository.add_token_revocation(
+            TokenRevocation(jti="expired", revoked_at=1, expires_at=2)
+        )
+        uow.commit()
+        user_auth = uow.repository.get_user_auth_by_username("test_username")
+        uow.repository.deactivate_user_auth(user_auth)
+        uow.commit()
+
+        revocations = uow.repository.get_token_revocations_since(0)
+        assert [revocation.jti for revocation in revocations] == [None]
+        assert uow.session.query(TokenRevocation).count() == 1
+        assert revocations[0].expires_at > revocations[0].revoked_at
+
+
+def test_logout_revokes_the_token(client):
+    headers = login(client)
+
+    result = client.simulate_post("/logout", headers=headers)
+
+    assert result.status_code == 204
+    assert client.simulate_get("/humor/1", headers=headers).status_code == 401
+    assert client.simulate_get("/humor/1", headers=login(client)).status_code == 200
+
+
+def test_revocation_by_another_instance_is_picked_up(uow, clock):
+    revocations = RevocationList(refresh_interval=2, clock=clock)
+    client = testing.TestClient(run(uow, revocations=revocations))
+    other = testing.TestClient(run(uow))
+    headers = login(client)
+    assert client.simulate_get("/humor/1", headers=headers).status_code == 200
+
+    other.simulate_post("/logout", headers=headers)
+    assert client.simulate_get("/humor/1", headers=headers).status_code == 200
+
+    clock.now += 2
+    assert client.simulate_get("/humor/1", headers=headers).status_code == 401
+
+
+def test_deactivated_user_tokens_are_revoked(client, uow):
+    headers = login(client)
+
+    with uow:
+        user_auth = uow.repository.get_user_auth_by_username("test_username")
+        uow.repository.deactivate_user_auth(user_auth)
+        uow.commit()
+
+    assert client.simulate_get("/humor/1", headers=headers).status_code == 401
+
+
+def test_login_right_after_logout_is_accepted(memory_client, headers):
+    # The token of `headers` has no `jti`, so its logout revokes every token
+    # of the user issued until then.
+    assert memory_client.simulate_post("/logout", headers=headers).status_code == 204
+    new_headers = login(memory_client)
+
+    assert memory_client.simulate_get("/humor/1", headers=headers).status_code == 401
+    assert (
+        memory_client.simulate_get("/humor/1", headers=new_headers).status_code == 200
+    )
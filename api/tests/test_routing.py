@@ -0,0 +1,206 @@
+import time
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from api.repository.models import Base, Mood, User
+from api.repository.routing import (
+    ReadYourWritesTracker,
+    RedisReadYourWritesTracker,
+    RoutingSession,
+)
+from api.repository.unit_of_work import SQLAlchemyUnitOfWork
+
+
+class FakeRedis:
+    """
+    The commands `RedisReadYourWritesTracker` sends, with keys expiring on
+    time.
+    """
+
+    def __init__(self) -> None:
+        self.keys = {}
+        self.sets = 0
+
+    def set(self, key, value, px):
+        self.sets += 1
+        self.keys[key] = time.monotonic() + px / 1000
+
+    def exists(self, key):
+        return int(self.keys.get(key, 0) > time.monotonic())
+
+
+class FailingRedis:
+    def set(self, key, value, px):
+        raise ConnectionError()
+
+    def exists(self, key):
+        raise ConnectionError()
+
+
+@pytest.fixture(scope="function")
+def databases(tmp_path):
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for engine, users in [(primary, 2), (replica, 1)]:
+        Base.metadata.create_all(engine)
+        with engine.begin() as connection:
+            connection.execute(User.__table__.insert(), [{}] * users)
+            connection.execute(
+                Mood.__table__.insert(), [{"user_id": 1, "date": date(2012, 12, 21)}]
+            )
+
+    yield primary, replica
+
+    primary.dispose()
+    replica.dispose()
+
+
+@pytest.fixture(scope="function")
+def routing_uow(databases) -> SQLAlchemyUnitOfWork:
+    primary, replica = databases
+    session_factory = sessionmaker(
+        class_=RoutingSession,
+        primary=primary,
+        replicas=[replica],
+        tracker=ReadYourWritesTracker(window=0.2),
+    )
+    return SQLAlchemyUnitOfWork(session_factory=session_factory)
+
+
+def count_users(uow: SQLAlchemyUnitOfWork) -> int:
+    return uow.session.scalar(select(func.count(User.id)))
+
+
+def test_reads_go_to_primary_by_default(routing_uow):
+    routing_uow.set_read_only(False, "test_username")
+
+    assert count_users(routing_uow) == 2
+
+
+def test_read_only_requests_read_from_replica(routing_uow):
+    routing_uow.set_read_only(True, "test_username")
+
+    assert count_users(routing_uow) == 1
+
+
+def test_writes_always_go_to_primary(routing_uow):
+    routing_uow.set_read_only(True)
+    routing_uow.repository.add_user(User())
+    routing_uow.commit()
+    routing_uow.close()
+
+    routing_uow.set_read_only(False)
+    assert count_users(routing_uow) == 3
+
+
+def test_reads_stick_to_primary_after_a_write(routing_uow):
+    routing_uow.set_read_only(False, "test_username")
+    routing_uow.repository.add_user(User())
+    routing_uow.commit()
+    routing_uow.close()
+
+    routing_uow.set_read_only(True, "test_username")
+    assert count_users(routing_uow) == 3
+    routing_uow.close()
+
+    routing_uow.set_read_only(True, "another_username")
+    assert count_users(routing_uow) == 1
+    routing_uow.close()
+
+    time.sleep(0.2)
+    routing_uow.set_read_only(True, "test_username")
+    assert count_users(routing_uow) == 1
+
+
+def test_reads_stick_to_primary_after_a_delete_by_date(routing_uow):
+    routing_uow.set_read_only(False, "test_username")
+    deletion = routing_uow.repository.delete_mood_by_date_for_user(
+        date(2012, 12, 21), 1
+    )
+    routing_uow.commit()
+    routing_uow.close()
+
+    routing_uow.set_read_only(True, "test_username")
+    moods = routing_uow.repository.get_mood_by_date_for_user(date(2012, 12, 21), 1)
+
+    assert deletion == (1, True)
+    assert moods == []
+
+
+def test_a_session_reads_from_one_replica(tmp_path):
+    primary = create_engine("sqlite://")
+    replicas = [create_engine(f"sqlite:///{tmp_path / f'{n}.db'}") for n in range(4)]
+    sessions = [RoutingSession(primary, replicas) for _ in range(10)]
+    statement = select(User)
+
+    binds = []
+    for session in sessions:
+        session.info["read_only"] = True
+        binds.append({session.get_bind(clause=statement) for _ in range(20)})
+
+    assert all(len(session_binds) == 1 for session_binds in binds)
+    assert set().union(*binds).issubset(replicas)
+
+
+def test_writes_are_shared_by_redis_across_workers(databases):
+    primary, replica = databases
+    redis = FakeRedis()
+    workers = [
+        SQLAlchemyUnitOfWork(
+            session_factory=sessionmaker(
+                class_=RoutingSession,
+                primary=primary,
+                replicas=[replica],
+                tracker=RedisReadYourWritesTracker(redis, window=0.2),
+            )
+        )
+        for _ in range(2)
+    ]
+
+    workers[0].set_read_only(False, "test_username")
+    workers[0].repository.add_user(User())
+    workers[0].repository.add_user(User())
+    workers[0].commit()
+    workers[0].close()
+
+    workers[1].set_read_only(True, "test_username")
+    assert count_users(workers[1]) == 4
+    workers[1].close()
+
+    time.sleep(0.2)
+    workers[1].set_read_only(True, "test_username")
+    assert count_users(workers[1]) == 1
+    assert redis.sets == 1
+
+
+def test_in_process_writes_are_not_seen_by_other_workers(databases):
+    primary, replica = databases
+    workers = [
+        SQLAlchemyUnitOfWork(
+            session_factory=sessionmaker(
+                class_=RoutingSession,
+                primary=primary,
+                replicas=[replica],
+                tracker=ReadYourWritesTracker(window=0.2),
+            )
+        )
+        for _ in range(2)
+    ]
+
+    workers[0].set_read_only(False, "test_username")
+    workers[0].repository.add_user(User())
+    workers[0].commit()
+    workers[0].close()
+
+    workers[1].set_read_only(True, "test_username")
+    assert count_users(workers[1]) == 1
+
+
+def test_unreachable_redis_keeps_reads_on_the_primary():
+    tracker = RedisReadYourWritesTracker(FailingRedis(), window=5)
+    tracker.record_write("test_username")
+
+    assert tracker.is_sticky("test_username")
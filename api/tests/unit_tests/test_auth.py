@@ -0,0 +1,214 @@
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+import falcon
+import jwt
+import pytest
+from falcon import testing
+from sqlalchemy import event
+
+from api.config.config import get_jwt_secret_key
+from api.middleware.auth import REFRESHED_TOKEN_HEADER, AuthMiddleware
+from api.middleware.key_ring import KeyRing, load_keys_from_settings
+from api.middleware.revocation import RevocationList
+from api.repository.cache import LookupCache
+from api.repository.unit_of_work import AbstractUnitOfWork
+
+
+def create_token(expires_in: timedelta) -> str:
+    data = {
+        "exp": str(int((datetime.now() + expires_in).timestamp())),
+        "user_auth_id": "1",
+        "user_auth_username": "test_username",
+        "user_auth_user_id": "1",
+    }
+    return jwt.encode(data, get_jwt_secret_key(), algorithm="HS256")
+
+
+@pytest.mark.parametrize(
+    "expires_in, refreshed",
+    [
+        (timedelta(minutes=5), False),
+        (timedelta(seconds=30), True),
+    ],
+)
+def test_token_is_refreshed_only_close_to_expiry(client, expires_in, refreshed):
+    token = create_token(expires_in)
+
+    result = client.simulate_get(
+        "/humor/1", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert result.status_code == 200
+    assert (REFRESHED_TOKEN_HEADER in result.headers) is refreshed
+
+
+def test_refreshed_token_extends_expiry(client):
+    token = create_token(timedelta(seconds=30))
+
+    result = client.simulate_get(
+        "/humor/1", headers={"Authorization": f"Bearer {token}"}
+    )
+    refreshed = jwt.decode(
+        result.headers[REFRESHED_TOKEN_HEADER],
+        get_jwt_secret_key(),
+        algorithms=["HS256"],
+    )
+
+    assert int(refreshed["exp"]) > int(
+        jwt.decode(token, options={"verify_signature": False})["exp"]
+    )
+    assert refreshed["user_auth_username"] == "test_username"
+
+
+def test_refresh_does_not_write_the_token(client, uow: AbstractUnitOfWork):
+    token = create_token(timedelta(seconds=30))
+
+    client.simulate_get("/humor/1", headers={"Authorization": f"Bearer {token}"})
+
+    with uow:
+        user_auth = uow.repository.get_user_auth_by_username("test_username")
+        assert user_auth.token != token
+
+
+def test_principal_comes_from_the_claims(client, engine):
+    token = create_token(timedelta(minutes=5))
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        result = client.simulate_get(
+            "/humor/1", headers={"Authorization": f"Bearer {token}"}
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    assert result.status_code == 200
+    assert not any("FROM user_auth" in statement for statement in statements)
+    assert not any("FROM users" in statement for statement in statements)
+
+
+def test_principal_is_looked_up_for_tokens_without_ids(client):
+    token = jwt.encode(
+        {"user_auth_username": "test_username"},
+        get_jwt_secret_key(),
+        algorithm="HS256",
+    )
+
+    result = client.simulate_get(
+        "/humor/1", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert result.status_code == 200
+
+
+def test_unknown_username_without_ids_is_unauthorized(client):
+    token = jwt.encode(
+        {"user_auth_username": "nobody"}, get_jwt_secret_key(), algorithm="HS256"
+    )
+
+    result = client.simulate_get(
+        "/humor/1", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert result.status_code == 401
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = datetime.now().timestamp()
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def authenticate(middleware: AuthMiddleware, token: str) -> falcon.Request:
+    req = testing.create_req(
+        path="/humor/1", headers={"Authorization": f"Bearer {token}"}
+    )
+    middleware.process_request(req, falcon.Response())
+    return req
+
+
+@pytest.fixture(scope="function")
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture(scope="function")
+def middleware(uow, clock) -> AuthMiddleware:
+    return AuthMiddleware(
+        uow,
+        KeyRing(lambda: load_keys_from_settings()),
+        RevocationList(),
+        LookupCache(clock=clock),
+    )
+
+
+def test_repeated_token_is_decoded_once(middleware: AuthMiddleware, monkeypatch):
+    token = create_token(timedelta(minutes=5))
+    decode = Mock(wraps=middleware.key_ring.decode)
+    monkeypatch.setattr(middleware.key_ring, "decode", decode)
+
+    with middleware.uow:
+        first = authenticate(middleware, token)
+        second = authenticate(middleware, token)
+
+    assert decode.call_count == 1
+    assert first.context["token_claims"] == second.context["token_claims"]
+    assert middleware.token_cache.stats()["hits"] == 1
+
+
+def test_cached_token_is_evicted_at_expiry(
+    middleware: AuthMiddleware, clock, monkeypatch
+):
+    token = create_token(timedelta(minutes=5))
+    decode = Mock(wraps=middleware.key_ring.decode)
+    monkeypatch.setattr(middleware.key_ring, "decode", decode)
+
+    with middleware.uow:
+        authenticate(middleware, token)
+        clock.now += 5 * 60
+        authenticate(middleware, token)
+
+    assert decode.call_count == 2
+    assert middleware.token_cache.stats()["misses"] == 2
+
+
+def test_key_reload_drops_cached_tokens(middleware: AuthMiddleware, monkeypatch):
+    token = create_token(timedelta(minutes=5))
+    decode = Mock(wraps=middleware.key_ring.decode)
+    monkeypatch.setattr(middleware.key_ring, "decode", decode)
+
+    with middleware.uow:
+        authenticate(middleware, token)
+        middleware.key_ring.reload()
+        authenticate(middleware, token)
+
+    assert decode.call_count == 2
+
+
+def test_token_lifetimes_are_read_again_on_key_reload(
+    middleware: AuthMiddleware, monkeypatch
+):
+    monkeypatch.setattr("api.middleware.auth.get_auth_ttl", lambda: 1)
+    monkeypatch.setattr("api.middleware.auth.get_auth_refresh_threshold", lambda: 10)
+    req = testing.create_req(path="/humor/1")
+    req.context["token_claims"] = {"exp": str(int(datetime.now().timestamp()) + 120)}
+
+    resp = falcon.Response()
+    middleware.process_response(req, resp, None, True)
+    assert resp.get_header(REFRESHED_TOKEN_HEADER) is None
+
+    middleware.key_ring.reload()
+    resp = falcon.Response()
+    middleware.process_response(req, resp, None, True)
+    refreshed = jwt.decode(
+        resp.get_header(REFRESHED_TOKEN_HEADER),
+        get_jwt_secret_key(),
+        algorithms=["HS256"],
+    )
+    assert int(refreshed["exp"]) <= datetime.now().timestamp() + 60
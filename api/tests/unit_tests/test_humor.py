@@ -34,6 +34,41 @@ def test_get_from_date(client, humor_date, status_code, headers):
     assert result.status_code == status_code
 
 
+@pytest.mark.parametrize(
+    "query_string, status_code",
+    [
+        ("from=11-11-1111", 400),
+        ("limit=0", 400),
+        ("limit=many", 400),
+        ("cursor=not-a-cursor", 400),
+        ("", 200),
+        (f"from={date.today()}&to={date.today()}&limit=1", 200),
+    ],
+)
+def test_get_collection(client, query_string, status_code, headers):
+    result = client.simulate_get("/humor", query_string=query_string, headers=headers)
+
+    assert result.status_code == status_code
+
+
+def test_get_collection_pages(client, headers, uow: AbstractUnitOfWork):
+    with uow:
+        uow.repository.add_humor(Humor(value=5, mood_id=1))
+        uow.commit()
+
+    first = client.simulate_get("/humor", query_string="limit=1", headers=headers)
+    second = client.simulate_get(
+        "/humor",
+        params={"limit": 1, "cursor": first.json["next_cursor"]},
+        headers=headers,
+    )
+
+    assert first.status_code == second.status_code == 200
+    assert [humor["id"] for humor in first.json["items"]] == ["1"]
+    assert [humor["id"] for humor in second.json["items"]] == ["2"]
+    assert second.json["next_cursor"] is None
+
+
 @pytest.mark.parametrize(
     "body, status_code",
     [
@@ -2,6 +2,7 @@ from datetime import datetime
 
 import pytest
 
+from api.middleware.passwords import PasswordHasher
 from api.repository.unit_of_work import AbstractUnitOfWork
 
 
@@ -66,7 +67,21 @@ def test_post_register(client, body, status_code, uow: AbstractUnitOfWork):
         with uow:
             user_auth = uow.repository.get_user_auth_by_username(body.get("username"))
             assert user_auth.username == body.get("username")
-            assert user_auth.password == body.get("password")
+            assert user_auth.password != body.get("password")
+            assert PasswordHasher().verify(body.get("password"), user_auth.password)
             assert user_auth.active is True
             assert len(user_auth.token) == 0
             assert user_auth.created_at == datetime.today().date()
+
+
+def test_login_upgrades_the_password_hash(client, uow: AbstractUnitOfWork):
+    result = client.simulate_post(
+        "/login", json={"username": "test_username", "password": "test_password"}
+    )
+
+    assert result.status_code == 200
+    with uow:
+        user_auth = uow.repository.get_user_auth_by_username("test_username")
+        assert user_auth.password != "test_password"
+        assert not PasswordHasher().needs_rehash(user_auth.password)
+        assert PasswordHasher().verify("test_password", user_auth.password)
@@ -1,7 +1,7 @@
 from datetime import date, timedelta
 
 import pytest
-from sqlalchemy import select
+from sqlalchemy import event, select
 
 from api.repository.models import Exercises, Food, Humor, Mood, Sleep, Water
 from api.repository.unit_of_work import AbstractUnitOfWork
@@ -34,6 +34,17 @@ def test_get_from_date(client, mood_date, status_code, headers):
     assert result.status_code == status_code
 
 
+def test_get_collection(client, headers):
+    result = client.simulate_get(
+        "/mood", query_string=f"from={date.today()}", headers=headers
+    )
+
+    assert result.status_code == 200
+    assert [mood["id"] for mood in result.json["items"]] == ["1"]
+    assert len(result.json["items"][0]["humors"]) == 1
+    assert result.json["next_cursor"] is None
+
+
 @pytest.mark.parametrize(
     "body, status_code",
     [
@@ -148,6 +159,75 @@ def test_post(client, body, status_code, headers, uow: AbstractUnitOfWork):
             assert uow.repository.get_mood_by_date("2012-12-21").first()
 
 
+def test_post_inserts_each_table_once(client, headers, engine, uow: AbstractUnitOfWork):
+    body = {
+        "date": "2012-12-21",
+        "humors": [
+            {"value": 10, "description": "Humor de teste.", "health_based": False},
+            {"value": 5, "description": "Humor de teste.", "health_based": True},
+        ],
+        "water_intakes": [
+            {"milliliters": 10, "description": "Consumo de água.", "pee": False},
+            {"milliliters": 20, "description": "Consumo de água.", "pee": True},
+        ],
+        "exercises": {"minutes": 10, "description": "Exercícios de teste."},
+        "food_habits": {"value": 10, "description": "Alimentação de teste."},
+        "sleeps": {"value": 10, "minutes": 360, "description": "Sono de teste."},
+    }
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement.lstrip().split(None, 1)[0].upper())
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        result = client.simulate_post("/mood", json=body, headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    assert result.status_code == 201
+    assert statements.count("INSERT") == 6
+
+    with uow:
+        mood = uow.repository.get_mood_by_date_for_user("2012-12-21", 1)[0]
+        assert len(mood.humors) == 2
+        assert len(mood.water_intakes) == 2
+
+
+def test_post_list_inserts_each_table_once(
+    client, headers, engine, uow: AbstractUnitOfWork
+):
+    body = [
+        {
+            "date": mood_date,
+            "humors": {"value": 10, "description": "Humor.", "health_based": False},
+            "water_intakes": {"milliliters": 10, "description": "Água.", "pee": False},
+            "exercises": {"minutes": 10, "description": "Exercícios."},
+            "food_habits": {"value": 10, "description": "Alimentação."},
+            "sleeps": {"value": 10, "minutes": 360, "description": "Sono."},
+        }
+        for mood_date in ["2012-12-21", "2012-12-22"]
+    ]
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement.lstrip().split(None, 1)[0].upper())
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        result = client.simulate_post("/mood", json=body, headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    assert result.status_code == 201
+    assert statements.count("INSERT") == 6
+
+    with uow:
+        for mood_date in ["2012-12-21", "2012-12-22"]:
+            mood = uow.repository.get_mood_by_date_for_user(mood_date, 1)[0]
+            assert len(mood.humors) == 1
+
+
 @pytest.mark.parametrize(
     "body, status_code",
     [